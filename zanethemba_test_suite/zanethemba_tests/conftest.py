@@ -1,6 +1,8 @@
 """
 Test configuration and fixtures for Zanethemba website tests
 """
+import contextlib
+import hashlib
 import os
 import sys
 import logging
@@ -9,11 +11,26 @@ from pathlib import Path
 from datetime import datetime
 from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
 
+from support.readiness import wait_for_site_ready, install_skip_splash
+from support.page_pool import PagePool, DEVICE_PROFILES
+from support.virtual_clock import VirtualClock, SPLASH_DURATION_MS
+from support.site_server import SiteServer
+from support.network import NetworkPolicy
+from support.async_engine import AsyncEngine, DEFAULT_CONCURRENCY
+from support.impact import ImpactAnalyzer
+from support.result_cache import ResultCache, file_hash
+from support.web_vitals import WebVitalsRecorder, install_web_vitals
+from support.perf_history import record_and_check, machine_fingerprint
+from support.throttling import THROTTLING_PROFILES, select_profiles, apply_throttling, load_timeout_ms
+from support.perf_trace import PerfTracer, slow_threshold, DEFAULT_TRACE_PERCENTILE
+
 # Set up project paths
 PROJECT_ROOT = Path(__file__).parent
 REPORTS_DIR = PROJECT_ROOT / "reports"
 LOGS_DIR = PROJECT_ROOT / "logs"
 WEBSITE_PATH = Path("/mnt/user-data/outputs/zanethemba_website.html")
+IMPACT_BASELINE_PATH = REPORTS_DIR / "impact_baseline.json"
+RESULT_CACHE_PATH = REPORTS_DIR / "result_cache.json"
 
 # Create directories
 REPORTS_DIR.mkdir(exist_ok=True)
@@ -23,8 +40,10 @@ LOGS_DIR.mkdir(exist_ok=True)
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# File handler for all logs
-log_file = LOGS_DIR / f"test_execution_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+# File handler for all logs (parallel workers get their own file)
+WORKER_ID = os.environ.get("ZANETHEMBA_WORKER", "")
+log_suffix = f"_{WORKER_ID}" if WORKER_ID else ""
+log_file = LOGS_DIR / f"test_execution_{datetime.now().strftime('%Y%m%d_%H%M%S')}{log_suffix}.log"
 file_handler = logging.FileHandler(log_file, mode='w')
 file_handler.setLevel(logging.INFO)
 file_formatter = logging.Formatter(
@@ -44,15 +63,125 @@ logger.addHandler(console_handler)
 # Create test-specific logger
 test_logger = logging.getLogger('zanethemba_tests')
 
+impact_key = pytest.StashKey[ImpactAnalyzer]()
+result_cache_key = pytest.StashKey[ResultCache]()
+perf_tracer_key = pytest.StashKey[PerfTracer]()
+
+# Outcomes of this session, recorded in the impact baseline and result cache
+passed_tests = set()
+failed_tests = set()
+test_durations = {}
+call_durations = {}
+
+# Site and machine identity of this run, for the performance history
+run_info = {}
+
+
+def pytest_addoption(parser):
+    """Register Zanethemba-specific command line options"""
+    group = parser.getgroup("zanethemba")
+    group.addoption(
+        "--skip-splash",
+        action="store_true",
+        default=False,
+        help="Bypass the splash screen timers so tests start as soon as the DOM is usable",
+    )
+    group.addoption(
+        "--no-page-pool",
+        action="store_true",
+        default=False,
+        help="Give every test a freshly loaded page instead of a pooled, reset one",
+    )
+    group.addoption(
+        "--site-path",
+        default=None,
+        help=f"Site HTML file to test (default: {WEBSITE_PATH})",
+    )
+    group.addoption(
+        "--site-url",
+        default=None,
+        help="Test an already running site at this URL instead of a local file",
+    )
+    group.addoption(
+        "--serve-site",
+        action="store_true",
+        default=False,
+        help="Serve --site-path over the built-in local HTTP server instead of file://",
+    )
+    group.addoption(
+        "--allow-network",
+        action="store_true",
+        default=False,
+        help="Let pages reach external hosts other than the cached Google Fonts",
+    )
+    group.addoption(
+        "--async-concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Pages the async engine drives at once (default: {DEFAULT_CONCURRENCY})",
+    )
+    group.addoption(
+        "--changed-only",
+        action="store_true",
+        default=False,
+        help="Run only tests whose site sections changed since they last passed",
+    )
+    group.addoption(
+        "--full-run",
+        action="store_true",
+        default=False,
+        help="Execute every test even if its cached result is still valid",
+    )
+    group.addoption(
+        "--throttling",
+        default="default",
+        help="Throttling profiles for throttled load tests: 'default', 'all' or a comma list "
+             f"of {', '.join(THROTTLING_PROFILES)}",
+    )
+    group.addoption(
+        "--perf-trace",
+        action="store_true",
+        default=False,
+        help="Trace performance tests and keep the traces of failing or slow ones in reports/traces/",
+    )
+    group.addoption(
+        "--perf-trace-percentile",
+        type=float,
+        default=DEFAULT_TRACE_PERCENTILE,
+        help="Keep the traces of tests slower than this percentile of their history "
+             f"(default: {DEFAULT_TRACE_PERCENTILE})",
+    )
+
 
 @pytest.fixture(scope="session")
-def base_url():
+def site_path(pytestconfig):
+    """Return the path of the site HTML file under test"""
+    path = Path(pytestconfig.getoption("--site-path") or WEBSITE_PATH).resolve()
+    if not path.exists():
+        test_logger.error(f"Website file not found at {path}")
+        pytest.fail(f"Website file not found: {path}")
+    return path
+
+
+@pytest.fixture(scope="session")
+def site_server(site_path):
+    """Serve the site directory over local HTTP with compression and caching"""
+    server = SiteServer(site_path.parent, index=site_path.name).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture(scope="session")
+def base_url(request, pytestconfig):
     """Return the base URL for the website"""
-    if not WEBSITE_PATH.exists():
-        test_logger.error(f"Website file not found at {WEBSITE_PATH}")
-        pytest.fail(f"Website file not found: {WEBSITE_PATH}")
+    url = pytestconfig.getoption("--site-url")
+    if not url:
+        path = request.getfixturevalue("site_path")
+        if pytestconfig.getoption("--serve-site"):
+            url = request.getfixturevalue("site_server").url()
+        else:
+            url = f"file://{path}"
     
-    url = f"file://{WEBSITE_PATH}"
     test_logger.info(f"Base URL configured: {url}")
     return url
 
@@ -84,70 +213,285 @@ def browser(playwright_instance, browser_type_launch_args):
     browser.close()
 
 
+@pytest.fixture(scope="session")
+def async_engine(base_url, browser_type_launch_args, pytestconfig, network_policy):
+    """Async Playwright browser that runs independent page scenarios concurrently"""
+    engine = AsyncEngine(
+        browser_type_launch_args,
+        base_url,
+        skip_splash=pytestconfig.getoption("--skip-splash"),
+        network_policy=network_policy,
+        concurrency=pytestconfig.getoption("--async-concurrency")
+    ).start()
+    yield engine
+    engine.stop()
+
+
 @pytest.fixture(scope="function")
-def context(browser):
-    """Create a new browser context for each test"""
-    test_logger.info("Creating new browser context")
-    context = browser.new_context(
-        viewport={"width": 1920, "height": 1080},
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+def skip_splash(request):
+    """Whether the splash screen should be bypassed for this test
+
+    Tests marked ``splash`` exercise the real splash and always see it.
+    """
+    if request.node.get_closest_marker("splash"):
+        return False
+    return request.config.getoption("--skip-splash")
+
+
+@pytest.fixture(scope="session")
+def network_policy(pytestconfig):
+    """Serves cached fonts and blocks other external requests in every test context"""
+    return NetworkPolicy(allow_external=pytestconfig.getoption("--allow-network"))
+
+
+@pytest.fixture(scope="function", autouse=True)
+def network_log(request, network_policy):
+    """Log the external requests each test triggered, with their size and latency"""
+    mark = network_policy.mark()
+    yield
+    summary = network_policy.summary(since=mark)
+    if summary["requests"]:
+        test_logger.info(
+            f"External requests for {request.node.nodeid}: {summary['requests']} "
+            f"({summary['bytes']} bytes, {summary['latency_ms']} ms, "
+            f"{summary['blocked']} blocked, {summary['cache_misses']} cache misses)"
+        )
+
+
+@pytest.fixture(scope="function", autouse=True)
+def web_vitals(request, json_metadata):
+    """Web Vitals samples of a test, recorded in the JSON report
+
+    Contexts of ``performance`` tests get the observers installed, and the
+    page fixtures take a sample at teardown if the test did not.
+    """
+    recorder = WebVitalsRecorder()
+    yield recorder
+    if recorder.samples:
+        json_metadata["web_vitals"] = recorder.report()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def perf_trace(request, json_metadata):
+    """Trace ``performance`` tests under --perf-trace, keeping failing or slow ones
+
+    Slow means a call duration above --perf-trace-percentile of the test's
+    own history in the performance database.
+    """
+    if not request.config.getoption("--perf-trace") or not request.node.get_closest_marker("performance"):
+        yield None
+        return
+
+    nodeid = request.node.nodeid
+    threshold = slow_threshold(nodeid, request.config.getoption("--perf-trace-percentile"))
+    tracer = PerfTracer(request.getfixturevalue("browser"), nodeid).start()
+    request.node.stash[perf_tracer_key] = tracer
+
+    yield tracer
+
+    duration = call_durations.get(nodeid)
+    if nodeid in failed_tests:
+        reason = "failed"
+    elif threshold is not None and duration is not None and duration > threshold:
+        reason = f"slow ({duration:.2f}s > p{request.config.getoption('--perf-trace-percentile'):g} {threshold:.2f}s)"
+    else:
+        reason = None
+    kept = tracer.finish(keep=reason is not None)
+    if kept:
+        json_metadata["traces"] = {"reason": reason, "files": kept}
+
+
+@pytest.fixture(scope="session")
+def page_pool(browser, base_url, pytestconfig, network_policy):
+    """Warm pages per device profile, shared across tests"""
+    pool = PagePool(
+        browser,
+        base_url,
+        skip_splash=pytestconfig.getoption("--skip-splash"),
+        network_policy=network_policy
     )
-    yield context
-    test_logger.info("Closing browser context")
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="function")
+def use_page_pool(request):
+    """Whether this test may run on a pooled page
+
+    Tests marked ``splash`` need a fresh load and never use the pool, and
+    ``performance`` tests measure their own page load.
+    """
+    if request.node.get_closest_marker("splash") or request.node.get_closest_marker("performance"):
+        return False
+    return not request.config.getoption("--no-page-pool")
+
+
+def _new_profile_context(request, profile, skip_splash, **options):
+    """Create a fresh, unpooled context for a device profile"""
+    browser = request.getfixturevalue("browser")
+    context = browser.new_context(**DEVICE_PROFILES[profile], **options)
+    if skip_splash:
+        install_skip_splash(context)
+    request.getfixturevalue("network_policy").install(context)
+    if request.node.get_closest_marker("performance"):
+        install_web_vitals(context)
+    tracer = request.node.stash.get(perf_tracer_key, None)
+    if tracer is not None:
+        tracer.attach(context)
+    return context
+
+
+def _close_context(request, context):
+    """Close a context from _new_profile_context, saving its trace first"""
+    tracer = request.node.stash.get(perf_tracer_key, None)
+    if tracer is not None:
+        tracer.detach(context)
     context.close()
 
 
 @pytest.fixture(scope="function")
-def page(context, base_url):
-    """Create a new page and navigate to base URL"""
-    test_logger.info(f"Creating new page and navigating to {base_url}")
+def new_context(request):
+    """Open fresh contexts in a test: ``with new_context("mobile") as context:``
+
+    Each context is set up like the page fixtures' own (network policy, Web
+    Vitals for ``performance`` tests, the --perf-trace tracer), optionally
+    with the splash skipped and the virtual clock installed, and is closed
+    when the block exits, even on failure. Other keyword arguments go to
+    ``browser.new_context``.
+    """
+    @contextlib.contextmanager
+    def open_context(profile="desktop", skip_splash=False, virtual_clock=False, **options):
+        context = _new_profile_context(request, profile, skip_splash, **options)
+        try:
+            if virtual_clock:
+                VirtualClock.install(context)
+            yield context
+        finally:
+            _close_context(request, context)
+
+    return open_context
+
+
+def _profile_page(request, profile, base_url, skip_splash, use_page_pool):
+    """Yield a ready page for a device profile, pooled unless disabled"""
+    if use_page_pool:
+        pool = request.getfixturevalue("page_pool")
+        page = pool.acquire(profile)
+        yield page
+        pool.release(page, profile)
+        return
+
+    context = _new_profile_context(request, profile, skip_splash)
     page = context.new_page()
     page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
-    
-    # Wait for splash screen to complete
-    page.wait_for_timeout(4000)
-    
+    wait_for_site_ready(page)
+    web_vitals = request.getfixturevalue("web_vitals")
+
     yield page
-    test_logger.info("Closing page")
+
+    if request.node.get_closest_marker("performance") and not page.is_closed() \
+            and not web_vitals.collected(page):
+        web_vitals.collect(page, label=profile)
     page.close()
+    _close_context(request, context)
+    test_logger.info(f"Closed {profile} page and context")
+
+
+@pytest.fixture(scope="function")
+def context(request, skip_splash, use_page_pool):
+    """Browser context for the desktop profile (pooled unless disabled)"""
+    if use_page_pool:
+        yield request.getfixturevalue("page_pool").context("desktop")
+        return
+
+    test_logger.info("Creating new browser context")
+    context = _new_profile_context(request, "desktop", skip_splash)
+    yield context
+    test_logger.info("Closing browser context")
+    _close_context(request, context)
+
+
+@pytest.fixture(scope="function")
+def page(request, base_url, skip_splash, use_page_pool):
+    """Desktop page navigated to the base URL with the splash cleared"""
+    test_logger.info(f"Providing desktop page for {base_url}")
+    yield from _profile_page(request, "desktop", base_url, skip_splash, use_page_pool)
 
 
 @pytest.fixture(scope="function")
-def mobile_page(browser, base_url):
+def mobile_page(request, base_url, skip_splash, use_page_pool):
     """Create a mobile viewport page"""
-    test_logger.info("Creating mobile viewport page")
-    context = browser.new_context(
-        viewport={"width": 375, "height": 667},
-        user_agent="Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X)"
-    )
+    test_logger.info("Providing mobile viewport page")
+    yield from _profile_page(request, "mobile", base_url, skip_splash, use_page_pool)
+
+
+@pytest.fixture(scope="function")
+def tablet_page(request, base_url, skip_splash, use_page_pool):
+    """Create a tablet viewport page"""
+    test_logger.info("Providing tablet viewport page")
+    yield from _profile_page(request, "tablet", base_url, skip_splash, use_page_pool)
+
+
+@pytest.fixture(scope="function")
+def throttling_profile(request):
+    """Name of the throttling profile a parametrized test runs under"""
+    return request.param
+
+
+@pytest.fixture(scope="session")
+def throttled_url(request, pytestconfig):
+    """HTTP URL of the site; network throttling does not apply to file://"""
+    return pytestconfig.getoption("--site-url") or request.getfixturevalue("site_server").url()
+
+
+@pytest.fixture(scope="function")
+def throttled_page(request, throttling_profile, skip_splash):
+    """Blank page on the profile's device with its network and CPU throttled
+
+    The test navigates itself so the whole load is measured; a Web Vitals
+    sample is taken at teardown if the test did not take one.
+    """
+    profile = THROTTLING_PROFILES[throttling_profile]
+    context = _new_profile_context(request, profile["device"], skip_splash)
     page = context.new_page()
-    page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(4000)
-    
+    page.set_default_navigation_timeout(load_timeout_ms(throttling_profile))
+    cdp = apply_throttling(page, throttling_profile)
+    web_vitals = request.getfixturevalue("web_vitals")
+    web_vitals.budgets = dict(profile["budgets"])
+
     yield page
-    
+
+    if page.url != "about:blank" and not web_vitals.collected(page):
+        web_vitals.collect(page, label=throttling_profile)
+    cdp.detach()
     page.close()
-    context.close()
-    test_logger.info("Closed mobile page and context")
+    _close_context(request, context)
+    test_logger.info(f"Closed throttled '{throttling_profile}' page and context")
 
 
 @pytest.fixture(scope="function")
-def tablet_page(browser, base_url):
-    """Create a tablet viewport page"""
-    test_logger.info("Creating tablet viewport page")
-    context = browser.new_context(
-        viewport={"width": 768, "height": 1024},
-        user_agent="Mozilla/5.0 (iPad; CPU OS 14_0 like Mac OS X)"
-    )
+def virtual_clock(request, base_url, skip_splash):
+    """Desktop page whose timers only fire when the test advances the clock
+
+    The page is loaded fresh (never pooled) because the fake clock must be
+    installed before the site script registers its timers.
+    """
+    test_logger.info("Creating desktop page with virtual clock")
+    context = _new_profile_context(request, "desktop", skip_splash)
+    VirtualClock.install(context)
     page = context.new_page()
     page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
-    page.wait_for_timeout(4000)
-    
-    yield page
-    
+
+    clock = VirtualClock(page)
+    if not skip_splash:
+        clock.advance(SPLASH_DURATION_MS)
+    wait_for_site_ready(page)
+
+    yield clock
+
     page.close()
-    context.close()
-    test_logger.info("Closed tablet page and context")
+    _close_context(request, context)
+    test_logger.info("Closed virtual clock page and context")
 
 
 def pytest_configure(config):
@@ -156,6 +500,133 @@ def pytest_configure(config):
     test_logger.info("ZANETHEMBA WEBSITE TEST SUITE - STARTING")
     test_logger.info("=" * 80)
 
+    try:
+        select_profiles(config.getoption("--throttling"))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    # Identity of the site and machine for the performance history
+    site = Path(config.getoption("--site-path") or WEBSITE_PATH)
+    site_url = config.getoption("--site-url")
+    if site_url:
+        run_info["site_hash"] = hashlib.sha256(site_url.encode()).hexdigest()
+    elif site.exists():
+        run_info["site_hash"] = file_hash(site)
+    run_info["machine"] = machine_fingerprint()
+
+    # Impact analysis needs the site file; a remote --site-url has none
+    if not site_url and site.exists():
+        config.stash[impact_key] = ImpactAnalyzer(site, IMPACT_BASELINE_PATH)
+        config.stash[result_cache_key] = ResultCache(
+            RESULT_CACHE_PATH, site, read=not config.getoption("--full-run")
+        )
+
+
+def pytest_generate_tests(metafunc):
+    """Run tests using ``throttling_profile`` once per selected profile"""
+    if "throttling_profile" in metafunc.fixturenames:
+        profiles = select_profiles(metafunc.config.getoption("--throttling"))
+        metafunc.parametrize("throttling_profile", profiles, indirect=True, ids=profiles)
+
+
+def pytest_collection_modifyitems(config, items):
+    """Deselect tests whose site sections are unchanged under --changed-only"""
+    analyzer = config.stash.get(impact_key, None)
+    if analyzer is None:
+        if config.getoption("--changed-only"):
+            test_logger.error("--changed-only needs a local site file; running all tests")
+        return
+
+    for item in items:
+        analyzer.digest_for(item)
+    if not config.getoption("--changed-only"):
+        return
+
+    changed = analyzer.changed_sections(analyzer.previous_fingerprints())
+    test_logger.info(f"Changed site sections: {', '.join(changed) or 'none'}")
+
+    selected = [item for item in items if analyzer.is_affected(item)]
+    deselected = [item for item in items if not analyzer.is_affected(item)]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+    test_logger.info(f"Impact analysis selected {len(selected)} of {len(selected) + len(deselected)} tests")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """Report a cached pass instead of running a test whose inputs are unchanged"""
+    result_cache = item.config.stash.get(result_cache_key, None)
+    entry = result_cache.lookup(item) if result_cache is not None else None
+    if entry is None:
+        return None
+
+    test_logger.info(f"Using cached pass from {entry['passed_at']}: {item.nodeid}")
+    # No fixture runs, so the json_metadata of the test is carried on its
+    # reports the way pytest-json-report attaches it to executed ones
+    json_extra = {"metadata": {
+        "cached": True,
+        "cached_from": entry["passed_at"],
+        "cached_duration": entry.get("duration", 0.0),
+    }}
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    keywords = {name: 1 for name in item.keywords}
+    for when in ("setup", "call"):
+        report = pytest.TestReport(
+            item.nodeid, item.location, keywords, "passed", None, when,
+            user_properties=[("cached_from", entry["passed_at"])],
+            _json_report_extra=json_extra
+        )
+        item.ihook.pytest_runtest_logreport(report=report)
+    # Still tear down whatever the previous test left that the next one does not need
+    call = pytest.CallInfo.from_call(
+        lambda: item.session._setupstate.teardown_exact(nextitem), when="teardown"
+    )
+    report = pytest.TestReport.from_item_and_call(item, call)
+    report._json_report_extra = json_extra
+    item.ihook.pytest_runtest_logreport(report=report)
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+
+def _shard_output(name):
+    """Per-worker output path in parallel runs, None in a normal run"""
+    shard_dir = os.environ.get("ZANETHEMBA_SHARD_DIR")
+    return Path(shard_dir) / name if shard_dir else None
+
+
+def pytest_sessionfinish(session):
+    """Record passing tests for the next --changed-only run and the result cache"""
+    # Nothing ran: the collection run of run_tests.py must not rewrite the baselines
+    if session.config.option.collectonly:
+        return
+    # Parallel workers write their own files; run_tests.py merges them
+    analyzer = session.config.stash.get(impact_key, None)
+    if analyzer is not None:
+        analyzer.record(passed_tests, failed_tests, _shard_output("impact_baseline.json"))
+    result_cache = session.config.stash.get(result_cache_key, None)
+    if result_cache is not None:
+        result_cache.record(passed_tests, failed_tests, test_durations, _shard_output("result_cache.json"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    """Attach the run's site and machine identity to the JSON report
+
+    Also stores the run's performance metrics in the history database; in
+    parallel runs run_tests.py does that once, on the merged report.
+    """
+    json_report["zanethemba"] = dict(run_info)
+
+    if not WORKER_ID and run_info.get("site_hash"):
+        result = record_and_check(json_report, run_info["site_hash"])
+        if result is not None:
+            for regression in result["regressions"]:
+                test_logger.error(
+                    f"Performance regression in {regression['nodeid']}: {regression['metric']} "
+                    f"{regression['value']:.3f} vs baseline {regression['baseline_mean']:.3f}"
+                )
+
 
 def pytest_unconfigure(config):
     """Cleanup after all tests"""
@@ -176,7 +647,14 @@ def pytest_runtest_teardown(item):
 
 def pytest_runtest_logreport(report):
     """Log test results"""
+    test_durations[report.nodeid] = test_durations.get(report.nodeid, 0.0) + report.duration
+    if report.failed:
+        passed_tests.discard(report.nodeid)
+        failed_tests.add(report.nodeid)
     if report.when == "call":
+        call_durations[report.nodeid] = report.duration
+        if report.passed and report.nodeid not in failed_tests:
+            passed_tests.add(report.nodeid)
         if report.passed:
             test_logger.info(f"✓ PASSED: {report.nodeid}")
         elif report.failed:
@@ -8,6 +8,7 @@ import os
 from pathlib import Path
 from datetime import datetime
 import glob
+import sqlite3
 
 app = Flask(__name__)
 
@@ -75,6 +76,7 @@ def get_test_summary():
             'passed': 0,
             'failed': 0,
             'skipped': 0,
+            'cached': 0,
             'duration': 0,
             'tests': []
         }
@@ -84,12 +86,16 @@ def get_test_summary():
     
     summary = data.get('summary', {})
     tests = data.get('tests', [])
+    for test in tests:
+        test['cached'] = bool((test.get('metadata') or {}).get('cached'))
+        test['traces'] = (test.get('metadata') or {}).get('traces')
     
     return {
         'total': summary.get('total', 0),
         'passed': summary.get('passed', 0),
         'failed': summary.get('failed', 0),
         'skipped': summary.get('skipped', 0),
+        'cached': sum(1 for test in tests if test['cached']),
         'duration': summary.get('duration', 0),
         'tests': tests
     }
@@ -121,6 +127,48 @@ def get_coverage_data():
     }
 
 
+def get_performance_data(history_limit=20):
+    """Get recent runs from the performance history and the latest regression check"""
+    history_db = REPORTS_DIR / "perf_history.sqlite"
+    regressions_json = REPORTS_DIR / "perf_regressions.json"
+
+    latest = {'run_id': None, 'regressions': []}
+    if regressions_json.exists():
+        with open(regressions_json, 'r') as f:
+            latest = json.load(f)
+
+    runs = []
+    metrics = []
+    if history_db.exists():
+        conn = sqlite3.connect(history_db)
+        conn.row_factory = sqlite3.Row
+        runs = [dict(row) for row in conn.execute(
+            """
+            SELECT r.run_id, r.created, r.site_hash, r.machine, COUNT(m.metric) AS metrics
+            FROM runs r LEFT JOIN metrics m ON m.run_id = r.run_id
+            GROUP BY r.run_id ORDER BY r.run_id DESC LIMIT ?
+            """,
+            (history_limit,)
+        )]
+        if latest.get('run_id'):
+            metrics = [dict(row) for row in conn.execute(
+                "SELECT nodeid, metric, value FROM metrics WHERE run_id = ? ORDER BY nodeid, metric",
+                (latest['run_id'],)
+            )]
+        conn.close()
+
+    flagged = {(r['nodeid'], r['metric']) for r in latest.get('regressions', [])}
+    for metric in metrics:
+        metric['regressed'] = (metric['nodeid'], metric['metric']) in flagged
+
+    return {
+        'latest': latest,
+        'regressions': latest.get('regressions', []),
+        'runs': runs,
+        'metrics': metrics
+    }
+
+
 @app.route('/')
 def index():
     """Dashboard home page"""
@@ -157,6 +205,15 @@ def coverage_page():
                          current_page='coverage')
 
 
+@app.route('/performance')
+def performance_page():
+    """Performance history and regression flags"""
+    performance = get_performance_data()
+    return render_template('performance.html',
+                         performance=performance,
+                         current_page='performance')
+
+
 @app.route('/logs')
 def logs_page():
     """Logs viewer page"""
@@ -197,6 +254,13 @@ def api_coverage():
     return jsonify(coverage)
 
 
+@app.route('/api/performance')
+def api_performance():
+    """API endpoint for performance history"""
+    performance = get_performance_data()
+    return jsonify(performance)
+
+
 @app.route('/reports/<path:filename>')
 def serve_report(filename):
     """Serve static report files"""
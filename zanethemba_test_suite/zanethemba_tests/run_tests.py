@@ -3,27 +3,170 @@
 Zanethemba Website Test Runner
 Executes all tests and generates reports
 """
+import argparse
+import shutil
 import subprocess
 import sys
 import os
+import time
 from pathlib import Path
 
+from support.sharding import (
+    load_test_durations,
+    collect_test_ids,
+    option_args,
+    schedule_lpt,
+    worker_command,
+    worker_env,
+    merge_json_reports,
+    merge_coverage,
+    merge_impact_baselines,
+    merge_result_caches,
+    write_html_index,
+    merge_logs,
+)
+from support.perf_history import record_and_check
+
 # Colors for terminal output (only for errors)
 RED = '\033[91m'
 GREEN = '\033[92m'
 YELLOW = '\033[93m'
 RESET = '\033[0m'
 
+
+def parse_args():
+    """Parse runner options; anything unrecognised is passed through to pytest"""
+    parser = argparse.ArgumentParser(description="Run the Zanethemba website test suite")
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Number of parallel worker processes, each with its own browser (default: 1)"
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Run only tests affected by site sections changed since they last passed"
+    )
+    parser.add_argument(
+        "--full-run",
+        action="store_true",
+        help="Execute every test, ignoring cached passes in reports/result_cache.json"
+    )
+    args, pytest_args = parser.parse_known_args()
+    if args.changed_only:
+        pytest_args.append("--changed-only")
+    if args.full_run:
+        pytest_args.append("--full-run")
+    return args, pytest_args
+
+
+def run_serial(project_root, pytest_args):
+    """Run the whole suite in a single pytest process"""
+    # Run pytest with all options configured in pytest.ini
+    # Logs go to file only (INFO level), only ERRORs to console
+    result = subprocess.run(
+        ["python3", "-m", "pytest", *pytest_args],
+        cwd=project_root
+    )
+    # pytest exits with 5 when --changed-only deselected every test
+    if result.returncode == 5 and "--changed-only" in pytest_args:
+        print(f"{GREEN}✓ No tests affected by site changes{RESET}")
+        return 0
+    return result.returncode
+
+
+def run_parallel(project_root, workers, pytest_args):
+    """Shard the suite over worker processes and merge their reports"""
+    reports_dir = project_root / "reports"
+    logs_dir = project_root / "logs"
+    shards_root = reports_dir / "shards"
+    shutil.rmtree(shards_root, ignore_errors=True)
+    shards_root.mkdir(parents=True)
+
+    test_ids, positional = collect_test_ids(project_root, pytest_args)
+    if not test_ids and "--changed-only" in pytest_args:
+        print(f"{GREEN}✓ No tests affected by site changes{RESET}")
+        return 0
+    if not test_ids:
+        print(f"{RED}✗ No tests collected{RESET}", file=sys.stderr)
+        return 5
+
+    durations = load_test_durations(reports_dir / "test_results.json")
+    schedule = schedule_lpt(test_ids, durations, workers)
+    print(f"Scheduled {len(test_ids)} tests over {len(schedule)} workers "
+          f"({len(durations)} with known durations)")
+
+    worker_args = option_args(pytest_args, positional)
+    processes = []
+    start_time = time.time()
+    for index, (predicted, shard) in enumerate(schedule):
+        worker_id = f"gw{index}"
+        shard_dir = shards_root / worker_id
+        shard_dir.mkdir()
+        print(f"  • {worker_id}: {len(shard)} tests, ~{predicted:.1f}s predicted")
+        output = open(shard_dir / "output.txt", "w")
+        process = subprocess.Popen(
+            worker_command(shard_dir, shard, worker_args),
+            cwd=project_root,
+            env=worker_env(worker_id, shard_dir),
+            stdout=output,
+            stderr=subprocess.STDOUT
+        )
+        processes.append((worker_id, shard_dir, process, output))
+
+    returncode = 0
+    for worker_id, shard_dir, process, output in processes:
+        code = process.wait()
+        output.close()
+        if code == 0:
+            print(f"{GREEN}  ✓ {worker_id} finished{RESET}")
+        else:
+            print(f"{RED}  ✗ {worker_id} exited with code {code} "
+                  f"(see {shard_dir / 'output.txt'}){RESET}", file=sys.stderr)
+        returncode = max(returncode, code)
+    wall_duration = time.time() - start_time
+
+    shard_dirs = [shard_dir for _, shard_dir, _, _ in processes]
+    merged = merge_json_reports(
+        [(d.name, d / "test_results.json") for d in shard_dirs],
+        reports_dir / "test_results.json",
+        wall_duration
+    )
+    if not merge_coverage(project_root, [d / ".coverage" for d in shard_dirs], reports_dir):
+        print(f"{YELLOW}⚠ Coverage data could not be merged{RESET}", file=sys.stderr)
+    write_html_index(shard_dirs, reports_dir / "pytest_report.html", merged)
+    merge_impact_baselines([d / "impact_baseline.json" for d in shard_dirs], reports_dir / "impact_baseline.json")
+    merge_result_caches([d / "result_cache.json" for d in shard_dirs], reports_dir / "result_cache.json")
+    site_hash = merged.get("zanethemba", {}).get("site_hash")
+    if site_hash:
+        history = record_and_check(merged, site_hash)
+        if history and history["regressions"]:
+            print(f"{RED}✗ {len(history['regressions'])} performance regressions "
+                  f"(see {reports_dir / 'perf_regressions.json'}){RESET}", file=sys.stderr)
+
+    worker_logs = []
+    for shard_dir in shard_dirs:
+        candidates = sorted(logs_dir.glob(f"test_execution_*_{shard_dir.name}.log"))
+        if candidates:
+            worker_logs.append(candidates[-1])
+    merge_logs(worker_logs, logs_dir / f"test_execution_{time.strftime('%Y%m%d_%H%M%S')}.log")
+
+    print(f"Parallel run finished in {wall_duration:.1f}s")
+    return returncode
+
+
 def main():
     """Run tests and generate reports"""
+    args, pytest_args = parse_args()
     project_root = Path(__file__).parent
     os.chdir(project_root)
-    
+
     print("=" * 80)
     print("ZANETHEMBA WEBSITE - TEST EXECUTION")
     print("=" * 80)
     print()
-    
+
     # Check if playwright is installed
     print("Checking Playwright installation...")
     try:
@@ -37,48 +180,47 @@ def main():
         print(f"{RED}✗ Failed to install Playwright browsers{RESET}", file=sys.stderr)
         print(f"{RED}Error: {e.stderr.decode()}{RESET}", file=sys.stderr)
         return 1
-    
+
     print()
     print("-" * 80)
     print("Running test suite...")
     print("-" * 80)
     print()
-    
-    # Run pytest with all options configured in pytest.ini
-    # Logs go to file only (INFO level), only ERRORs to console
-    result = subprocess.run(
-        ["python3", "-m", "pytest"],
-        cwd=project_root
-    )
-    
+
+    if args.workers > 1:
+        returncode = run_parallel(project_root, args.workers, pytest_args)
+    else:
+        returncode = run_serial(project_root, pytest_args)
+
     print()
     print("=" * 80)
-    
-    if result.returncode == 0:
+
+    if returncode == 0:
         print("✓ ALL TESTS PASSED")
     else:
-        print(f"{RED}✗ SOME TESTS FAILED (exit code: {result.returncode}){RESET}", file=sys.stderr)
-    
+        print(f"{RED}✗ SOME TESTS FAILED (exit code: {returncode}){RESET}", file=sys.stderr)
+
     print("=" * 80)
     print()
-    
+
     # Report locations
     reports_dir = project_root / "reports"
     logs_dir = project_root / "logs"
-    
+
     print("Reports generated:")
     print(f"  • HTML Report:     {reports_dir}/pytest_report.html")
     print(f"  • Coverage HTML:   {reports_dir}/coverage/index.html")
     print(f"  • JSON Results:    {reports_dir}/test_results.json")
     print(f"  • Coverage JSON:   {reports_dir}/coverage.json")
+    print(f"  • Perf History:    {reports_dir}/perf_history.sqlite")
     print(f"  • Logs:            {logs_dir}/")
     print()
     print("View results in the dashboard:")
     print("  python3 dashboard/app.py")
     print("  Then open: http://localhost:5000")
     print()
-    
-    return result.returncode
+
+    return returncode
 
 
 if __name__ == "__main__":
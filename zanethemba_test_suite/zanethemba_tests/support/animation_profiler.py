@@ -0,0 +1,180 @@
+"""
+Frame-rate and jank profiling of on-page animations
+
+While an interaction runs, an in-page ``requestAnimationFrame`` loop
+records the timestamp of every rendered frame and a PerformanceObserver
+records long tasks. Sampling stops once the CSS animations and
+transitions inside a scope element have finished (and a minimum window
+has passed), so the profile covers exactly the animation under test:
+the 1.2 s carousel cross-fade, the 0.3 s hamburger morph or the
+``anim-fadeup`` replay after ``showPage``.
+
+Frame gaps are compared with the display refresh interval: a gap of
+n intervals means n - 1 frames were dropped.
+"""
+import logging
+from dataclasses import dataclass, field
+
+from support.benchmark import percentile
+
+logger = logging.getLogger('zanethemba_tests.animation_profiler')
+
+# Refresh interval of a 60 Hz display, which headless Chromium emulates
+FRAME_INTERVAL_MS = 1000 / 60
+
+# Longest a profile may run waiting for animations to finish
+PROFILE_TIMEOUT = 10000
+
+# Default smoothness budgets
+ANIMATION_BUDGETS = {
+    "p95_frame_ms": 50,
+    "dropped_ratio": 0.3,
+    "max_long_task_ms": 200,
+}
+
+START_SCRIPT = """
+() => {
+  const previous = window.__zanethembaFrames;
+  if (previous) previous.stop();
+  const state = window.__zanethembaFrames = {
+    start: performance.now(), frames: [], longTasks: [], running: true, observer: null,
+  };
+  const tick = timestamp => {
+    if (!state.running) return;
+    state.frames.push(timestamp);
+    requestAnimationFrame(tick);
+  };
+  requestAnimationFrame(tick);
+  try {
+    state.observer = new PerformanceObserver(list => {
+      for (const entry of list.getEntries()) {
+        state.longTasks.push({start: entry.startTime - state.start, duration: entry.duration});
+      }
+    });
+    state.observer.observe({type: 'longtask'});
+  } catch (e) {
+    // Long task timing not supported by this browser
+  }
+  state.stop = () => {
+    state.running = false;
+    if (state.observer) {
+      state.observer.takeRecords().forEach(entry =>
+        state.longTasks.push({start: entry.startTime - state.start, duration: entry.duration}));
+      state.observer.disconnect();
+    }
+  };
+}
+"""
+
+# True once the scope's animations are done and the minimum window has passed
+SETTLED_SCRIPT = """
+({scope, minDuration}) => {
+  const state = window.__zanethembaFrames;
+  if (!state || performance.now() - state.start < minDuration) return false;
+  const root = scope ? document.querySelector(scope) : document;
+  if (!root) return true;
+  const animations = root === document ? document.getAnimations() : root.getAnimations({subtree: true});
+  return animations.every(a => a.playState !== 'running' || a.effect.getTiming().iterations === Infinity);
+}
+"""
+
+STOP_SCRIPT = """
+() => {
+  const state = window.__zanethembaFrames;
+  if (!state) return null;
+  state.stop();
+  delete window.__zanethembaFrames;
+  return {
+    duration: performance.now() - state.start,
+    frames: state.frames.map(t => t - state.start),
+    longTasks: state.longTasks,
+  };
+}
+"""
+
+
+@dataclass
+class AnimationReport:
+    """Frame timing and long tasks recorded during one animation"""
+    name: str
+    frames: list
+    long_tasks: list = field(default_factory=list)
+    duration_ms: float = 0.0
+    interval_ms: float = FRAME_INTERVAL_MS
+
+    def __post_init__(self):
+        self.frame_times = [b - a for a, b in zip(self.frames, self.frames[1:])]
+        ordered = sorted(self.frame_times)
+        self.rendered = len(self.frame_times)
+        self.dropped = sum(max(0, round(gap / self.interval_ms) - 1) for gap in self.frame_times)
+        expected = self.rendered + self.dropped
+        self.dropped_ratio = self.dropped / expected if expected else 0.0
+        self.fps = self.rendered / (sum(self.frame_times) / 1000) if self.frame_times else 0.0
+        self.p50_frame_ms = percentile(ordered, 0.5)
+        self.p95_frame_ms = percentile(ordered, 0.95)
+        self.p99_frame_ms = percentile(ordered, 0.99)
+        self.max_frame_ms = ordered[-1] if ordered else None
+        self.max_long_task_ms = max((t["duration"] for t in self.long_tasks), default=0.0)
+
+    def over_budget(self, budgets=None):
+        """Messages for each statistic over its budget"""
+        violations = []
+        for name, limit in (budgets or ANIMATION_BUDGETS).items():
+            value = getattr(self, name)
+            if value is not None and value > limit:
+                violations.append(f"{self.name} {name}={value:.2f} exceeds budget {limit}")
+        return violations
+
+    def summary(self):
+        if not self.frame_times:
+            return f"{self.name}: no frames rendered in {self.duration_ms:.0f} ms"
+        return (f"{self.name}: {self.rendered} frames in {self.duration_ms:.0f} ms "
+                f"({self.fps:.1f} fps), {self.dropped} dropped ({self.dropped_ratio:.0%}), "
+                f"frame p50 {self.p50_frame_ms:.1f} / p95 {self.p95_frame_ms:.1f} / "
+                f"p99 {self.p99_frame_ms:.1f} ms, {len(self.long_tasks)} long tasks")
+
+    def as_dict(self):
+        return {
+            "duration_ms": self.duration_ms,
+            "rendered": self.rendered,
+            "dropped": self.dropped,
+            "dropped_ratio": self.dropped_ratio,
+            "fps": self.fps,
+            "p50_frame_ms": self.p50_frame_ms,
+            "p95_frame_ms": self.p95_frame_ms,
+            "p99_frame_ms": self.p99_frame_ms,
+            "max_frame_ms": self.max_frame_ms,
+            "long_tasks": self.long_tasks,
+            "max_long_task_ms": self.max_long_task_ms,
+            "frame_times": self.frame_times,
+        }
+
+
+class AnimationProfiler:
+    """Profiles animations triggered by interactions on one page"""
+
+    def __init__(self, page, interval_ms=FRAME_INTERVAL_MS):
+        self.page = page
+        self.interval_ms = interval_ms
+
+    def profile(self, name, action, scope=None, min_duration_ms=0, timeout=PROFILE_TIMEOUT):
+        """Record frames while ``action()`` runs and until animations in ``scope`` finish
+
+        ``scope`` is a CSS selector whose subtree holds the animations (the
+        whole document when None); ``min_duration_ms`` keeps sampling for at
+        least that long, e.g. the length of a CSS transition that starts later.
+        """
+        self.page.evaluate(START_SCRIPT)
+        try:
+            action()
+            self.page.wait_for_function(
+                SETTLED_SCRIPT, arg={"scope": scope, "minDuration": min_duration_ms}, timeout=timeout
+            )
+        finally:
+            data = self.page.evaluate(STOP_SCRIPT)
+
+        report = AnimationReport(
+            name, data["frames"], data["longTasks"], data["duration"], self.interval_ms
+        )
+        logger.info(report.summary())
+        return report
@@ -0,0 +1,279 @@
+"""
+Embedded-asset deduplication for the single-file site
+
+The site embeds every image as a base64 data URI at each place it is
+shown, so the same 244 KB, 300 KB and 366 KB payloads appear two or three
+times across the carousels and pages. This build step content-hashes
+every data URI and emits a document in which each payload appears once:
+
+* ``inline`` keeps a single file. Images reference a JS asset table in the
+  ``<head>`` through ``data-asset`` and are hydrated before the site script
+  runs; data URIs in CSS become custom properties on ``:root``.
+* ``external`` writes each payload once to ``assets/<kind>.<hash>.<ext>``
+  (content-hashed, so the site server marks it immutable) and points the
+  markup and CSS at those files.
+
+    python3 -m support.asset_dedup ../../zanethemba_website.html -o build/dedup
+"""
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger('zanethemba_tests.asset_dedup')
+
+DEFAULT_SOURCE = Path(__file__).parent.parent.parent.parent / "zanethemba_website.html"
+MODES = ("inline", "external")
+
+DATA_URI_PATTERN = re.compile(r"data:([\w.+-]+/[\w.+-]+)((?:;[\w-]+=[\w.-]+)*);base64,([A-Za-z0-9+/]+=*)")
+IMG_SRC_PATTERN = re.compile(r"(<img\b[^>]*?\s)src=([\"'])(data:[^\"']+)\2", re.I)
+CSS_URL_PATTERN = re.compile(r"url\(([\"']?)(data:[^\"')]+)\1\)")
+STYLE_PATTERN = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.S | re.I)
+ROOT_RULE_PATTERN = re.compile(r":root\s*\{")
+FIRST_BODY_SCRIPT_PATTERN = re.compile(r"<script\b(?![^>]*\bsrc\s*=)[^>]*>", re.I)
+
+EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/avif": "avif",
+    "image/svg+xml": "svg",
+    "font/woff2": "woff2",
+    "font/woff": "woff",
+}
+
+ASSET_TABLE_GLOBAL = "__zanethembaAssets"
+
+# Sets the src of every <img data-asset> from the asset table, except
+# images deferred by support.lazy_images
+HYDRATE_SCRIPT = """\
+<script>
+(function () {
+  var table = window.%s;
+  document.querySelectorAll('img[data-asset]:not([data-lazy])').forEach(function (img) {
+    var uri = table[img.getAttribute('data-asset')];
+    if (uri && !img.getAttribute('src')) img.setAttribute('src', uri);
+  });
+})();
+</script>
+""" % ASSET_TABLE_GLOBAL
+
+
+@dataclass
+class Asset:
+    """One distinct embedded payload"""
+    digest: str
+    mime: str
+    data: bytes
+    encoded_bytes: int
+    uses: int = 0
+
+    @property
+    def key(self):
+        """Short content hash used in asset names and table keys"""
+        return self.digest[:12]
+
+    @property
+    def kind(self):
+        return self.mime.split("/")[0]
+
+    @property
+    def filename(self):
+        extension = EXTENSIONS.get(self.mime, self.mime.split("/")[-1].split("+")[0])
+        return f"{self.kind}.{self.key}.{extension}"
+
+    def as_dict(self):
+        return {
+            "digest": self.digest,
+            "mime": self.mime,
+            "uses": self.uses,
+            "bytes": len(self.data),
+            "encoded_bytes": self.encoded_bytes,
+            "file": self.filename,
+        }
+
+
+@dataclass
+class DedupResult:
+    """Deduplicated document and what it saved"""
+    mode: str
+    html: str
+    original_bytes: int
+    assets: list = field(default_factory=list)
+    files: dict = field(default_factory=dict)
+
+    @property
+    def document_bytes(self):
+        return len(self.html.encode("utf-8"))
+
+    @property
+    def total_bytes(self):
+        """Document plus every external asset file"""
+        return self.document_bytes + sum(len(data) for data in self.files.values())
+
+    @property
+    def bytes_saved(self):
+        return self.original_bytes - self.total_bytes
+
+    @property
+    def duplicate_uses(self):
+        return sum(asset.uses - 1 for asset in self.assets)
+
+    def summary(self):
+        return (f"{self.mode}: {len(self.assets)} unique payloads for "
+                f"{sum(asset.uses for asset in self.assets)} uses, "
+                f"{self.original_bytes / 1024:.0f} KiB -> {self.total_bytes / 1024:.0f} KiB "
+                f"({self.bytes_saved / 1024:.0f} KiB saved)")
+
+    def as_dict(self):
+        return {
+            "mode": self.mode,
+            "original_bytes": self.original_bytes,
+            "document_bytes": self.document_bytes,
+            "total_bytes": self.total_bytes,
+            "bytes_saved": self.bytes_saved,
+            "assets": [asset.as_dict() for asset in self.assets],
+        }
+
+    def write(self, out_dir, name="index.html"):
+        """Write the document and its asset files under ``out_dir``"""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        (out_dir / name).write_text(self.html, encoding="utf-8")
+        for relative, data in self.files.items():
+            path = out_dir / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        logger.info(f"Wrote {self.mode} build to {out_dir}: {self.summary()}")
+        return out_dir / name
+
+
+def collect_assets(html):
+    """Every distinct base64 data URI in the document, keyed by the full URI"""
+    by_digest = {}
+    by_uri = {}
+    for match in DATA_URI_PATTERN.finditer(html):
+        uri = match.group(0)
+        if uri not in by_uri:
+            data = base64.b64decode(match.group(3))
+            digest = hashlib.sha256(data).hexdigest()
+            asset = by_digest.get(digest)
+            if asset is None:
+                asset = Asset(digest, match.group(1).lower(), data, len(uri))
+                by_digest[digest] = asset
+            by_uri[uri] = asset
+        by_uri[uri].uses += 1
+    return by_uri
+
+
+def _reference(asset, mode, assets_dir):
+    if mode == "external":
+        return f"{assets_dir}/{asset.filename}"
+    return asset.key
+
+
+def _rewrite_css(css, by_uri, mode, assets_dir, used):
+    def replace(match):
+        asset = by_uri.get(match.group(2))
+        if asset is None:
+            return match.group(0)
+        used[asset.digest] = asset
+        if mode == "external":
+            return f"url({_reference(asset, mode, assets_dir)})"
+        return f"var(--asset-{asset.key})"
+    return CSS_URL_PATTERN.sub(replace, css)
+
+
+def _root_properties(css_assets):
+    return "".join(f"--asset-{asset.key}:url({asset_uri});" for asset, asset_uri in css_assets)
+
+
+def dedupe(html, mode="inline", assets_dir="assets"):
+    """Rewrite ``html`` so each embedded payload appears once"""
+    if mode not in MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}' (expected one of {', '.join(MODES)})")
+    original_bytes = len(html.encode("utf-8"))
+    by_uri = collect_assets(html)
+    canonical_uri = {}
+    for uri, asset in by_uri.items():
+        canonical_uri.setdefault(asset.digest, uri)
+
+    css_used = {}
+    html = STYLE_PATTERN.sub(
+        lambda m: m.group(1) + _rewrite_css(m.group(2), by_uri, mode, assets_dir, css_used) + m.group(3),
+        html
+    )
+
+    img_used = {}
+
+    def replace_img(match):
+        asset = by_uri.get(match.group(3))
+        if asset is None:
+            return match.group(0)
+        img_used[asset.digest] = asset
+        quote = match.group(2)
+        if mode == "external":
+            return f"{match.group(1)}src={quote}{_reference(asset, mode, assets_dir)}{quote}"
+        return f"{match.group(1)}data-asset={quote}{asset.key}{quote}"
+
+    html = IMG_SRC_PATTERN.sub(replace_img, html)
+
+    files = {}
+    if mode == "external":
+        for asset in {**css_used, **img_used}.values():
+            files[f"{assets_dir}/{asset.filename}"] = asset.data
+    else:
+        if css_used:
+            properties = _root_properties((asset, canonical_uri[digest]) for digest, asset in css_used.items())
+            html, count = ROOT_RULE_PATTERN.subn(lambda m: m.group(0) + properties, html, count=1)
+            if not count:
+                html = html.replace("</style>", f":root{{{properties}}}</style>", 1)
+        if img_used:
+            table = {asset.key: canonical_uri[digest] for digest, asset in img_used.items()}
+            table_script = f"<script>window.{ASSET_TABLE_GLOBAL}={json.dumps(table, separators=(',', ':'))};</script>\n"
+            html = html.replace("</head>", table_script + "</head>", 1)
+            # Hydrate before the site script, i.e. before DOMContentLoaded
+            body_start = html.lower().find("<body")
+            script = FIRST_BODY_SCRIPT_PATTERN.search(html, body_start)
+            position = script.start() if script else html.lower().rfind("</body>")
+            html = html[:position] + HYDRATE_SCRIPT + html[position:]
+
+    assets = sorted({asset.digest: asset for asset in by_uri.values()}.values(), key=lambda a: -len(a.data))
+    result = DedupResult(mode, html, original_bytes, assets, files)
+    logger.info(result.summary())
+    return result
+
+
+def dedupe_file(source, out_dir, mode="inline", name="index.html"):
+    """Deduplicate a site file into ``out_dir`` and return the result"""
+    result = dedupe(Path(source).read_text(encoding="utf-8"), mode)
+    result.write(out_dir, name)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emit a site build with each embedded payload stored once")
+    parser.add_argument("source", nargs="?", default=str(DEFAULT_SOURCE), help="Site HTML file (default: the site file)")
+    parser.add_argument("-o", "--out-dir", default="build/dedup", help="Output directory")
+    parser.add_argument("--mode", choices=MODES, default="inline",
+                        help="inline: JS asset table in one file; external: hashed asset files")
+    parser.add_argument("--report", help="Also write the byte report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    result = dedupe_file(args.source, args.out_dir, args.mode)
+    print(result.summary())
+    for asset in result.assets:
+        print(f"  • {asset.filename}: {len(asset.data)} bytes, used {asset.uses}x")
+    if args.report:
+        Path(args.report).write_text(json.dumps(result.as_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Asyncio Playwright engine for running independent page scenarios concurrently
+
+The sync fixtures drive one page at a time. Read-only checks do not depend
+on each other, so the engine runs them as ``async def scenario(page)``
+coroutines on several pages of one browser at once.
+
+The sync API registers its own event loop as the running loop of the main
+thread, so the async engine owns a separate loop on a background thread and
+sync tests hand it coroutines through ``run()``.
+"""
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+from playwright.async_api import async_playwright
+
+from support.page_pool import DEVICE_PROFILES
+from support.readiness import SITE_READY_PREDICATE, SITE_READY_TIMEOUT, SKIP_SPLASH_SCRIPT
+
+logger = logging.getLogger('zanethemba_tests.async_engine')
+
+DEFAULT_CONCURRENCY = 4
+
+
+@dataclass
+class ScenarioResult:
+    """Outcome of one concurrently executed scenario"""
+    name: str
+    passed: bool
+    duration: float
+    error: str = ""
+
+
+async def open_ready_page(context, base_url):
+    """Open a page on the site and wait until the splash has cleared"""
+    page = await context.new_page()
+    await page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
+    await page.wait_for_function(SITE_READY_PREDICATE, timeout=SITE_READY_TIMEOUT)
+    return page
+
+
+class AsyncEngine:
+    """Owns an async_playwright browser on a dedicated event loop thread"""
+
+    def __init__(self, launch_args, base_url, skip_splash=False, network_policy=None,
+                 concurrency=DEFAULT_CONCURRENCY):
+        self.launch_args = launch_args
+        self.base_url = base_url
+        self.skip_splash = skip_splash
+        self.network_policy = network_policy
+        self.concurrency = concurrency
+        self.browser = None
+        self._playwright = None
+        self._loop = None
+        self._thread = None
+
+    def start(self):
+        """Start the event loop thread and launch the browser on it"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self.run(self._launch())
+        return self
+
+    async def _launch(self):
+        logger.info("Launching async browser")
+        self._playwright = await async_playwright().start()
+        self.browser = await self._playwright.chromium.launch(**self.launch_args)
+
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the engine's loop and return its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout)
+
+    def run_scenarios(self, scenarios, profile="desktop", concurrency=None):
+        """Run ``async def scenario(page)`` callables concurrently, one fresh page each"""
+        return self.run(self._run_scenarios(scenarios, profile, concurrency or self.concurrency))
+
+    async def _run_scenarios(self, scenarios, profile, concurrency):
+        context = await self.browser.new_context(**DEVICE_PROFILES[profile])
+        if self.skip_splash:
+            await context.add_init_script(SKIP_SPLASH_SCRIPT)
+        if self.network_policy is not None:
+            await self.network_policy.install_async(context)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(scenario):
+            async with semaphore:
+                name = scenario.__name__
+                start = time.perf_counter()
+                page = None
+                try:
+                    page = await open_ready_page(context, self.base_url)
+                    await scenario(page)
+                    result = ScenarioResult(name, True, time.perf_counter() - start)
+                except Exception as e:
+                    result = ScenarioResult(name, False, time.perf_counter() - start, f"{type(e).__name__}: {e}")
+                finally:
+                    if page is not None:
+                        await page.close()
+                logger.info(f"Scenario {name}: {'passed' if result.passed else 'failed'} in {result.duration:.2f}s")
+                return result
+
+        try:
+            return await asyncio.gather(*(run_one(s) for s in scenarios))
+        finally:
+            await context.close()
+
+    async def _shutdown(self):
+        if self.browser is not None:
+            await self.browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    def stop(self):
+        """Close the browser and stop the loop thread"""
+        logger.info("Closing async browser")
+        try:
+            self.run(self._shutdown())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
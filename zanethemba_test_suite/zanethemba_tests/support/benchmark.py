@@ -0,0 +1,141 @@
+"""
+Statistical micro-benchmarks for interaction latencies
+
+A single wall-clock sample on a loaded CI node says little. A benchmark
+runs untimed warmup iterations, then times many iterations (with an
+optional untimed setup before each) and reports the median, p95 and p99
+of all samples with distribution-free confidence intervals from order
+statistics. Samples outside Tukey's fences are reported as outliers but
+kept: the slow iterations are exactly what the tails measure.
+
+Budgets are checked against those intervals: a benchmark is only over
+budget when the whole interval lies above the limit, so a few slow
+samples from a busy machine do not fail the test.
+"""
+import logging
+import math
+import statistics
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger('zanethemba_tests.benchmark')
+
+DEFAULT_WARMUP = 3
+DEFAULT_ITERATIONS = 20
+
+# Two-sided 95% normal quantile
+Z_95 = 1.959964
+
+# Tukey's fences: samples beyond this many IQRs outside the quartiles are outliers
+OUTLIER_IQR_FACTOR = 1.5
+
+
+def percentile(sorted_values, q):
+    """Linearly interpolated quantile (0 <= q <= 1) of sorted values"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def quantile_ci(sorted_values, q, z=Z_95):
+    """Distribution-free confidence interval for a quantile from order statistics
+
+    The number of samples below the true q-quantile is Binomial(n, q); its
+    normal approximation gives the ranks that bracket the quantile.
+    """
+    n = len(sorted_values)
+    if n == 0:
+        return None, None
+    spread = z * math.sqrt(n * q * (1 - q))
+    lower = max(0, math.floor(n * q - spread))
+    upper = min(n - 1, math.ceil(n * q + spread))
+    return sorted_values[lower], sorted_values[upper]
+
+
+def find_outliers(values, factor=OUTLIER_IQR_FACTOR):
+    """Values outside Tukey's fences, in their original order"""
+    if len(values) < 4:
+        return []
+    ordered = sorted(values)
+    q1, q3 = percentile(ordered, 0.25), percentile(ordered, 0.75)
+    iqr = q3 - q1
+    low, high = q1 - factor * iqr, q3 + factor * iqr
+    return [v for v in values if not low <= v <= high]
+
+
+@dataclass
+class BenchmarkResult:
+    """Summary statistics of one benchmark, in seconds"""
+    name: str
+    samples: list
+
+    def __post_init__(self):
+        ordered = sorted(self.samples)
+        self.outliers = find_outliers(self.samples)
+        self.n = len(ordered)
+        self.median = percentile(ordered, 0.5)
+        self.mean = statistics.fmean(ordered) if ordered else None
+        self.stdev = statistics.stdev(ordered) if self.n > 1 else 0.0
+        self.p95 = percentile(ordered, 0.95)
+        self.p99 = percentile(ordered, 0.99)
+        self.median_ci = quantile_ci(ordered, 0.5)
+        self.p95_ci = quantile_ci(ordered, 0.95)
+        self.p99_ci = quantile_ci(ordered, 0.99)
+
+    def over_budget(self, median=None, p95=None, p99=None):
+        """Messages for statistics whose whole confidence interval exceeds the limit"""
+        violations = []
+        for label, limit, (ci_low, _) in (("median", median, self.median_ci),
+                                           ("p95", p95, self.p95_ci),
+                                           ("p99", p99, self.p99_ci)):
+            if limit is not None and ci_low is not None and ci_low > limit:
+                violations.append(
+                    f"{self.name} {label} {getattr(self, label):.3f}s "
+                    f"(95% CI from {ci_low:.3f}s) exceeds {limit:.3f}s"
+                )
+        return violations
+
+    def summary(self):
+        return (f"{self.name}: median {self.median:.3f}s "
+                f"[{self.median_ci[0]:.3f}, {self.median_ci[1]:.3f}], "
+                f"p95 {self.p95:.3f}s, p99 {self.p99:.3f}s "
+                f"(n={self.n}, {len(self.outliers)} outliers)")
+
+    def as_dict(self):
+        return {
+            "n": self.n,
+            "median": self.median,
+            "median_ci": list(self.median_ci),
+            "mean": self.mean,
+            "stdev": self.stdev,
+            "p95": self.p95,
+            "p95_ci": list(self.p95_ci),
+            "p99": self.p99,
+            "p99_ci": list(self.p99_ci),
+            "outliers": self.outliers,
+            "samples": self.samples,
+        }
+
+
+def benchmark(name, action, setup=None, warmup=DEFAULT_WARMUP, iterations=DEFAULT_ITERATIONS):
+    """Time ``action()`` repeatedly, running ``setup()`` untimed before every call"""
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        action()
+
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        action()
+        samples.append(time.perf_counter() - start)
+
+    result = BenchmarkResult(name, samples)
+    logger.info(result.summary())
+    return result
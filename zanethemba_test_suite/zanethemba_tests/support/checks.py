@@ -0,0 +1,187 @@
+"""
+Read-only content checks shared by the sync tests and the async engine
+
+Each check is a generator taking a page and the ``expect`` of its
+Playwright API, and yielding the result of every Playwright call in turn.
+With the sync API the call has already run when it is yielded; the async
+runner awaits it before the generator makes the next call. One body thus
+serves ``test_content.py``/``test_navigation.py`` and the concurrent
+scenarios of ``test_concurrent.py``.
+"""
+import inspect
+
+
+def run_check(check, page):
+    """Run a check on a sync API page"""
+    from playwright.sync_api import expect
+    for _ in check(page, expect):
+        pass
+
+
+async def run_check_async(check, page):
+    """Run a check on an async API page"""
+    from playwright.async_api import expect
+    for step in check(page, expect):
+        if inspect.isawaitable(step):
+            await step
+
+
+def scenario(name, *checks):
+    """``async def scenario(page)`` running ``checks`` in order, for AsyncEngine.run_scenarios"""
+    async def run(page):
+        for check in checks:
+            await run_check_async(check, page)
+    run.__name__ = name
+    return run
+
+
+def show_page(name):
+    """Check that opens a page through its desktop navigation link"""
+    def check(page, expect):
+        yield page.locator(f"#nav-{name}").click()
+        yield expect(page.locator(f"#page-{name}")).to_have_class("page active")
+    check.__name__ = f"show_{name}"
+    return check
+
+
+# Home page
+
+def hero_title(page, expect):
+    """Hero title is shown and mentions cleanliness"""
+    title = page.locator(".hero-title")
+    yield expect(title).to_be_visible()
+    yield expect(title).to_contain_text("Cleanliness")
+
+
+def hero_carousel(page, expect):
+    """Hero carousel is shown with its 4 slides"""
+    yield expect(page.locator("#heroCarousel")).to_be_visible()
+    yield expect(page.locator("#heroCarousel .carousel-slide")).to_have_count(4)
+
+
+def bbbee_badge(page, expect):
+    """L1 B-BBEE badge on the hero"""
+    yield expect(page.locator(".hero-badge")).to_be_visible()
+    yield expect(page.locator(".hero-badge-number")).to_have_text("L1")
+
+
+def trust_bar(page, expect):
+    """Trust bar with its 5 items"""
+    yield expect(page.locator(".trust-item")).to_have_count(5)
+    for text in ("CIPC Registered", "Fully Insured", "Community-Led", "Eco-Friendly", "Trained Professionals"):
+        yield expect(page.locator(f".trust-text:has-text('{text}')")).to_be_visible()
+
+
+def services_grid(page, expect):
+    """Services grid with its 6 cards"""
+    yield expect(page.locator(".service-card")).to_have_count(6)
+
+
+def stats_section(page, expect):
+    """Stats section with its 4 stats, including the L1 rating"""
+    yield expect(page.locator(".stat-item")).to_have_count(4)
+    yield expect(page.locator(".stat-number:has-text('L1')")).to_be_visible()
+
+
+def community_section(page, expect):
+    """Community section with its "Our People" tag"""
+    tag = page.locator(".community-img-tag")
+    yield expect(tag).to_be_visible()
+    yield expect(tag).to_have_text("Our People")
+
+
+HOME_CONTENT = (hero_title, hero_carousel, bbbee_badge, trust_bar, services_grid, stats_section,
+                community_section)
+
+
+# About page
+
+def about_hero(page, expect):
+    """About hero title"""
+    title = page.locator(".about-hero-title")
+    yield expect(title).to_be_visible()
+    yield expect(title).to_contain_text("Hope, Dignity")
+
+
+def bbbee_strip(page, expect):
+    """Level 1 B-BBEE strip"""
+    yield expect(page.locator(".bbbee-strip")).to_be_visible()
+    yield expect(page.locator(".bbbee-strip-badge")).to_contain_text("Level 1 B-BBEE")
+
+
+def sidebar_cards(page, expect):
+    """Mission, Vision and Promise sidebar cards"""
+    yield expect(page.locator(".sidebar-card")).to_have_count(3)
+    for label in ("Our Mission", "Our Vision", "Our Promise"):
+        yield expect(page.locator(f".sidebar-card-label:has-text('{label}')")).to_be_visible()
+
+
+def values_grid(page, expect):
+    """Values grid with its 5 values"""
+    yield expect(page.locator(".value-item")).to_have_count(5)
+
+
+ABOUT_CONTENT = (about_hero, bbbee_strip, sidebar_cards, values_grid)
+
+
+# Contact page
+
+def contact_hero(page, expect):
+    """Contact hero title"""
+    title = page.locator(".contact-hero-title")
+    yield expect(title).to_be_visible()
+    yield expect(title).to_contain_text("Cleaner")
+
+
+def contact_info_blocks(page, expect):
+    """Email, Telephone and WhatsApp info blocks"""
+    for label in ("Email", "Telephone", "WhatsApp"):
+        yield expect(page.locator(f".contact-info-label:has-text('{label}')")).to_be_visible()
+
+
+def address_card(page, expect):
+    """Address card with the Boksburg address"""
+    yield expect(page.locator(".address-card")).to_be_visible()
+    text = page.locator(".address-card-text")
+    yield expect(text).to_contain_text("Wattle Street")
+    yield expect(text).to_contain_text("Boksburg")
+
+
+def social_links(page, expect):
+    """LinkedIn, WhatsApp and Email links"""
+    yield expect(page.locator(".social-links .social-link")).to_have_count(3)
+
+
+CONTACT_CONTENT = (contact_hero, contact_info_blocks, address_card, social_links)
+
+
+# Navigation and footer
+
+def brand_name(page, expect):
+    """Company name next to the navigation logo"""
+    yield expect(page.locator(".brand-main")).to_have_text("Zanethemba")
+    yield expect(page.locator(".brand-sub")).to_have_text("Cleaning Services")
+
+
+def navigation_links(page, expect):
+    """Home, About Us and Contact Us navigation links"""
+    for link_text in ("Home", "About Us", "Contact Us"):
+        yield expect(page.get_by_role("link", name=link_text, exact=True)).to_be_visible()
+
+
+def footer_contact(page, expect):
+    """Email and telephone links in the footer"""
+    yield expect(page.locator("footer a[href='mailto:info@zanethembacleaning.co.za']")).to_be_visible()
+    yield expect(page.locator("footer a[href='tel:+27615460770']")).to_be_visible()
+
+
+CHROME = (brand_name, navigation_links, footer_contact)
+
+
+def mobile_menu_to_contact(page, expect):
+    """Contact page reached through the hamburger menu"""
+    yield page.locator("#hamburger").click()
+    yield expect(page.locator("#mobileMenu")).to_have_class("mobile-menu open")
+    yield page.locator("#mob-contact").click()
+    yield expect(page.locator("#page-contact")).to_have_class("page active")
+    yield expect(page.locator(".contact-hero-title")).to_be_visible()
@@ -0,0 +1,134 @@
+"""
+Per-page code splitting for the site build
+
+``showPage()`` only toggles the ``active`` class of three ``.page``
+sections that all ship in one document, so the About and Contact markup is
+downloaded and parsed before the home page can render. This build step
+moves the content of every page but ``home`` into a content-hashed chunk
+(``pages/<name>.<hash>.html``) and leaves an empty section carrying
+``data-chunk`` in its place.
+
+A small runtime wraps ``showPage``: the first time a split page is
+requested its chunk is fetched, mounted and the site's scroll reveal is
+applied to it, then the original ``showPage`` runs. Chunks are prefetched
+when a link that opens their page is hovered, focused or touched, and once
+the browser is idle after load. Chunks are fetched, so a split build must
+be served over HTTP (``--serve-site``).
+"""
+import hashlib
+import logging
+import re
+from dataclasses import dataclass, field
+
+from support.impact import element_end
+
+logger = logging.getLogger('zanethemba_tests.code_split')
+
+SPLIT_PAGES = ("about", "contact")
+PAGE_SECTION_PATTERN = '<div\\b[^>]*\\bid="page-{name}"[^>]*>'
+
+# Elements the site script fades in with its IntersectionObserver (SCROLL
+# REVEAL); mounted chunks get the same treatment
+REVEAL_SELECTOR = ".service-card,.stat-item,.value-item"
+
+CHUNK_RUNTIME = """\
+<script>
+(function () {
+  var show = window.showPage;
+  var chunks = {};
+  var requested = null;
+  function fetchChunk(section) {
+    var url = section && section.getAttribute('data-chunk');
+    if (!url) return Promise.resolve(null);
+    if (!chunks[url]) {
+      chunks[url] = fetch(url).then(function (response) {
+        if (!response.ok) throw new Error(url + ': HTTP ' + response.status);
+        return response.text();
+      }).catch(function (error) {
+        delete chunks[url];
+        throw error;
+      });
+    }
+    return chunks[url];
+  }
+  function mount(section) {
+    return fetchChunk(section).then(function (html) {
+      if (html === null || !section.hasAttribute('data-chunk')) return;
+      section.innerHTML = html;
+      section.removeAttribute('data-chunk');
+      if (typeof observer === 'undefined') return;
+      section.querySelectorAll('%s').forEach(function (el) {
+        el.style.transition = 'opacity 0.6s ease, transform 0.6s ease';
+        observer.observe(el);
+      });
+    });
+  }
+  function section(name) { return document.getElementById('page-' + name); }
+  window.showPage = function (name) {
+    requested = name;
+    var target = section(name);
+    if (!target || !target.hasAttribute('data-chunk')) return show(name);
+    mount(target).catch(function (error) {
+      console.error('chunk failed to load:', error);
+    }).then(function () {
+      if (requested === name) show(name);
+    });
+  };
+  function prefetch(event) {
+    var link = event.target.closest && event.target.closest('[onclick*="showPage"]');
+    var match = link && /showPage\\('(\\w+)'\\)/.exec(link.getAttribute('onclick'));
+    if (match) fetchChunk(section(match[1])).catch(function () {});
+  }
+  ['mouseover', 'focusin', 'touchstart'].forEach(function (type) {
+    document.addEventListener(type, prefetch, {passive: true});
+  });
+  var idle = window.requestIdleCallback || function (callback) { return setTimeout(callback, 1); };
+  window.addEventListener('load', function () {
+    idle(function () {
+      document.querySelectorAll('.page[data-chunk]').forEach(function (target) {
+        fetchChunk(target).catch(function () {});
+      });
+    });
+  });
+})();
+</script>
+""" % REVEAL_SELECTOR
+
+
+@dataclass
+class SplitResult:
+    """Initial document and the page chunks split out of it"""
+    html: str
+    files: dict = field(default_factory=dict)
+
+    @property
+    def document_bytes(self):
+        return len(self.html.encode("utf-8"))
+
+    def summary(self):
+        chunks = ", ".join(f"{path} ({len(data)} bytes)" for path, data in self.files.items())
+        return f"initial document {self.document_bytes} bytes, chunks: {chunks or 'none'}"
+
+
+def split_pages(html, pages=SPLIT_PAGES, chunks_dir="pages"):
+    """Move the content of ``pages`` into chunks fetched on first use"""
+    files = {}
+    for name in pages:
+        match = re.search(PAGE_SECTION_PATTERN.format(name=re.escape(name)), html)
+        if match is None:
+            raise ValueError(f"No section #page-{name} to split")
+        if "active" in re.findall(r"[\w-]+", match.group(0)):
+            raise ValueError(f"#page-{name} is shown at load and cannot be split")
+        end = element_end(html, match.start())
+        data = html[match.end():html.rfind("</", match.end(), end)].encode("utf-8")
+        path = f"{chunks_dir}/{name}.{hashlib.sha256(data).hexdigest()[:12]}.html"
+        files[path] = data
+        section = match.group(0)[:-1].rstrip() + f' data-chunk="{path}">'
+        html = html[:match.start()] + section + "</div>" + html[end:]
+
+    if files:
+        position = html.lower().rfind("</body>")
+        html = html[:position] + CHUNK_RUNTIME + html[position:]
+    result = SplitResult(html, files)
+    logger.info(result.summary())
+    return result
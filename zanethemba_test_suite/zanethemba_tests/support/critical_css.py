@@ -0,0 +1,260 @@
+"""
+Critical-CSS extraction for the site build
+
+The whole stylesheet sits in the ``<head>`` (or, in the multi-file builds,
+in one render-blocking ``<link>``) although the first paint only needs the
+rules of the splash, the navigation and the hero. This build step loads the
+document in headless Chromium at the desktop, tablet and mobile viewports,
+without skipping the splash, and records which style rules match an element
+above the fold at load. It then:
+
+* inlines only those rules (plus every ``@keyframes``, ``@font-face`` and
+  ``@import``) in the ``<head>``;
+* loads the full stylesheet without blocking the first paint: the
+  multi-file builds preload it and switch it on from ``onload`` (with a
+  ``<noscript>`` fallback), the single-file build moves it after the
+  markup, just before the scripts at the end of the ``<body>``.
+
+The deferred stylesheet is the complete one, not the remainder, so the
+cascade order of the source is kept once it has loaded. Rules the browser
+never saw (added by later build steps, e.g. ``picture{display:contents}``)
+are always treated as critical.
+"""
+import logging
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from support.asset_dedup import FIRST_BODY_SCRIPT_PATTERN, STYLE_PATTERN
+from support.page_pool import DEVICE_PROFILES
+
+logger = logging.getLogger('zanethemba_tests.critical_css')
+
+CRITICAL_PROFILES = ("desktop", "tablet", "mobile")
+
+# At-rules kept whole in the critical CSS: the splash animates from the
+# first frame and fonts must not be requested late
+KEPT_AT_RULES = ("@keyframes", "@-webkit-keyframes", "@font-face", "@import", "@charset")
+GROUPING_AT_RULES = ("@media", "@supports")
+
+# Parts of a selector that never match at load: pseudo-elements and
+# interaction states are matched through the element they belong to
+UNMATCHABLE_PSEUDO_PATTERN = re.compile(
+    r"::?(?:before|after|first-line|first-letter|placeholder|selection|marker|backdrop|-webkit-[\w-]+)"
+    r"|:(?:hover|focus-visible|focus-within|focus|active|visited)\b"
+)
+
+# For every prelude (a list of selectors), whether any element it selects
+# has a box intersecting the first viewport
+ABOVE_THE_FOLD_SCRIPT = """
+(preludes) => preludes.map(selectors => selectors.some(selector => {
+  let elements;
+  try {
+    elements = document.querySelectorAll(selector);
+  } catch (e) {
+    return true;
+  }
+  return Array.from(elements).some(el => {
+    const rect = el.getBoundingClientRect();
+    return (rect.width > 0 || rect.height > 0) && rect.bottom > 0 && rect.top < innerHeight;
+  });
+}))
+"""
+
+
+@dataclass
+class Rule:
+    """One top-level rule of a stylesheet; ``children`` for @media/@supports"""
+    prelude: str
+    body: str
+    children: list = field(default_factory=list)
+
+    @property
+    def at_rule(self):
+        return self.prelude.split("(")[0].split()[0].lower() if self.prelude.startswith("@") else None
+
+    def text(self):
+        if self.children:
+            return f"{self.prelude}{{{''.join(child.text() for child in self.children)}}}"
+        return f"{self.prelude}{{{self.body}}}" if self.body is not None else f"{self.prelude};"
+
+
+def _block_end(css, start):
+    """Offset just past the ``}`` closing the block whose ``{`` is at ``start``"""
+    depth = 0
+    quote = None
+    position = start
+    while position < len(css):
+        char = css[position]
+        if quote:
+            if char == "\\":
+                position += 1
+            elif char == quote:
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return position + 1
+        position += 1
+    return len(css)
+
+
+def parse_rules(css):
+    """Top-level rules of a (comment-free) stylesheet, in order"""
+    rules = []
+    position = 0
+    while position < len(css):
+        brace = css.find("{", position)
+        semicolon = css.find(";", position)
+        if brace < 0 and semicolon < 0:
+            break
+        if semicolon >= 0 and (brace < 0 or semicolon < brace) and css[position:semicolon].strip().startswith("@"):
+            rules.append(Rule(css[position:semicolon].strip(), None))
+            position = semicolon + 1
+            continue
+        end = _block_end(css, brace)
+        prelude, body = css[position:brace].strip(), css[brace + 1:end - 1]
+        rule = Rule(prelude, body)
+        if rule.at_rule in GROUPING_AT_RULES:
+            rule.children = parse_rules(body)
+        rules.append(rule)
+        position = end
+    return rules
+
+
+def matchable_selectors(prelude):
+    """Selectors of a prelude to test for above-the-fold matches
+
+    Returns None when one of them cannot be decided at load (it is then
+    always critical).
+    """
+    selectors = []
+    for selector in re.split(r",(?![^()]*\))", prelude):
+        selector = UNMATCHABLE_PSEUDO_PATTERN.sub("", selector).strip()
+        if not selector or selector[-1] in ">+~":
+            return None
+        selectors.append(selector)
+    return selectors
+
+
+def style_rules(rules):
+    """Every style rule, including those nested in @media/@supports"""
+    for rule in rules:
+        if rule.children:
+            yield from style_rules(rule.children)
+        elif rule.at_rule is None:
+            yield rule
+
+
+def _critical_rules(rules, deferrable):
+    kept = []
+    for rule in rules:
+        if rule.children:
+            children = _critical_rules(rule.children, deferrable)
+            if children:
+                kept.append(Rule(rule.prelude, rule.body, children))
+        elif rule.at_rule is not None:
+            if rule.at_rule in KEPT_AT_RULES:
+                kept.append(rule)
+        elif rule.prelude not in deferrable:
+            kept.append(rule)
+    return kept
+
+
+def critical_css(css, deferrable):
+    """The rules of ``css`` whose prelude is not in ``deferrable``"""
+    return "".join(rule.text() for rule in _critical_rules(parse_rules(css), deferrable))
+
+
+@dataclass
+class CriticalResult:
+    """Document with critical CSS inlined and the full stylesheet deferred"""
+    html: str
+    critical_bytes: int
+    full_bytes: int
+
+    def summary(self):
+        return (f"critical CSS {self.critical_bytes} of {self.full_bytes} bytes "
+                f"({self.critical_bytes / max(self.full_bytes, 1):.0%}) inlined, the rest deferred")
+
+
+def _used_preludes(browser, document, candidates, profiles):
+    names = list(candidates)
+    used = set()
+    for profile in profiles:
+        context = browser.new_context(**DEVICE_PROFILES[profile])
+        context.route(re.compile(r"^https?://"), lambda route: route.abort())
+        page = context.new_page()
+        page.goto(document.as_uri(), wait_until="load", timeout=60000)
+        matches = page.evaluate(ABOVE_THE_FOLD_SCRIPT, [candidates[name] for name in names])
+        found = {name for name, matched in zip(names, matches) if matched}
+        logger.info(f"{profile}: {len(found)} of {len(names)} rules used above the fold")
+        used |= found
+        context.close()
+    return used
+
+
+def find_deferrable(html, profiles=CRITICAL_PROFILES, browser=None):
+    """Preludes of the style rules that match nothing above the fold at load
+
+    ``html`` is loaded from a temporary file in ``browser`` (a headless
+    Chromium launched for the purpose by default) at each of ``profiles``;
+    outbound requests are aborted, since web fonts do not change which
+    elements a rule selects.
+    """
+    css = "".join(match.group(2) for match in STYLE_PATTERN.finditer(html, 0, html.lower().find("<body")))
+    preludes = sorted({rule.prelude for rule in style_rules(parse_rules(css))})
+    candidates = {prelude: matchable_selectors(prelude) for prelude in preludes}
+    candidates = {prelude: selectors for prelude, selectors in candidates.items() if selectors is not None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        document = Path(tmp) / "index.html"
+        document.write_text(html, encoding="utf-8")
+        if browser is not None:
+            used = _used_preludes(browser, document, candidates, profiles)
+        else:
+            from playwright.sync_api import sync_playwright
+            with sync_playwright() as playwright:
+                browser = playwright.chromium.launch()
+                try:
+                    used = _used_preludes(browser, document, candidates, profiles)
+                finally:
+                    browser.close()
+    return set(candidates) - used
+
+
+def defer_stylesheet(html, deferrable, stylesheet=None):
+    """Inline the critical rules and load the full stylesheet without blocking
+
+    ``stylesheet`` is ``(href, css)`` of the stylesheet linked by
+    ``support.site_build.externalize`` in a multi-file build; without it
+    the first ``<style>`` of the ``<head>`` is split and the full copy goes
+    before the first script of the ``<body>``.
+    """
+    if stylesheet is not None:
+        href, css = stylesheet
+        critical = critical_css(css, deferrable)
+        replacement = (f'<style>{critical}</style>'
+                       f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+                       f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+        html = html.replace(f'<link rel="stylesheet" href="{href}">', replacement, 1)
+    else:
+        head_end = html.lower().find("<body")
+        match = STYLE_PATTERN.search(html, 0, head_end)
+        if match is None:
+            return CriticalResult(html, 0, 0)
+        css = match.group(2)
+        critical = critical_css(css, deferrable)
+        html = html[:match.start(2)] + critical + html[match.end(2):]
+        script = FIRST_BODY_SCRIPT_PATTERN.search(html, html.lower().find("<body"))
+        position = script.start() if script else html.lower().rfind("</body>")
+        html = html[:position] + f"<style>{css}</style>\n" + html[position:]
+
+    result = CriticalResult(html, len(critical.encode("utf-8")), len(css.encode("utf-8")))
+    logger.info(result.summary())
+    return result
@@ -0,0 +1,316 @@
+"""
+Offline image re-encoding and responsive variants for the site
+
+The embedded PNG/JPEG photos are 1152-2000 px wide and decoded at full
+resolution on every viewport, including the 375 px mobile profile where
+a logo is shown 72 px wide. This pipeline extracts each distinct embedded
+image, re-encodes it to AVIF and WebP at a ladder of widths and rewrites
+every ``<img>`` into a ``<picture>``:
+
+    <picture><source type="image/avif" srcset="... 320w, ... 640w" sizes="...">
+             <source type="image/webp" ...><img src="assets/image.<hash>.png" ...></picture>
+
+``sizes`` comes from ``IMAGE_SLOTS``, which describes the box each kind of
+image is laid out in per breakpoint; for ``object-fit:cover`` boxes the
+image must cover the height too, so the slot width is
+``max(box width, box height x aspect ratio)``. The ``<img>`` keeps the
+original image as the fallback, and ``picture{display:contents}`` keeps
+the wrapper out of layout so the site's CSS applies unchanged.
+
+Encoding needs Pillow; AVIF is skipped when the Pillow build lacks it.
+Encoded variants are cached by source digest, so rebuilds are fast:
+
+    python3 -m support.image_pipeline ../../zanethemba_website.html -o build/responsive
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from support.asset_dedup import DedupResult, IMG_SRC_PATTERN, STYLE_PATTERN, DEFAULT_SOURCE, collect_assets
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build, not to run the suite
+    Image = features = None
+
+logger = logging.getLogger('zanethemba_tests.image_pipeline')
+
+IMAGE_CACHE_DIR = Path(__file__).parent.parent / "build" / ".image_cache"
+
+# Candidate widths; consecutive steps are at most 2x apart so the browser
+# never has to pick a file more than twice the size it needs
+WIDTHS = (96, 160, 320, 480, 640, 960, 1280, 1600, 1920)
+
+FORMATS = {
+    "avif": {"mime": "image/avif", "pil": "AVIF", "options": {"quality": 55, "speed": 8}},
+    "webp": {"mime": "image/webp", "pil": "WEBP", "options": {"quality": 80, "method": 4}},
+}
+
+# Layout box of each kind of image, per breakpoint: (media condition,
+# box width, box height). A height with no width means the width follows
+# the aspect ratio; a width with a height means object-fit:cover.
+IMAGE_SLOTS = {
+    "splash": [(None, "min(340px, 60vw)", None)],
+    "nav-logo": [(None, None, "56px")],
+    "footer-logo": [(None, None, "50px")],
+    "hero": [
+        ("(max-width: 768px)", "100vw", "360px"),
+        ("(max-width: 1100px)", "100vw", "480px"),
+        (None, "50vw", "calc(100vh - 80px)"),
+    ],
+    "break": [
+        ("(max-width: 768px)", "100vw", "400px"),
+        (None, "100vw", "520px"),
+    ],
+    "community": [
+        ("(max-width: 768px)", "calc(100vw - 56px)", "480px"),
+        ("(max-width: 1100px)", "calc(100vw - 120px)", "480px"),
+        (None, "calc((min(100vw - 160px, 1400px) - 80px) / 2)", "480px"),
+    ],
+    "about": [
+        ("(max-width: 768px)", "calc(100vw - 56px)", "360px"),
+        ("(max-width: 1100px)", "calc((100vw - 136px) * 2 / 3)", "360px"),
+        (None, "calc((min(100vw - 160px, 1400px) - 16px) * 2 / 3)", "360px"),
+    ],
+    "default": [(None, "100vw", None)],
+}
+
+# Markup that opens each slot; an image belongs to the nearest one before it
+SLOT_MARKERS = {
+    "splash": re.compile(r'id="splash"'),
+    "nav-logo": re.compile(r'class="nav-logo"'),
+    "footer-logo": re.compile(r'class="footer-logo-wrap"'),
+    "hero": re.compile(r'id="heroCarousel"'),
+    "break": re.compile(r'id="breakCarousel"'),
+    "community": re.compile(r'id="communityCarousel"'),
+    "about": re.compile(r'class="about-img-cell"'),
+}
+# Markup that closes a slot, so later images fall back to "default"
+SLOT_END_PATTERN = re.compile(r"</(?:section|nav|footer)>|<div class=\"page\b")
+
+PICTURE_CSS = "picture{display:contents;}"
+
+
+def require_pillow():
+    if Image is None:
+        raise RuntimeError("The image pipeline needs Pillow: pip install pillow")
+
+
+def available_formats(formats=tuple(FORMATS)):
+    """Requested formats this Pillow build can encode"""
+    require_pillow()
+    return [name for name in formats if features.check(name)]
+
+
+def slot_markers(html):
+    """(offset, slot name) of every slot marker in the document, in order"""
+    return sorted((match.start(), name) for name, pattern in SLOT_MARKERS.items()
+                  for match in pattern.finditer(html))
+
+
+def slot_for(html, offset, markers=None):
+    """Name of the IMAGE_SLOTS entry for the image starting at ``offset``"""
+    before = [marker for marker in (markers or slot_markers(html)) if marker[0] < offset]
+    if not before:
+        return "default"
+    start, name = before[-1]
+    if SLOT_END_PATTERN.search(html, start, offset):
+        return "default"
+    return name
+
+
+def sizes_for(slot, aspect):
+    """``sizes`` attribute for an image of ``aspect`` (width/height) in a slot"""
+    entries = []
+    for media, width, height in IMAGE_SLOTS[slot]:
+        if width and height:
+            length = f"max({width}, calc({height} * {aspect:.3f}))"
+        elif height:
+            length = f"calc({height} * {aspect:.3f})"
+        else:
+            length = width
+        entries.append(f"{media} {length}" if media else length)
+    return ", ".join(entries)
+
+
+def ladder(natural_width, widths=WIDTHS):
+    """Variant widths for an image: the ladder up to its natural width"""
+    chosen = [w for w in widths if w < natural_width]
+    if not chosen or natural_width <= max(widths):
+        chosen.append(natural_width)
+    return sorted(set(chosen))
+
+
+@dataclass
+class Variant:
+    """One re-encoded size of an image"""
+    source: str
+    format: str
+    width: int
+    height: int
+    data: bytes
+
+    @property
+    def filename(self):
+        digest = hashlib.sha256(self.data).hexdigest()[:12]
+        return f"image-{self.width}w.{digest}.{self.format}"
+
+    def as_dict(self):
+        return {"format": self.format, "width": self.width, "height": self.height,
+                "bytes": len(self.data), "file": self.filename}
+
+
+class VariantEncoder:
+    """Encodes image variants, reusing earlier encodes from the on-disk cache"""
+
+    def __init__(self, formats=None, widths=WIDTHS, cache_dir=IMAGE_CACHE_DIR):
+        self.formats = available_formats(formats or tuple(FORMATS))
+        self.widths = widths
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.encoded = 0
+        self.cached = 0
+
+    def _cache_path(self, asset, fmt, width):
+        options = json.dumps(FORMATS[fmt]["options"], sort_keys=True)
+        key = hashlib.sha256(f"{asset.digest}:{fmt}:{width}:{options}".encode()).hexdigest()[:24]
+        return self.cache_dir / f"{key}.{fmt}"
+
+    def encode(self, asset):
+        """Every variant of an asset, smallest first per format"""
+        image = Image.open(io.BytesIO(asset.data))
+        image.load()
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+        variants = []
+        for width in ladder(image.width, self.widths):
+            height = round(image.height * width / image.width)
+            resized = None
+            for fmt in self.formats:
+                path = self._cache_path(asset, fmt, width) if self.cache_dir else None
+                if path is not None and path.exists():
+                    data = path.read_bytes()
+                    self.cached += 1
+                else:
+                    if resized is None:
+                        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    resized.save(buffer, FORMATS[fmt]["pil"], **FORMATS[fmt]["options"])
+                    data = buffer.getvalue()
+                    self.encoded += 1
+                    if path is not None:
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        path.write_bytes(data)
+                variants.append(Variant(asset.digest, fmt, width, height, data))
+        return variants, image.width / image.height
+
+
+@dataclass
+class ResponsiveResult(DedupResult):
+    """Rewritten document, its asset files and the variants per image"""
+    variants: dict = field(default_factory=dict)
+    slots: list = field(default_factory=list)
+
+    def summary(self):
+        count = sum(len(v) for v in self.variants.values())
+        variant_bytes = sum(len(v.data) for vs in self.variants.values() for v in vs)
+        return (f"{self.mode}: {len(self.assets)} images -> {count} variants "
+                f"({variant_bytes / 1024:.0f} KiB), document {self.document_bytes / 1024:.0f} KiB")
+
+    def as_dict(self):
+        data = super().as_dict()
+        data["variants"] = {digest[:12]: [v.as_dict() for v in vs] for digest, vs in self.variants.items()}
+        data["slots"] = self.slots
+        return data
+
+
+def _srcset(variants, fmt, assets_dir):
+    return ", ".join(f"{assets_dir}/{v.filename} {v.width}w" for v in variants if v.format == fmt)
+
+
+def build_responsive(html, encoder=None, assets_dir="assets"):
+    """Rewrite every embedded ``<img>`` into a ``<picture>`` of re-encoded variants"""
+    require_pillow()
+    encoder = encoder or VariantEncoder()
+    original_bytes = len(html.encode("utf-8"))
+    by_uri = collect_assets(html)
+
+    markers = slot_markers(html)
+    encoded = {}
+    files = {}
+    slots = []
+
+    def replace(match):
+        asset = by_uri.get(match.group(3))
+        if asset is None or not asset.mime.startswith("image/"):
+            return match.group(0)
+        if asset.digest not in encoded:
+            encoded[asset.digest] = encoder.encode(asset)
+            files[f"{assets_dir}/{asset.filename}"] = asset.data
+        variants, aspect = encoded[asset.digest]
+        for variant in variants:
+            files[f"{assets_dir}/{variant.filename}"] = variant.data
+
+        slot = slot_for(html, match.start(), markers)
+        sizes = sizes_for(slot, aspect)
+        slots.append({"image": asset.key, "slot": slot, "sizes": sizes})
+        quote = match.group(2)
+        sources = "".join(
+            f'<source type="{FORMATS[fmt]["mime"]}" srcset="{_srcset(variants, fmt, assets_dir)}" sizes="{sizes}">'
+            for fmt in encoder.formats
+        )
+        img = f"{match.group(1)}src={quote}{assets_dir}/{asset.filename}{quote}"
+        return f"<picture>{sources}{img}"
+
+    rewritten = IMG_SRC_PATTERN.sub(replace, html)
+    # Close each <picture> after the <img> it wraps
+    rewritten = re.sub(r"(<picture>(?:<source[^>]*>)*<img\b[^>]*>)", r"\1</picture>", rewritten)
+    rewritten = STYLE_PATTERN.sub(lambda m: m.group(1) + m.group(2) + PICTURE_CSS + m.group(3), rewritten, count=1)
+
+    assets = sorted({a.digest: a for a in by_uri.values() if a.digest in encoded}.values(),
+                    key=lambda a: -len(a.data))
+    result = ResponsiveResult(
+        "responsive", rewritten, original_bytes, assets, files,
+        variants={digest: variants for digest, (variants, _) in encoded.items()},
+        slots=slots
+    )
+    logger.info(f"{result.summary()} ({encoder.encoded} encoded, {encoder.cached} from cache)")
+    return result
+
+
+def build_responsive_file(source, out_dir, name="index.html", **encoder_options):
+    """Run the pipeline on a site file and write the build to ``out_dir``"""
+    result = build_responsive(Path(source).read_text(encoding="utf-8"), VariantEncoder(**encoder_options))
+    result.write(out_dir, name)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-encode embedded images into responsive AVIF/WebP variants")
+    parser.add_argument("source", nargs="?", default=str(DEFAULT_SOURCE), help="Site HTML file (default: the site file)")
+    parser.add_argument("-o", "--out-dir", default="build/responsive", help="Output directory")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma list of formats to emit")
+    parser.add_argument("--no-cache", action="store_true", help="Re-encode every variant")
+    args = parser.parse_args(argv)
+
+    result = build_responsive_file(
+        args.source, args.out_dir,
+        formats=tuple(args.formats.split(",")),
+        cache_dir=None if args.no_cache else IMAGE_CACHE_DIR
+    )
+    print(result.summary())
+    for asset in result.assets:
+        variants = result.variants[asset.digest]
+        print(f"  • {asset.filename} ({len(asset.data)} bytes): "
+              + ", ".join(f"{v.format} {v.width}w {len(v.data)}" for v in variants))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Change-impact analysis for the single-file site
+
+The site HTML is split into sections (head, style, chrome, the three
+pages and the script), each fingerprinted by content hash. Every test is
+mapped to the sections it touches, either declared with
+``@pytest.mark.sections(...)`` or learned from the selectors and text in
+its source (including calls into the ``support.pages`` page objects and
+the shared ``support.checks``).
+A test is affected when the fingerprint of its sections
+differs from the one recorded the last time it passed.
+
+Changes to the head, stylesheet or script can affect anything, so those
+sections count towards every test.
+"""
+import ast
+import hashlib
+import inspect
+import json
+import re
+import textwrap
+from pathlib import Path
+
+from support import checks
+
+PAGES = ("home", "about", "contact")
+GLOBAL_SECTIONS = ("head", "style", "script")
+SECTIONS = GLOBAL_SECTIONS + ("chrome",) + PAGES
+
+DIV_TAG_PATTERN = re.compile(r"<div\b|</div\s*>", re.IGNORECASE)
+STYLE_PATTERN = re.compile(r"<style\b[^>]*>.*?</style\s*>", re.IGNORECASE | re.DOTALL)
+SCRIPT_PATTERN = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+ID_TOKEN_PATTERN = re.compile(r"#([A-Za-z][\w-]*)")
+CLASS_TOKEN_PATTERN = re.compile(r"(?<![\w/])\.([A-Za-z][\w-]*)")
+PAGE_TOKEN_PATTERN = re.compile(r"^(?:page|nav|mob)-(home|about|contact)$")
+
+# Text shorter than this is too generic to locate a section by
+MIN_TEXT_MATCH = 4
+
+# Sections reached through the support.pages page objects
+PAGE_OBJECT_SECTIONS = {
+    "goto_home": ("chrome", "home"),
+    "goto_about": ("chrome", "about"),
+    "goto_contact": ("chrome", "contact"),
+    "click_logo": ("chrome", "home"),
+    "open_mobile_menu": ("chrome",),
+    "close_mobile_menu": ("chrome",),
+    "toggle_mobile_menu": ("chrome",),
+    "wait_for_menu": ("chrome",),
+    "ContactForm": ("chrome", "contact"),
+}
+
+
+def element_end(html, start):
+    """End offset of the <div> element that opens at ``start``"""
+    depth = 0
+    for match in DIV_TAG_PATTERN.finditer(html, start):
+        depth += -1 if match.group(0).startswith("</") else 1
+        if depth == 0:
+            return match.end()
+    return len(html)
+
+
+def split_sections(html):
+    """Return {section: markup} for the site document"""
+    sections = {}
+    body_start = html.lower().find("<body")
+    head = html[:body_start] if body_start != -1 else ""
+    body = html[body_start:] if body_start != -1 else html
+
+    sections["style"] = "".join(m.group(0) for m in STYLE_PATTERN.finditer(head))
+    sections["head"] = STYLE_PATTERN.sub("", head)
+    sections["script"] = "".join(m.group(0) for m in SCRIPT_PATTERN.finditer(body))
+    chrome = SCRIPT_PATTERN.sub("", body)
+
+    for page in PAGES:
+        match = re.search(rf'<div\b[^>]*\bid="page-{page}"', chrome)
+        if not match:
+            sections[page] = ""
+            continue
+        end = element_end(chrome, match.start())
+        sections[page] = chrome[match.start():end]
+        chrome = chrome[:match.start()] + chrome[end:]
+
+    sections["chrome"] = chrome
+    return sections
+
+
+def fingerprint_sections(sections):
+    """Return {section: sha256} for split sections"""
+    return {name: hashlib.sha256(markup.encode()).hexdigest() for name, markup in sections.items()}
+
+
+def _parse(func):
+    """AST of a test function's source, or None when it cannot be read"""
+    try:
+        return ast.parse(textwrap.dedent(inspect.getsource(func)))
+    except (OSError, TypeError, SyntaxError):
+        return None
+
+
+def _string_constants(tree):
+    """Every string literal in a parsed test function"""
+    return [node.value for node in ast.walk(tree)
+            if isinstance(node, ast.Constant) and isinstance(node.value, str)]
+
+
+def _page_object_sections(tree):
+    """Sections a test reaches through page-object calls"""
+    touched = set()
+    for node in ast.walk(tree):
+        name = node.attr if isinstance(node, ast.Attribute) else node.id if isinstance(node, ast.Name) else None
+        touched.update(PAGE_OBJECT_SECTIONS.get(name, ()))
+        # Site.wait_for_page("about") after clicking some other link, or
+        # checks.show_page("about")
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr in ("wait_for_page", "show_page") and node.args
+                and isinstance(node.args[0], ast.Constant) and node.args[0].value in PAGES):
+            touched.add(node.args[0].value)
+    return touched
+
+
+def _shared_check_trees(tree):
+    """ASTs of the ``support.checks`` functions a test refers to"""
+    trees = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name) and node.value.id == "checks"):
+            continue
+        target = getattr(checks, node.attr, None)
+        for func in target if isinstance(target, tuple) else (target,):
+            if inspect.isfunction(func) and func.__module__ == checks.__name__:
+                parsed = _parse(func)
+                if parsed is not None:
+                    trees.append(parsed)
+    return trees
+
+
+def learn_sections(func, sections):
+    """Sections a test touches, inferred from the selectors and text it uses
+
+    Returns an empty set when nothing could be matched, which callers treat
+    as "depends on everything".
+    """
+    tree = _parse(func)
+    if tree is None:
+        return set()
+    touched = _page_object_sections(tree)
+    literals = _string_constants(tree)
+    for shared in _shared_check_trees(tree):
+        literals += _string_constants(shared)
+    for literal in literals:
+        for token in ID_TOKEN_PATTERN.findall(literal):
+            page = PAGE_TOKEN_PATTERN.match(token)
+            if page:
+                touched.add(page.group(1))
+            touched.update(name for name, markup in sections.items() if f'id="{token}"' in markup)
+        for token in CLASS_TOKEN_PATTERN.findall(literal):
+            pattern = re.compile(rf'class="[^"]*(?<![\w-]){re.escape(token)}(?![\w-])')
+            touched.update(name for name, markup in sections.items()
+                           if name not in GLOBAL_SECTIONS and pattern.search(markup))
+        if len(literal) >= MIN_TEXT_MATCH and not literal.startswith(("#", ".")):
+            touched.update(name for name, markup in sections.items()
+                           if name in PAGES + ("chrome",) and f">{literal}<" in markup)
+    return touched
+
+
+def sections_for_item(item, sections):
+    """Sections an item depends on: declared by marker, else learned, else all"""
+    marker = item.get_closest_marker("sections")
+    if marker:
+        declared = set(marker.args)
+    else:
+        declared = learn_sections(getattr(item, "function", None), sections)
+    if not declared:
+        return set(SECTIONS)
+    return declared | set(GLOBAL_SECTIONS)
+
+
+def impact_digest(item_sections, fingerprints):
+    """Single hash over the fingerprints of the sections a test depends on"""
+    joined = "|".join(f"{name}:{fingerprints.get(name, '')}" for name in sorted(item_sections))
+    return hashlib.sha256(joined.encode()).hexdigest()
+
+
+class ImpactAnalyzer:
+    """Select tests whose sections changed since they last passed"""
+
+    def __init__(self, site_path, baseline_path):
+        self.site_path = Path(site_path)
+        self.baseline_path = Path(baseline_path)
+        self.sections = split_sections(self.site_path.read_text(encoding="utf-8", errors="replace"))
+        self.fingerprints = fingerprint_sections(self.sections)
+        self.baseline = self._load_baseline()
+        self.digests = {}
+
+    def _load_baseline(self):
+        if not self.baseline_path.exists():
+            return {}
+        try:
+            with open(self.baseline_path, 'r') as f:
+                return json.load(f).get("tests", {})
+        except (OSError, ValueError):
+            return {}
+
+    def digest_for(self, item):
+        """Impact digest for an item, cached per node id"""
+        if item.nodeid not in self.digests:
+            self.digests[item.nodeid] = impact_digest(sections_for_item(item, self.sections), self.fingerprints)
+        return self.digests[item.nodeid]
+
+    def is_affected(self, item):
+        """True when the item never passed or its sections changed since it did"""
+        return self.baseline.get(item.nodeid) != self.digest_for(item)
+
+    def changed_sections(self, previous_fingerprints):
+        """Names of sections whose fingerprint differs from a previous set"""
+        return sorted(name for name, digest in self.fingerprints.items()
+                      if previous_fingerprints.get(name) != digest)
+
+    def previous_fingerprints(self):
+        """Section fingerprints stored with the baseline, if any"""
+        if not self.baseline_path.exists():
+            return {}
+        try:
+            with open(self.baseline_path, 'r') as f:
+                return json.load(f).get("sections", {})
+        except (OSError, ValueError):
+            return {}
+
+    def record(self, passed, failed, output_path=None):
+        """Store the current digest for tests that passed and drop tests that failed
+
+        A failed test keeps no digest, so it stays affected until it passes
+        again. With ``output_path`` (a parallel worker's shard directory)
+        only this run's changes are written there, for run_tests.py to merge.
+        """
+        digests = {nodeid: self.digests[nodeid] for nodeid in passed if nodeid in self.digests}
+        if output_path is None:
+            write_baseline(self.baseline_path, self.fingerprints, digests, failed)
+            return
+        with open(output_path, 'w') as f:
+            json.dump({"sections": self.fingerprints, "tests": digests, "removed": sorted(failed)},
+                      f, indent=2, sort_keys=True)
+
+
+def write_baseline(path, fingerprints, passed_digests, removed=()):
+    """Merge passed-test digests into a baseline file, dropping the removed node ids"""
+    path = Path(path)
+    data = {"sections": {}, "tests": {}}
+    if path.exists():
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+    data["sections"] = fingerprints
+    tests = data.setdefault("tests", {})
+    for nodeid in removed:
+        tests.pop(nodeid, None)
+    tests.update(passed_digests)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
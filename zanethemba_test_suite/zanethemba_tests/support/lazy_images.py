@@ -0,0 +1,139 @@
+"""
+Deferred hydration of off-screen images for the site build
+
+Every image of the About and Contact pages and of the hidden carousel
+slides is parsed and decoded on first load although only the home page
+hero is visible. This build step detaches those images: inside every
+``.page`` that is not ``active`` and every ``.carousel-slide`` that is not
+``active`` it renames ``src``/``srcset`` to ``data-src``/``data-srcset``
+(``<img>`` and ``<picture><source>``), marks the image ``data-lazy`` and
+adds ``decoding="async"``. Images stored in the inline asset table
+(``support.asset_dedup``) keep their ``data-asset`` and are only skipped
+by its eager hydration.
+
+A small runtime appended after the site script attaches them again:
+
+* when a ``.page`` becomes active (``showPage``), its images except the
+  hidden slides;
+* when a slide becomes active, that slide and the one after it, so the
+  next image is ready a full carousel interval before it is shown;
+* the slide after each initially active one, once the browser is idle.
+
+Both triggers watch the ``active`` class with a MutationObserver, so the
+site script itself is unchanged.
+"""
+import logging
+import re
+from dataclasses import dataclass
+
+from support.asset_dedup import ASSET_TABLE_GLOBAL
+from support.impact import element_end
+
+logger = logging.getLogger('zanethemba_tests.lazy_images')
+
+DEFERRED_CONTAINER_PATTERN = re.compile(
+    r"<div\b(?=[^>]*\bclass=\"(?![^\"]*(?<![\w-])active(?![\w-]))"
+    r"[^\"]*(?<![\w-])(?:page|carousel-slide)(?![\w-])[^\"]*\")[^>]*>", re.I
+)
+IMAGE_TAG_PATTERN = re.compile(r"<(img|source)\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>", re.I)
+ATTACH_ATTRIBUTE_PATTERN = re.compile(r"(\s)(src|srcset)=")
+
+LAZY_RUNTIME = """\
+<script>
+(function () {
+  var table = window.%s || {};
+  function attach(img) {
+    if (!img.hasAttribute('data-lazy')) return;
+    img.removeAttribute('data-lazy');
+    var picture = img.parentElement && img.parentElement.tagName === 'PICTURE' ? img.parentElement : null;
+    if (picture) picture.querySelectorAll('source[data-srcset]').forEach(function (source) {
+      source.setAttribute('srcset', source.getAttribute('data-srcset'));
+      source.removeAttribute('data-srcset');
+    });
+    if (img.hasAttribute('data-srcset')) img.setAttribute('srcset', img.getAttribute('data-srcset'));
+    var src = img.getAttribute('data-src') || table[img.getAttribute('data-asset')];
+    if (src) img.setAttribute('src', src);
+  }
+  function attachAll(root, skipHiddenSlides) {
+    root.querySelectorAll('img[data-lazy]').forEach(function (img) {
+      var slide = img.closest('.carousel-slide');
+      if (skipHiddenSlides && slide && !slide.classList.contains('active')) return;
+      attach(img);
+    });
+  }
+  function attachSlide(slide) {
+    if (!slide) return;
+    attachAll(slide, false);
+    var slides = Array.prototype.slice.call(slide.parentElement.querySelectorAll('.carousel-slide'));
+    var next = slides[(slides.indexOf(slide) + 1) %% slides.length];
+    if (next) attachAll(next, false);
+  }
+  new MutationObserver(function (mutations) {
+    mutations.forEach(function (mutation) {
+      var el = mutation.target;
+      if (!el.classList.contains('active')) return;
+      if (el.classList.contains('page')) attachAll(el, true);
+      else if (el.classList.contains('carousel-slide')) attachSlide(el);
+    });
+  }).observe(document.body, {subtree: true, attributes: true, attributeFilter: ['class']});
+  var idle = window.requestIdleCallback || function (callback) { return requestAnimationFrame(callback); };
+  window.addEventListener('load', function () {
+    idle(function () {
+      document.querySelectorAll('.page.active .carousel-slide.active').forEach(attachSlide);
+    });
+  });
+})();
+</script>
+""" % ASSET_TABLE_GLOBAL
+
+
+@dataclass
+class LazyResult:
+    """Document with deferred images and how many images load eagerly"""
+    html: str
+    eager: int
+    deferred: int
+
+    def summary(self):
+        return f"{self.eager} images attached at load, {self.deferred} deferred"
+
+
+def deferred_spans(html):
+    """(start, end) of every inactive page and hidden slide, outermost only"""
+    spans = []
+    for match in DEFERRED_CONTAINER_PATTERN.finditer(html):
+        if spans and match.start() < spans[-1][1]:
+            continue
+        spans.append((match.start(), element_end(html, match.start())))
+    return spans
+
+
+def _defer_tag(tag):
+    tag = ATTACH_ATTRIBUTE_PATTERN.sub(r"\1data-\2=", tag)
+    if tag.lower().startswith("<img"):
+        closing = "/>" if tag.endswith("/>") else ">"
+        tag = tag[:-len(closing)].rstrip() + ' data-lazy decoding="async"' + closing
+    return tag
+
+
+def defer_images(html):
+    """Detach the images of inactive pages and hidden carousel slides"""
+    spans = deferred_spans(html)
+    out = []
+    position = 0
+    deferred = 0
+    for start, end in spans:
+        out.append(html[position:start])
+        segment = html[start:end]
+        deferred += len(re.findall(r"<img\b", segment, re.I))
+        out.append(IMAGE_TAG_PATTERN.sub(lambda m: _defer_tag(m.group(0)), segment))
+        position = end
+    out.append(html[position:])
+    html = "".join(out)
+
+    if deferred:
+        position = html.lower().rfind("</body>")
+        html = html[:position] + LAZY_RUNTIME + html[position:]
+    result = LazyResult(html, len(re.findall(r"<img\b", html, re.I)) - deferred, deferred)
+    logger.info(result.summary())
+    return result
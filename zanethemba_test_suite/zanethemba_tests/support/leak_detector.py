@@ -0,0 +1,149 @@
+"""
+Memory leak detection over repeated SPA navigation, via the Chromium CDP
+
+After a warmup, the detector runs navigation cycles in batches, forces a
+garbage collection between batches and samples the JS heap, DOM node,
+event listener and detached node counts. A least-squares line through
+the samples gives the growth per cycle; a metric leaks when that slope is
+over its threshold and the samples actually follow the line (high R²),
+so one-off allocations and GC noise do not count as growth.
+"""
+import logging
+import statistics
+from dataclasses import dataclass, field
+
+from playwright.sync_api import Error as PlaywrightError
+
+logger = logging.getLogger('zanethemba_tests.leak_detector')
+
+# Growth per cycle above which a steady trend counts as a leak
+LEAK_THRESHOLDS = {
+    "js_heap_used": 2048,
+    "dom_nodes": 0.5,
+    "event_listeners": 0.5,
+    "detached_nodes": 0.5,
+}
+
+# Minimum goodness of fit for a slope to count as sustained growth
+MIN_TREND_R2 = 0.6
+
+# One navigation cycle through every page, run inside the page
+NAVIGATION_CYCLES_SCRIPT = """
+(cycles) => {
+  for (let i = 0; i < cycles; i++) {
+    for (const id of ['nav-about', 'nav-contact', 'nav-home']) document.getElementById(id).click();
+  }
+}
+"""
+
+
+def fit_slope(xs, ys):
+    """Least-squares slope, intercept and R² of ys over xs
+
+    Computed by hand: statistics.linear_regression/correlation need 3.10.
+    """
+    if len(xs) < 2 or len(set(ys)) == 1 or len(set(xs)) == 1:
+        return 0.0, ys[0], 0.0
+    mean_x = statistics.fmean(xs)
+    mean_y = statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    syy = sum((y - mean_y) ** 2 for y in ys)
+    sxy = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    slope = sxy / sxx
+    return slope, mean_y - slope * mean_x, sxy * sxy / (sxx * syy)
+
+
+@dataclass
+class LeakReport:
+    """Samples and fitted growth per metric"""
+    cycles: list
+    samples: dict
+    slopes: dict = field(default_factory=dict)
+    r2: dict = field(default_factory=dict)
+    leaks: list = field(default_factory=list)
+
+    def as_dict(self):
+        return {
+            "cycles": self.cycles,
+            "samples": self.samples,
+            "slope_per_cycle": self.slopes,
+            "r2": self.r2,
+            "leaks": self.leaks,
+        }
+
+
+class LeakDetector:
+    """Samples memory counters of one page through a CDP session"""
+
+    def __init__(self, page, thresholds=None):
+        self.page = page
+        self.thresholds = dict(thresholds or LEAK_THRESHOLDS)
+        self.cdp = page.context.new_cdp_session(page)
+        self.cdp.send("Performance.enable")
+        self.cdp.send("HeapProfiler.enable")
+        self._detached_supported = True
+
+    def collect_garbage(self):
+        """Force a full GC (twice, so objects freed by finalizers go too)"""
+        self.cdp.send("HeapProfiler.collectGarbage")
+        self.cdp.send("HeapProfiler.collectGarbage")
+
+    def _detached_nodes(self):
+        if not self._detached_supported:
+            return None
+        try:
+            return len(self.cdp.send("DOM.getDetachedDomNodes").get("detachedNodes", []))
+        except PlaywrightError as e:
+            # Experimental method, missing from older Chromium builds
+            logger.info(f"Detached node count unavailable: {e}")
+            self._detached_supported = False
+            return None
+
+    def sample(self):
+        """Collect garbage and read the current counters"""
+        self.collect_garbage()
+        metrics = {m["name"]: m["value"] for m in self.cdp.send("Performance.getMetrics")["metrics"]}
+        counters = self.cdp.send("Memory.getDOMCounters")
+        return {
+            "js_heap_used": metrics.get("JSHeapUsedSize"),
+            "dom_nodes": counters.get("nodes"),
+            "event_listeners": counters.get("jsEventListeners"),
+            "detached_nodes": self._detached_nodes(),
+        }
+
+    def run(self, cycles=300, sample_every=10, warmup=20, cycle_script=NAVIGATION_CYCLES_SCRIPT):
+        """Run navigation cycles, sampling every ``sample_every`` cycles, and fit growth"""
+        logger.info(f"Leak check: {warmup} warmup + {cycles} cycles, sampling every {sample_every}")
+        self.page.evaluate(cycle_script, warmup)
+
+        done = 0
+        xs = []
+        samples = {name: [] for name in self.thresholds}
+        while True:
+            current = self.sample()
+            xs.append(done)
+            for name in samples:
+                samples[name].append(current.get(name))
+            if done >= cycles:
+                break
+            batch = min(sample_every, cycles - done)
+            self.page.evaluate(cycle_script, batch)
+            done += batch
+
+        report = LeakReport(cycles=xs, samples=samples)
+        for name, values in samples.items():
+            if any(value is None for value in values):
+                continue
+            slope, _, r2 = fit_slope(xs, values)
+            report.slopes[name] = round(slope, 4)
+            report.r2[name] = round(r2, 4)
+            if slope > self.thresholds[name] and r2 >= MIN_TREND_R2:
+                report.leaks.append(
+                    f"{name} grows {slope:.2f}/cycle (R²={r2:.2f}, threshold {self.thresholds[name]})"
+                )
+            logger.info(f"{name}: {values[0]} -> {values[-1]}, slope {slope:.3f}/cycle, R² {r2:.2f}")
+        return report
+
+    def close(self):
+        """Detach the CDP session"""
+        self.cdp.detach()
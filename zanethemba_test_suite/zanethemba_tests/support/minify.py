@@ -0,0 +1,131 @@
+"""
+Dependency-free HTML, CSS and JavaScript minifiers for the site build
+
+They are deliberately conservative so a build renders exactly like its
+source: string literals are never touched, HTML text keeps one space
+wherever it had whitespace (outside ``<pre>`` and ``<textarea>``), quoted
+attribute values are copied verbatim, and JavaScript keeps its line breaks so automatic
+semicolon insertion behaves as before. Only comments, indentation and
+redundant whitespace are removed.
+"""
+import re
+
+CSS_CHUNK_PATTERN = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)""", re.S)
+CSS_PUNCTUATION_PATTERN = re.compile(r"\s*([{};,>])\s*")
+
+JS_TOKEN_PATTERN = re.compile(
+    r"""("(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"""  # strings
+    r"""|(/\*.*?\*/|//[^\n]*)""",                                      # comments
+    re.S
+)
+
+HTML_TOKEN_PATTERN = re.compile(
+    r"(<!--.*?-->)"
+    r"|(<(script|style|pre|textarea)\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>.*?</\3\s*>)"
+    r"|(<(?:[^>\"']|\"[^\"]*\"|'[^']*')*>)",
+    re.S | re.I
+)
+TAG_PART_PATTERN = re.compile(r"\"[^\"]*\"|'[^']*'|[^\"']+")
+RAW_ELEMENT_PATTERN = re.compile(r"(<(\w+)\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>)(.*?)(</\2\s*>)", re.S)
+SCRIPT_TYPE_PATTERN = re.compile(r"\btype\s*=\s*[\"']?([^\"'\s>]+)", re.I)
+JS_TYPES = {"text/javascript", "application/javascript", "module"}
+
+
+def minify_css(css):
+    """Strip comments and whitespace that does not change the stylesheet"""
+    out = []
+    position = 0
+    for match in CSS_CHUNK_PATTERN.finditer(css):
+        out.append(_compact_css(css[position:match.start()]))
+        if match.group(1):
+            out.append(match.group(1))
+        position = match.end()
+    out.append(_compact_css(css[position:]))
+    return "".join(out).strip()
+
+
+def _compact_css(code):
+    code = re.sub(r"\s+", " ", code)
+    code = CSS_PUNCTUATION_PATTERN.sub(r"\1", code)
+    code = re.sub(r":\s+", ":", code)
+    return code.replace(";}", "}")
+
+
+def minify_js(js):
+    """Strip comments, indentation and blank lines, keeping line breaks
+
+    Regular expression literals are not recognised; the site has none, and
+    a build that meets one containing quotes or ``//`` must not minify it.
+    """
+    out = []
+    position = 0
+    for match in JS_TOKEN_PATTERN.finditer(js):
+        out.append(js[position:match.start()])
+        if match.group(1):
+            out.append(match.group(1))
+        elif "\n" in match.group(2):
+            out.append("\n")
+        position = match.end()
+    out.append(js[position:])
+    code = "".join(out)
+
+    lines = []
+    for line in code.split("\n"):
+        line = _compact_js_line(line)
+        if line:
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def _compact_js_line(line):
+    # Collapse runs of spaces outside string literals
+    parts = []
+    position = 0
+    for match in JS_TOKEN_PATTERN.finditer(line):
+        parts.append(re.sub(r"[ \t]+", " ", line[position:match.start()]))
+        parts.append(match.group(0))
+        position = match.end()
+    parts.append(re.sub(r"[ \t]+", " ", line[position:]))
+    return "".join(parts).strip()
+
+
+def _compact_tag(tag):
+    # Collapse whitespace between attributes, leaving quoted values alone
+    return "".join(part if part[:1] in "\"'" else re.sub(r"\s+", " ", part)
+                   for part in TAG_PART_PATTERN.findall(tag))
+
+
+def _minify_raw_element(element):
+    match = RAW_ELEMENT_PATTERN.match(element)
+    if not match:
+        return element
+    open_tag, name, body, close_tag = match.group(1), match.group(2).lower(), match.group(3), match.group(4)
+    if name == "style":
+        body = minify_css(body)
+    elif name == "script":
+        script_type = SCRIPT_TYPE_PATTERN.search(open_tag)
+        if script_type is None or script_type.group(1).lower() in JS_TYPES:
+            body = minify_js(body)
+    return open_tag + body + close_tag
+
+
+def minify_html(html):
+    """Minify a document, including its inline CSS and JavaScript"""
+    out = []
+    position = 0
+
+    def text(chunk):
+        return re.sub(r"\s+", " ", chunk)
+
+    for match in HTML_TOKEN_PATTERN.finditer(html):
+        out.append(text(html[position:match.start()]))
+        if match.group(2):
+            out.append(_minify_raw_element(match.group(2)))
+        elif match.group(4):
+            out.append(_compact_tag(match.group(4)))
+        position = match.end()
+    out.append(text(html[position:]))
+
+    # Removed comments can leave whitespace from both sides next to each other
+    html = "".join(out)
+    return re.sub(r"(?<=>) {2,}(?=<)", " ", html).strip() + "\n"
@@ -0,0 +1,198 @@
+"""
+Offline network policy for browser contexts
+
+The site links Google Fonts; on offline CI runners every page load would
+stall on that request until it fails. The policy serves font stylesheets
+and WOFF2 files from a local cache, blocks every other outbound request,
+and logs each intercepted request with its size and latency.
+
+Populate the cache on a machine with network access and commit
+``font_cache/``, since the offline runners cannot fetch it themselves:
+
+    python3 -m support.network --refresh
+"""
+import argparse
+import hashlib
+import logging
+import re
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+logger = logging.getLogger('zanethemba_tests.network')
+
+FONT_CACHE_DIR = Path(__file__).parent.parent / "font_cache"
+FONT_CSS_HOST = "fonts.googleapis.com"
+FONT_FILE_HOST = "fonts.gstatic.com"
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+LOCAL_SCHEMES = {"file", "data", "blob", "about"}
+
+# Google only serves WOFF2 URLs to browsers it recognises
+FONT_FETCH_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+FONT_CSS_LINK_PATTERN = re.compile(r'href="(https://fonts\.googleapis\.com/[^"]+)"')
+FONT_FILE_URL_PATTERN = re.compile(r"url\((https://fonts\.gstatic\.com/[^)]+)\)")
+
+
+def css_cache_path(url, cache_dir=FONT_CACHE_DIR):
+    """Cache location of a font stylesheet, keyed by its full (unescaped) URL"""
+    digest = hashlib.sha256(unquote(url).encode()).hexdigest()[:16]
+    return cache_dir / "css" / f"{digest}.css"
+
+
+def font_cache_path(url, cache_dir=FONT_CACHE_DIR):
+    """Cache location of a font file, mirroring its path on fonts.gstatic.com"""
+    return cache_dir / "files" / urlsplit(url).path.lstrip("/")
+
+
+def is_local(url):
+    """True for requests that never leave the machine"""
+    parts = urlsplit(url)
+    return parts.scheme in LOCAL_SCHEMES or parts.hostname in LOCAL_HOSTS
+
+
+class NetworkPolicy:
+    """Route handler that serves cached fonts and blocks other external traffic
+
+    Note that Playwright disables the HTTP cache in any context with routes,
+    so tests that measure browser caching must use a context without it.
+    """
+
+    def __init__(self, cache_dir=FONT_CACHE_DIR, allow_external=False):
+        self.cache_dir = Path(cache_dir)
+        self.allow_external = allow_external
+        self.requests = []
+
+    def install(self, context):
+        """Intercept every non-local request made by pages in the context"""
+        context.route(lambda url: not is_local(url), self._handle)
+
+    async def install_async(self, context):
+        """Same as install() for a playwright.async_api context"""
+        await context.route(lambda url: not is_local(url), self._handle_async)
+
+    def _handle(self, route):
+        start = time.perf_counter()
+        action, response, size = self.resolve(route.request.url)
+        if response is not None:
+            route.fulfill(**response)
+        elif action == "allowed":
+            route.continue_()
+        else:
+            route.abort("blockedbyclient")
+        self._record(route.request.url, action, size, start)
+
+    async def _handle_async(self, route):
+        start = time.perf_counter()
+        action, response, size = self.resolve(route.request.url)
+        if response is not None:
+            await route.fulfill(**response)
+        elif action == "allowed":
+            await route.continue_()
+        else:
+            await route.abort("blockedbyclient")
+        self._record(route.request.url, action, size, start)
+
+    def resolve(self, url):
+        """Decide what to do with a request: (action, fulfill kwargs or None, bytes)"""
+        host = urlsplit(url).hostname
+
+        if host == FONT_CSS_HOST:
+            path = css_cache_path(url, self.cache_dir)
+            if path.exists():
+                body = path.read_bytes()
+                return "font-cache", {"status": 200, "content_type": "text/css", "body": body}, len(body)
+            # An empty stylesheet lets the page fall back to system fonts at once
+            body = b"/* font stylesheet not cached */"
+            return "font-cache-miss", {"status": 200, "content_type": "text/css", "body": body}, len(body)
+
+        if host == FONT_FILE_HOST:
+            path = font_cache_path(url, self.cache_dir)
+            if path.exists():
+                body = path.read_bytes()
+                response = {
+                    "status": 200,
+                    "content_type": "font/woff2",
+                    "body": body,
+                    "headers": {"Access-Control-Allow-Origin": "*"},
+                }
+                return "font-cache", response, len(body)
+            return "font-cache-miss", {"status": 404, "body": b""}, 0
+
+        if self.allow_external:
+            return "allowed", None, 0
+        return "blocked", None, 0
+
+    def _record(self, url, action, size, start):
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.requests.append({"url": url, "action": action, "bytes": size, "latency_ms": latency_ms})
+        logger.info(f"[{action}] {url} {size} bytes in {latency_ms:.1f} ms")
+
+    def mark(self):
+        """Position in the request log, for summarising a single test"""
+        return len(self.requests)
+
+    def summary(self, since=0):
+        """Counts, bytes and latency of requests intercepted since a mark"""
+        entries = self.requests[since:]
+        return {
+            "requests": len(entries),
+            "bytes": sum(e["bytes"] for e in entries),
+            "latency_ms": round(sum(e["latency_ms"] for e in entries), 1),
+            "blocked": sum(1 for e in entries if e["action"] == "blocked"),
+            "cache_misses": sum(1 for e in entries if e["action"] == "font-cache-miss"),
+        }
+
+
+def _fetch(url):
+    request = urllib.request.Request(url, headers={"User-Agent": FONT_FETCH_USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def site_font_stylesheets(site_html):
+    """URLs of the Google Fonts stylesheets linked from a site file"""
+    html = Path(site_html).read_text(encoding="utf-8", errors="replace")
+    return sorted({url.replace("&amp;", "&") for url in FONT_CSS_LINK_PATTERN.findall(html)})
+
+
+def refresh_font_cache(site_html, cache_dir=FONT_CACHE_DIR):
+    """Download every Google Fonts stylesheet linked from the site, and its WOFF2 files"""
+    stylesheets = site_font_stylesheets(site_html)
+    for css_url in stylesheets:
+        css = _fetch(css_url)
+        path = css_cache_path(css_url, cache_dir)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(css)
+        print(f"  • {css_url} -> {path}")
+
+        for font_url in sorted(set(FONT_FILE_URL_PATTERN.findall(css.decode()))):
+            font_path = font_cache_path(font_url, cache_dir)
+            if font_path.exists():
+                continue
+            font_path.parent.mkdir(parents=True, exist_ok=True)
+            font_path.write_bytes(_fetch(font_url))
+            print(f"    - {font_url}")
+    return len(stylesheets)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the offline font cache")
+    parser.add_argument("--refresh", action="store_true", help="Download fonts linked from the site")
+    parser.add_argument("--site", default=str(Path(__file__).parent.parent.parent.parent / "zanethemba_website.html"),
+                        help="Site HTML file to read font links from")
+    args = parser.parse_args(argv)
+    if not args.refresh:
+        parser.print_help()
+        return 1
+    count = refresh_font_cache(args.site)
+    print(f"✓ Cached {count} font stylesheet(s) in {FONT_CACHE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Pool of warm, pre-loaded pages keyed by device profile
+
+Loading the 3.6 MB single-file site costs far more than any individual
+test, so pages are created once per device profile and reset between
+tests instead of being rebuilt from scratch.
+"""
+import logging
+
+from playwright.sync_api import Error as PlaywrightError
+
+from support.readiness import wait_for_site_ready, install_skip_splash
+
+logger = logging.getLogger('zanethemba_tests.page_pool')
+
+DEVICE_PROFILES = {
+    "desktop": {
+        "viewport": {"width": 1920, "height": 1080},
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+    },
+    "mobile": {
+        "viewport": {"width": 375, "height": 667},
+        "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 14_0 like Mac OS X)",
+    },
+    "tablet": {
+        "viewport": {"width": 768, "height": 1024},
+        "user_agent": "Mozilla/5.0 (iPad; CPU OS 14_0 like Mac OS X)",
+    },
+}
+
+# Puts a used page back into the state of a fresh load
+RESET_SCRIPT = """
+() => {
+  const menu = document.getElementById('mobileMenu');
+  if (menu && menu.classList.contains('open')) toggleMenu();
+  showPage('home');
+
+  const form = document.getElementById('contactForm');
+  if (form) { form.reset(); form.style.display = ''; }
+  const success = document.getElementById('formSuccess');
+  if (success) success.style.display = '';
+
+  if (window.heroGoTo) window.heroGoTo(0);
+  document.body.style.overflow = '';
+  if (document.activeElement) document.activeElement.blur();
+  window.scrollTo({top: 0, behavior: 'instant'});
+
+  try { localStorage.clear(); sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+class PagePool:
+    """Hands out warm pages per device profile and resets them on release"""
+
+    def __init__(self, browser, base_url, skip_splash=False, network_policy=None):
+        self.browser = browser
+        self.base_url = base_url
+        self.skip_splash = skip_splash
+        self.network_policy = network_policy
+        self._contexts = {}
+        self._idle = {profile: [] for profile in DEVICE_PROFILES}
+
+    def context(self, profile="desktop"):
+        """Return the shared context for a device profile, creating it on first use"""
+        if profile not in self._contexts:
+            logger.info(f"Creating pooled context for '{profile}'")
+            context = self.browser.new_context(**DEVICE_PROFILES[profile])
+            if self.skip_splash:
+                install_skip_splash(context)
+            if self.network_policy is not None:
+                self.network_policy.install(context)
+            self._contexts[profile] = context
+        return self._contexts[profile]
+
+    def acquire(self, profile="desktop"):
+        """Return a ready page for the profile, loading one only if none are idle"""
+        idle = self._idle[profile]
+        while idle:
+            page = idle.pop()
+            if not page.is_closed():
+                logger.info(f"Reusing warm '{profile}' page")
+                return page
+
+        logger.info(f"Loading new '{profile}' page from {self.base_url}")
+        page = self.context(profile).new_page()
+        page.goto(self.base_url, wait_until="domcontentloaded", timeout=30000)
+        wait_for_site_ready(page)
+        return page
+
+    def release(self, page, profile="desktop"):
+        """Reset a page and return it to the pool, discarding it if the reset fails"""
+        if page.is_closed():
+            return
+        if page.url != self.base_url:
+            logger.info(f"Discarding '{profile}' page that navigated to {page.url}")
+            page.close()
+            return
+        try:
+            page.evaluate(RESET_SCRIPT)
+            page.context.clear_cookies()
+        except PlaywrightError as e:
+            logger.error(f"Discarding '{profile}' page after failed reset: {e}")
+            page.close()
+            return
+        self._idle[profile].append(page)
+
+    def close(self):
+        """Close every pooled context"""
+        for profile, context in self._contexts.items():
+            logger.info(f"Closing pooled context for '{profile}'")
+            context.close()
+        self._contexts.clear()
+        for idle in self._idle.values():
+            idle.clear()
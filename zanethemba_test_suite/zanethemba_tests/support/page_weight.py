@@ -0,0 +1,206 @@
+"""
+Static page-weight analysis of the single-file site
+
+Splits the HTML document into markup, inline CSS, inline JavaScript and
+embedded data URIs (images, fonts) without a browser. Every data URI is
+reported with its encoded size in the document and its decoded size, so
+the cost of base64 embedding (about a third on top of the binary) is
+visible per asset, and payloads embedded more than once are flagged as
+duplicates. Budgets come from a JSON file and cover the totals per
+category as well as the largest single image.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import re
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger('zanethemba_tests.page_weight')
+
+BUDGETS_PATH = Path(__file__).parent.parent / "page_weight_budgets.json"
+
+STYLE_PATTERN = re.compile(rb"<style\b[^>]*>(.*?)</style\s*>", re.S | re.I)
+SCRIPT_PATTERN = re.compile(rb"<script\b(?![^>]*\bsrc\s*=)[^>]*>(.*?)</script\s*>", re.S | re.I)
+DATA_URI_PATTERN = re.compile(rb"data:([\w.+-]+/[\w.+-]+)((?:;[\w-]+=[\w.-]+)*);base64,([A-Za-z0-9+/]+=*)")
+
+
+def decoded_size(encoded_length, padding):
+    """Binary size of ``encoded_length`` base64 characters ending in ``padding`` '='"""
+    return encoded_length * 3 // 4 - padding
+
+
+def data_uri_category(mime):
+    """Category a data URI counts towards"""
+    if mime.startswith("image/"):
+        return "images"
+    if mime.startswith("font/") or "font" in mime:
+        return "fonts"
+    return "other_data"
+
+
+@dataclass
+class DataUri:
+    """One base64 data URI in the document"""
+    mime: str
+    offset: int
+    encoded_bytes: int
+    decoded_bytes: int
+    container: str
+    digest: str
+    duplicate: bool = False
+
+    def as_dict(self):
+        return {
+            "mime": self.mime,
+            "digest": self.digest,
+            "duplicate": self.duplicate,
+            "offset": self.offset,
+            "encoded_bytes": self.encoded_bytes,
+            "decoded_bytes": self.decoded_bytes,
+            "container": self.container,
+        }
+
+
+@dataclass
+class PageWeight:
+    """Byte breakdown of one HTML document"""
+    path: str
+    total_bytes: int
+    categories: dict
+    data_uris: list = field(default_factory=list)
+
+    @property
+    def images(self):
+        return [uri for uri in self.data_uris if data_uri_category(uri.mime) == "images"]
+
+    @property
+    def largest_image(self):
+        return max(self.images, key=lambda uri: uri.encoded_bytes, default=None)
+
+    @property
+    def duplicate_bytes(self):
+        return sum(uri.encoded_bytes for uri in self.data_uris if uri.duplicate)
+
+    @property
+    def base64_overhead_bytes(self):
+        return sum(uri.encoded_bytes - uri.decoded_bytes for uri in self.data_uris)
+
+    def metrics(self):
+        """Flat metrics the budgets are checked against"""
+        largest = self.largest_image
+        metrics = {"total_bytes": self.total_bytes}
+        metrics.update({f"{name}_bytes": size for name, size in self.categories.items()})
+        metrics["image_count"] = len(self.images)
+        metrics["largest_image_bytes"] = largest.encoded_bytes if largest else 0
+        metrics["base64_overhead_bytes"] = self.base64_overhead_bytes
+        metrics["duplicate_data_uri_bytes"] = self.duplicate_bytes
+        return metrics
+
+    def summary(self):
+        parts = ", ".join(f"{name} {size / 1024:.0f} KiB" for name, size in self.categories.items())
+        return (f"{Path(self.path).name}: {self.total_bytes / 1024:.0f} KiB ({parts}); "
+                f"{len(self.images)} embedded images, {self.base64_overhead_bytes / 1024:.0f} KiB base64 overhead, "
+                f"{self.duplicate_bytes / 1024:.0f} KiB duplicated")
+
+    def as_dict(self):
+        return {
+            "path": self.path,
+            "metrics": self.metrics(),
+            "data_uris": [uri.as_dict() for uri in self.data_uris],
+        }
+
+
+def _spans(pattern, data):
+    """(start, end) of the bodies of every match"""
+    return [(m.start(1), m.end(1)) for m in pattern.finditer(data)]
+
+
+def _container(offset, style_spans, script_spans):
+    for start, end in style_spans:
+        if start <= offset < end:
+            return "css"
+    for start, end in script_spans:
+        if start <= offset < end:
+            return "js"
+    return "markup"
+
+
+def analyze(path):
+    """Break an HTML document down into bytes per category"""
+    data = Path(path).read_bytes()
+    style_spans = _spans(STYLE_PATTERN, data)
+    script_spans = _spans(SCRIPT_PATTERN, data)
+
+    categories = {
+        "markup": 0,
+        "css": sum(end - start for start, end in style_spans),
+        "js": sum(end - start for start, end in script_spans),
+        "images": 0,
+        "fonts": 0,
+        "other_data": 0,
+    }
+    data_uris = []
+    seen = set()
+    for match in DATA_URI_PATTERN.finditer(data):
+        payload = match.group(3)
+        uri = DataUri(
+            mime=match.group(1).decode().lower(),
+            offset=match.start(),
+            encoded_bytes=match.end() - match.start(),
+            decoded_bytes=decoded_size(len(payload), len(payload) - len(payload.rstrip(b"="))),
+            container=_container(match.start(), style_spans, script_spans),
+            digest=hashlib.sha256(payload).hexdigest()[:16],
+        )
+        uri.duplicate = uri.digest in seen
+        seen.add(uri.digest)
+        data_uris.append(uri)
+        # Embedded assets count on their own, not towards the CSS/JS around them
+        if uri.container != "markup":
+            categories[uri.container] -= uri.encoded_bytes
+        categories[data_uri_category(uri.mime)] += uri.encoded_bytes
+
+    categories["markup"] = len(data) - sum(categories.values())
+    return PageWeight(str(path), len(data), categories, data_uris)
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """Budgets from the JSON config file"""
+    with open(path, 'r') as f:
+        return json.load(f)["budgets"]
+
+
+def check_budgets(weight, budgets):
+    """Return a message for each metric over its budget"""
+    metrics = weight.metrics()
+    violations = []
+    for name, limit in budgets.items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}={value} exceeds budget {limit}")
+    return violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Break down the page weight of HTML documents")
+    parser.add_argument("documents", nargs="*",
+                        default=[str(Path(__file__).parent.parent.parent.parent / "zanethemba_website.html")],
+                        help="HTML files to analyze (default: the site file)")
+    parser.add_argument("--budgets", default=str(BUDGETS_PATH), help="Budget config file")
+    args = parser.parse_args(argv)
+    budgets = load_budgets(args.budgets)
+
+    over = 0
+    for document in args.documents:
+        weight = analyze(document)
+        print(weight.summary())
+        for violation in check_budgets(weight, budgets):
+            print(f"  ✗ {violation}")
+            over += 1
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Page objects for the Zanethemba website
+
+Navigation on the site is synchronous class toggling followed by a smooth
+scroll to the top and a restart of the ``anim-fadeup`` entrance
+animations; the hamburger icon morphs with a 0.3 s CSS transition. The
+page objects wait for those transitions to actually finish instead of
+sleeping for a guessed delay.
+"""
+import logging
+
+from playwright.sync_api import expect
+
+logger = logging.getLogger('zanethemba_tests.pages')
+
+PAGES = ("home", "about", "contact")
+
+# Longest a navigation or menu transition may take to settle
+TRANSITION_TIMEOUT = 5000
+
+# True once the page section is shown (the state change itself)
+PAGE_ACTIVE_SCRIPT = """
+(name) => {
+  const section = document.getElementById('page-' + name);
+  return !!section && section.classList.contains('active');
+}
+"""
+
+# True once the section is shown, scrolled to the top and its entrance
+# animations have finished
+PAGE_SETTLED_SCRIPT = """
+(name) => {
+  const section = document.getElementById('page-' + name);
+  if (!section || !section.classList.contains('active')) return false;
+  if (window.scrollY >= 1) return false;
+  return Array.from(section.querySelectorAll('.anim-fadeup')).every(el =>
+    el.getAnimations().every(a => a.playState === 'finished'));
+}
+"""
+
+# True once the menu is in the requested state and the hamburger icon has
+# finished morphing
+MENU_SETTLED_SCRIPT = """
+(open) => {
+  const menu = document.getElementById('mobileMenu');
+  const button = document.getElementById('hamburger');
+  if (!menu || !button) return false;
+  if (menu.classList.contains('open') !== open) return false;
+  if (button.classList.contains('open') !== open) return false;
+  return button.getAnimations({subtree: true}).every(a => a.playState !== 'running');
+}
+"""
+
+
+class Site:
+    """Navigation and mobile menu of the single-page site"""
+
+    def __init__(self, page):
+        self.page = page
+
+    def current_page(self):
+        """Name of the page section currently shown"""
+        return self.page.evaluate(
+            "() => (document.querySelector('.page.active') || {id: ''}).id.replace('page-', '')"
+        )
+
+    def wait_for_page(self, name, settle=True, timeout=TRANSITION_TIMEOUT):
+        """Wait until a page section is shown, and by default fully settled
+
+        With ``settle=False`` only the switch of the active section is
+        awaited, which is enough for checks on content that does not animate.
+        """
+        script = PAGE_SETTLED_SCRIPT if settle else PAGE_ACTIVE_SCRIPT
+        self.page.wait_for_function(script, arg=name, timeout=timeout)
+        return self
+
+    def goto(self, name, settle=True):
+        """Open a page through the visible navigation (desktop links or mobile menu)"""
+        logger.info(f"Navigating to '{name}'")
+        link = self.page.locator(f"#nav-{name}")
+        if link.is_visible():
+            link.click()
+        else:
+            self.open_mobile_menu()
+            self.page.locator(f"#mob-{name}").click()
+            self.wait_for_menu(open=False)
+        return self.wait_for_page(name, settle)
+
+    def goto_home(self, settle=True):
+        """Open the Home page"""
+        return self.goto("home", settle)
+
+    def goto_about(self, settle=True):
+        """Open the About page"""
+        return self.goto("about", settle)
+
+    def goto_contact(self, settle=True):
+        """Open the Contact page"""
+        return self.goto("contact", settle)
+
+    def click_logo(self, settle=True):
+        """Return home through the navigation logo"""
+        self.page.locator(".nav-logo").click()
+        return self.wait_for_page("home", settle)
+
+    def is_menu_open(self):
+        """Whether the mobile menu is currently open"""
+        return self.page.evaluate(
+            "() => document.getElementById('mobileMenu').classList.contains('open')"
+        )
+
+    def wait_for_menu(self, open, timeout=TRANSITION_TIMEOUT):
+        """Wait for the mobile menu and hamburger icon to finish opening or closing"""
+        self.page.wait_for_function(MENU_SETTLED_SCRIPT, arg=open, timeout=timeout)
+        return self
+
+    def toggle_mobile_menu(self):
+        """Click the hamburger and wait for the resulting state"""
+        expected = not self.is_menu_open()
+        self.page.locator("#hamburger").click()
+        return self.wait_for_menu(open=expected)
+
+    def open_mobile_menu(self):
+        """Open the mobile menu unless it already is"""
+        if not self.is_menu_open():
+            self.toggle_mobile_menu()
+        return self
+
+    def close_mobile_menu(self):
+        """Close the mobile menu unless it already is"""
+        if self.is_menu_open():
+            self.toggle_mobile_menu()
+        return self
+
+
+class ContactForm:
+    """The contact form on the Contact page"""
+
+    FIELDS = {
+        "first_name": "#fname",
+        "last_name": "#lname",
+        "email": "#email",
+        "phone": "#phone",
+        "message": "#message",
+    }
+
+    def __init__(self, page):
+        self.page = page
+        self.site = Site(page)
+        self.form = page.locator("#contactForm")
+        self.success = page.locator("#formSuccess")
+
+    def field(self, name):
+        """Locator for a field by its FIELDS name or element id"""
+        return self.page.locator(self.FIELDS.get(name, f"#{name}"))
+
+    def open(self):
+        """Navigate to the Contact page; the form itself does not animate"""
+        self.site.goto_contact(settle=False)
+        expect(self.form).to_be_visible()
+        return self
+
+    def fill(self, service=None, **fields):
+        """Fill fields by name, e.g. ``fill(first_name="John", email="j@x.co")``"""
+        for name, value in fields.items():
+            self.field(name).fill(value)
+        if service is not None:
+            self.page.select_option("#service", service)
+        return self
+
+    def submit(self):
+        """Submit the form and wait for the success message to replace it"""
+        logger.info("Submitting contact form")
+        self.page.locator("button[type='submit']").click()
+        expect(self.success).to_be_visible()
+        expect(self.form).to_be_hidden()
+        return self
@@ -0,0 +1,229 @@
+"""
+Performance history and regression detection
+
+Every run's performance metrics are extracted from the JSON report and
+stored in a local SQLite database, keyed by run id, site-file hash and
+machine fingerprint. Each new run is then compared, metric by metric,
+against a rolling baseline of earlier runs on the same machine.
+
+A metric regresses when it lies above the one-sided 97.5% prediction
+interval of the baseline (mean + t * s * sqrt(1 + 1/n)) and is also at
+least MIN_RELATIVE_SLOWDOWN slower than the baseline mean, so tiny but
+"significant" changes on a very quiet machine are not reported.
+"""
+import hashlib
+import json
+import math
+import os
+import platform
+import sqlite3
+import statistics
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+REPORTS_DIR = Path(__file__).parent.parent / "reports"
+HISTORY_DB_PATH = REPORTS_DIR / "perf_history.sqlite"
+REGRESSIONS_PATH = REPORTS_DIR / "perf_regressions.json"
+
+BASELINE_WINDOW = 10
+MIN_BASELINE_RUNS = 5
+MIN_RELATIVE_SLOWDOWN = 0.10
+
+# One-sided 97.5% Student t quantiles by degrees of freedom
+T_QUANTILES = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042,
+}
+T_QUANTILE_INFINITE = 1.960
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created TEXT NOT NULL,
+    site_hash TEXT NOT NULL,
+    machine TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    nodeid TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (run_id, nodeid, metric)
+);
+CREATE INDEX IF NOT EXISTS metrics_by_name ON metrics (nodeid, metric);
+"""
+
+# Web Vitals fields worth tracking over time
+TRACKED_VITALS = ("fcp_ms", "lcp_ms", "cls", "tbt_ms", "dom_content_loaded_ms", "load_ms")
+
+
+def machine_fingerprint():
+    """Stable identifier of the hardware and software the suite runs on"""
+    parts = [
+        platform.system(), platform.release(), platform.machine(),
+        platform.processor(), str(os.cpu_count()), platform.python_version(),
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()[:16]
+
+
+def new_run_id():
+    """Sortable, unique id for a run"""
+    return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def t_quantile(df):
+    """One-sided 97.5% t quantile, rounded to the nearest tabulated df below"""
+    known = [d for d in T_QUANTILES if d <= df]
+    if df > max(T_QUANTILES):
+        return T_QUANTILE_INFINITE
+    return T_QUANTILES[max(known)] if known else T_QUANTILES[1]
+
+
+def extract_metrics(json_report):
+    """Return [(nodeid, metric, value)] for the performance tests in a JSON report"""
+    rows = []
+    for test in json_report.get("tests", []):
+        metadata = test.get("metadata") or {}
+        if "performance" not in test.get("keywords", []) or metadata.get("cached"):
+            continue
+        nodeid = test["nodeid"]
+        if test.get("outcome") == "passed" and test.get("call"):
+            rows.append((nodeid, "call_duration_s", test["call"].get("duration", 0.0)))
+
+        for sample in (metadata.get("web_vitals") or {}).get("samples", []):
+            for name in TRACKED_VITALS:
+                if sample.get(name) is not None:
+                    rows.append((nodeid, f"{sample['label']}.{name}", sample[name]))
+
+        for name, result in (metadata.get("benchmarks") or {}).items():
+            for stat in ("median", "p95"):
+                if result.get(stat) is not None:
+                    rows.append((nodeid, f"{name}.{stat}_s", result[stat]))
+
+        for name, result in (metadata.get("animations") or {}).items():
+            for stat in ("p95_frame_ms", "dropped_ratio"):
+                if result.get(stat) is not None:
+                    rows.append((nodeid, f"{name}.{stat}", result[stat]))
+
+        for name, size in (metadata.get("page_weight") or {}).items():
+            rows.append((nodeid, f"page_weight.{name}", size))
+
+        for name, slope in ((metadata.get("memory_leak") or {}).get("slope_per_cycle") or {}).items():
+            rows.append((nodeid, f"{name}.slope_per_cycle", slope))
+    return rows
+
+
+class PerfHistory:
+    """SQLite store of per-run performance metrics"""
+
+    def __init__(self, db_path=HISTORY_DB_PATH):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.executescript(SCHEMA)
+
+    def record_run(self, run_id, site_hash, machine, rows, created=None):
+        """Store one run's metrics"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, created, site_hash, machine) VALUES (?, ?, ?, ?)",
+                (run_id, created or datetime.now().isoformat(timespec="seconds"), site_hash, machine)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO metrics (run_id, nodeid, metric, value) VALUES (?, ?, ?, ?)",
+                [(run_id, nodeid, metric, float(value)) for nodeid, metric, value in rows]
+            )
+
+    def baseline(self, run_id, machine, nodeid, metric, window=BASELINE_WINDOW):
+        """Values of a metric in the latest earlier runs (in insertion order) on the same machine"""
+        cursor = self.conn.execute(
+            """
+            SELECT m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id
+            WHERE m.nodeid = ? AND m.metric = ? AND r.machine = ?
+              AND r.rowid < (SELECT rowid FROM runs WHERE run_id = ?)
+            ORDER BY r.rowid DESC LIMIT ?
+            """,
+            (nodeid, metric, machine, run_id, window)
+        )
+        return [row[0] for row in cursor]
+
+    def values(self, nodeid, metric, machine, window=None):
+        """Values of a metric over the stored runs on a machine, newest first"""
+        cursor = self.conn.execute(
+            """
+            SELECT m.value FROM metrics m JOIN runs r ON r.run_id = m.run_id
+            WHERE m.nodeid = ? AND m.metric = ? AND r.machine = ?
+            ORDER BY r.rowid DESC LIMIT ?
+            """,
+            (nodeid, metric, machine, window or -1)
+        )
+        return [row[0] for row in cursor]
+
+    def run_metrics(self, run_id):
+        """[(nodeid, metric, value)] stored for a run"""
+        cursor = self.conn.execute(
+            "SELECT nodeid, metric, value FROM metrics WHERE run_id = ? ORDER BY nodeid, metric",
+            (run_id,)
+        )
+        return cursor.fetchall()
+
+    def machine_of(self, run_id):
+        row = self.conn.execute("SELECT machine FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def detect_regressions(self, run_id, window=BASELINE_WINDOW, min_runs=MIN_BASELINE_RUNS,
+                           min_relative=MIN_RELATIVE_SLOWDOWN):
+        """Metrics of a run that are significantly slower than their rolling baseline"""
+        machine = self.machine_of(run_id)
+        regressions = []
+        for nodeid, metric, value in self.run_metrics(run_id):
+            history = self.baseline(run_id, machine, nodeid, metric, window)
+            if len(history) < min_runs:
+                continue
+            mean = statistics.fmean(history)
+            stdev = statistics.stdev(history)
+            threshold = mean + t_quantile(len(history) - 1) * stdev * math.sqrt(1 + 1 / len(history))
+            if value > threshold and value > mean + abs(mean) * min_relative:
+                regressions.append({
+                    "nodeid": nodeid,
+                    "metric": metric,
+                    "value": value,
+                    "baseline_mean": mean,
+                    "baseline_stdev": stdev,
+                    "threshold": threshold,
+                    "baseline_runs": len(history),
+                    "slowdown": (value - mean) / abs(mean) if mean else None,
+                })
+        return regressions
+
+    def close(self):
+        self.conn.close()
+
+
+def record_and_check(json_report, site_hash, db_path=HISTORY_DB_PATH, output_path=REGRESSIONS_PATH):
+    """Store a finished run's metrics and write the regressions found for it
+
+    Returns None, recording nothing, when no performance test ran.
+    """
+    rows = extract_metrics(json_report)
+    if not rows:
+        return None
+    run_id = new_run_id()
+    history = PerfHistory(db_path)
+    try:
+        history.record_run(run_id, site_hash, machine_fingerprint(), rows)
+        regressions = history.detect_regressions(run_id)
+    finally:
+        history.close()
+
+    result = {
+        "run_id": run_id,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "site_hash": site_hash,
+        "metrics": len(rows),
+        "regressions": regressions,
+    }
+    with open(output_path, 'w') as f:
+        json.dump(result, f, indent=2)
+    return result
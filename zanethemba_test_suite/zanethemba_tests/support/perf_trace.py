@@ -0,0 +1,119 @@
+"""
+Chromium trace capture for slow or failing performance tests
+
+With --perf-trace, each performance test runs under a Chromium
+performance trace (``browser.start_tracing``, the CDP ``Tracing``
+domain) and every context the test opens records a Playwright trace
+(screenshots, DOM snapshots, network). Both are written to a scratch
+directory and kept in ``reports/traces/`` only when the test failed or
+its call took longer than a percentile of its own history; otherwise
+they are deleted, so a green run leaves no traces behind.
+"""
+import logging
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from playwright.sync_api import Error as PlaywrightError
+
+from support.benchmark import percentile
+from support.perf_history import PerfHistory, HISTORY_DB_PATH, MIN_BASELINE_RUNS, machine_fingerprint
+
+logger = logging.getLogger('zanethemba_tests.perf_trace')
+
+TRACES_DIR = Path(__file__).parent.parent / "reports" / "traces"
+
+DEFAULT_TRACE_PERCENTILE = 90
+
+# Timeline, paint and V8 categories the DevTools performance panel needs
+TRACE_CATEGORIES = [
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "disabled-by-default-devtools.screenshot",
+    "blink.user_timing",
+    "loading",
+    "latencyInfo",
+    "v8.execute",
+    "disabled-by-default-v8.cpu_profiler",
+]
+
+
+def trace_name(nodeid):
+    """File-system safe name for a test's traces"""
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", nodeid).strip("_")
+
+
+def slow_threshold(nodeid, q, db_path=HISTORY_DB_PATH):
+    """Call duration at the ``q``-th percentile of a test's history on this machine
+
+    None when the history is too short to tell what slow means.
+    """
+    if not Path(db_path).exists():
+        return None
+    history = PerfHistory(db_path)
+    try:
+        values = history.values(nodeid, "call_duration_s", machine_fingerprint())
+    finally:
+        history.close()
+    if len(values) < MIN_BASELINE_RUNS:
+        return None
+    return percentile(sorted(values), q / 100)
+
+
+class PerfTracer:
+    """Chromium and Playwright traces of one test"""
+
+    def __init__(self, browser, nodeid, traces_dir=TRACES_DIR):
+        self.browser = browser
+        self.name = trace_name(nodeid)
+        self.traces_dir = Path(traces_dir)
+        self.scratch = Path(tempfile.mkdtemp(prefix="perf_trace_"))
+        self.contexts = []
+        self._chromium = False
+
+    def start(self):
+        """Start the browser-wide Chromium trace"""
+        try:
+            self.browser.start_tracing(screenshots=True, categories=TRACE_CATEGORIES)
+            self._chromium = True
+        except PlaywrightError as e:
+            # Another trace is already running on this browser
+            logger.error(f"Chromium tracing unavailable: {e}")
+        return self
+
+    def attach(self, context):
+        """Record a Playwright trace of a context the test opened"""
+        context.tracing.start(screenshots=True, snapshots=True, title=self.name)
+        self.contexts.append(context)
+
+    def detach(self, context):
+        """Stop a context's trace into the scratch directory; call before closing it"""
+        if context not in self.contexts:
+            return
+        index = self.contexts.index(context)
+        context.tracing.stop(path=self.scratch / f"playwright-{index}.zip")
+
+    def finish(self, keep):
+        """Stop tracing and move the traces to the traces directory if ``keep``
+
+        Returns the kept paths relative to the reports directory.
+        """
+        if self._chromium:
+            data = self.browser.stop_tracing()
+            if keep:
+                (self.scratch / "chromium.json").write_bytes(data)
+
+        kept = []
+        if keep:
+            self.traces_dir.mkdir(parents=True, exist_ok=True)
+            for old in self.traces_dir.glob(f"{self.name}.*"):
+                old.unlink()
+            for path in sorted(self.scratch.iterdir()):
+                target = self.traces_dir / f"{self.name}.{path.name}"
+                shutil.move(str(path), target)
+                kept.append(str(target.relative_to(self.traces_dir.parent)))
+            logger.info(f"Kept traces for {self.name}: {', '.join(kept)}")
+        shutil.rmtree(self.scratch, ignore_errors=True)
+        return kept
@@ -0,0 +1,47 @@
+"""
+Page readiness helpers for the Zanethemba website
+
+The site shows a splash screen on load and hides it with two timers
+(2800 ms fade, 3700 ms display:none). Instead of sleeping past those
+timers, tests wait for the splash to actually be gone or for the
+page-ready flag set by the skip-splash init script.
+"""
+import logging
+
+logger = logging.getLogger('zanethemba_tests.readiness')
+
+# Longest we are prepared to wait for the splash to clear
+SITE_READY_TIMEOUT = 10000
+
+# True once the splash is hidden (or was never rendered); only polled after
+# DOMContentLoaded, so a missing splash means the document has none
+SITE_READY_PREDICATE = """
+() => {
+  if (window.__zanethembaReady === true) return true;
+  const splash = document.getElementById('splash');
+  return !splash || getComputedStyle(splash).display === 'none';
+}
+"""
+
+# Runs before the site script, so its DOMContentLoaded listener fires first
+# and hides the splash before the site's own timers are even scheduled.
+SKIP_SPLASH_SCRIPT = """
+window.addEventListener('DOMContentLoaded', () => {
+  const splash = document.getElementById('splash');
+  if (splash) splash.style.display = 'none';
+  window.__zanethembaReady = true;
+});
+"""
+
+
+def wait_for_site_ready(page, timeout=SITE_READY_TIMEOUT):
+    """Block until the splash screen has cleared and the page is usable"""
+    page.wait_for_load_state("domcontentloaded")
+    page.wait_for_function(SITE_READY_PREDICATE, timeout=timeout)
+    logger.info("Site ready")
+
+
+def install_skip_splash(context):
+    """Bypass the splash timers for every page opened in this context"""
+    context.add_init_script(SKIP_SPLASH_SCRIPT)
+    logger.info("Skip-splash init script installed")
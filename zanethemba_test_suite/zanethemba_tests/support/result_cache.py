@@ -0,0 +1,172 @@
+"""
+Persistent cache of passing test results
+
+A test that passed against the same site file, with the same test module,
+harness code and fixture configuration, will pass again; re-running it
+only costs a page load. Each passing test stores a key built from those
+inputs, and later runs report a matching test as a cached pass without
+setting up any fixtures.
+
+Performance tests measure timings rather than behaviour and are never
+served from the cache.
+"""
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+HARNESS_ROOT = Path(__file__).parent.parent
+
+# Command line options that change what the fixtures hand to a test
+FIXTURE_OPTIONS = (
+    "--skip-splash",
+    "--no-page-pool",
+    "--site-url",
+    "--serve-site",
+    "--allow-network",
+    "--async-concurrency",
+)
+
+# Tests with these markers are always executed
+UNCACHEABLE_MARKERS = ("performance",)
+
+
+def file_hash(path):
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def harness_hash(root=HARNESS_ROOT):
+    """Hash of conftest.py and the support package, which every fixture runs through"""
+    digest = hashlib.sha256()
+    for path in [root / "conftest.py", *sorted((root / "support").glob("*.py"))]:
+        if path.exists():
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def module_hash(path):
+    """Hash of a test module, or None when it cannot be read
+
+    The whole module is hashed, not just the test function: tests call
+    module-level helpers and scripts that change their outcome too.
+    """
+    try:
+        return file_hash(path)
+    except (OSError, TypeError):
+        return None
+
+
+def fixture_config(item):
+    """Everything about an item's fixtures that could change its outcome"""
+    config = item.config
+    callspec = getattr(item, "callspec", None)
+    return {
+        "fixtures": sorted(item.fixturenames),
+        "markers": sorted({marker.name for marker in item.iter_markers()}),
+        "params": sorted(f"{k}={v!r}" for k, v in callspec.params.items()) if callspec else [],
+        "options": {option: config.getoption(option) for option in FIXTURE_OPTIONS},
+    }
+
+
+class ResultCache:
+    """Maps node ids to the key of their last pass"""
+
+    def __init__(self, cache_path, site_path, read=True):
+        self.cache_path = Path(cache_path)
+        self.site_hash = file_hash(site_path)
+        self.harness_hash = harness_hash()
+        self.read = read
+        self.entries = self._load()
+        self.keys = {}
+        self.module_hashes = {}
+        self.hits = {}
+
+    def _load(self):
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f).get("tests", {})
+        except (OSError, ValueError):
+            return {}
+
+    def key_for(self, item):
+        """Cache key for an item, or None when the item must always run"""
+        if item.nodeid in self.keys:
+            return self.keys[item.nodeid]
+        key = None
+        test_hash = None
+        if getattr(item, "function", None) is not None:
+            path = getattr(item, "path", None)
+            if path not in self.module_hashes:
+                self.module_hashes[path] = module_hash(path)
+            test_hash = self.module_hashes[path]
+        if test_hash and not any(item.get_closest_marker(name) for name in UNCACHEABLE_MARKERS):
+            material = json.dumps({
+                "site": self.site_hash,
+                "harness": self.harness_hash,
+                "test": test_hash,
+                "fixtures": fixture_config(item),
+            }, sort_keys=True, default=str)
+            key = hashlib.sha256(material.encode()).hexdigest()
+        self.keys[item.nodeid] = key
+        return key
+
+    def lookup(self, item):
+        """The stored entry when the item last passed with the same key, else None
+
+        The key is computed even when the cache is not read (``--full-run``),
+        so that the run's passes still refresh the cache.
+        """
+        key = self.key_for(item)
+        if not self.read:
+            return None
+        entry = self.entries.get(item.nodeid)
+        if key is None or entry is None or entry.get("key") != key:
+            return None
+        self.hits[item.nodeid] = entry
+        return entry
+
+    def record(self, passed, failed, durations, output_path=None):
+        """Store keys for tests that passed and drop entries for tests that failed
+
+        With ``output_path`` (a parallel worker's shard directory) only this
+        run's changes are written there, for run_tests.py to merge.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        updates = {}
+        for nodeid in passed:
+            key = self.keys.get(nodeid)
+            if key is not None and nodeid not in self.hits:
+                updates[nodeid] = {"key": key, "passed_at": now, "duration": durations.get(nodeid, 0.0)}
+
+        if output_path is None:
+            write_cache(self.cache_path, updates, failed)
+            return
+        with open(output_path, 'w') as f:
+            json.dump({"tests": updates, "removed": sorted(failed)}, f, indent=2, sort_keys=True)
+
+
+def write_cache(path, updates, removed=()):
+    """Merge entries into a cache file, dropping the removed node ids"""
+    path = Path(path)
+    data = {"tests": {}}
+    if path.exists():
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+    tests = data.setdefault("tests", {})
+    for nodeid in removed:
+        tests.pop(nodeid, None)
+    tests.update(updates)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
@@ -0,0 +1,108 @@
+"""
+Versioned service worker for the site build
+
+Every repeat visit downloads the whole document again: it is served
+``no-cache`` so it can change, and the single-file build carries all of its
+images inline. This build step adds ``sw.js`` to a build and registers it
+from the document once the page has loaded. The worker:
+
+* precaches the app shell (``index.html``) and every other file of the
+  build, whose names all carry a content hash, under the cache
+  ``zanethemba-<version>``, where the version is a hash of the whole build;
+* serves same-origin GET requests cache-first, answering navigations to the
+  site root with the cached shell, so a second visit needs no network and
+  the site works offline;
+* deletes every other ``zanethemba-`` cache on activation.
+
+A new build changes ``sw.js`` (its cache name and precache list), which the
+browser notices on the next navigation. The new worker installs next to the
+old one and only activates once no tab of the old version is left: a
+deploy replaces the old build's files, so an old tab still loading a lazy
+image or a page chunk depends on the old cache, which is deleted on that
+activation. ``sw.js`` itself keeps a fixed name, so the site server always
+revalidates it. Registration is skipped on ``file://``; the page that
+registers the worker is not controlled by it, the next visit is.
+"""
+import hashlib
+import json
+
+WORKER_NAME = "sw.js"
+SHELL_NAME = "index.html"
+CACHE_PREFIX = "zanethemba-"
+
+REGISTER_SCRIPT = """\
+<script>
+if ('serviceWorker' in navigator && location.protocol !== 'file:') {
+  window.addEventListener('load', function () { navigator.serviceWorker.register('%s'); });
+}
+</script>
+""" % WORKER_NAME
+
+WORKER_TEMPLATE = """\
+var PREFIX = %(prefix)s;
+var CACHE = %(cache)s;
+var PRECACHE = %(precache)s;
+var SCOPE = new URL(self.registration.scope);
+var SHELL = new URL(%(shell)s, SCOPE).href;
+
+self.addEventListener('install', function (event) {
+  event.waitUntil(caches.open(CACHE).then(function (cache) {
+    return cache.addAll(PRECACHE);
+  }));
+});
+
+self.addEventListener('activate', function (event) {
+  event.waitUntil(caches.keys().then(function (keys) {
+    return Promise.all(keys.filter(function (key) {
+      return key.indexOf(PREFIX) === 0 && key !== CACHE;
+    }).map(function (key) {
+      return caches.delete(key);
+    }));
+  }));
+});
+
+self.addEventListener('fetch', function (event) {
+  var request = event.request;
+  var url = new URL(request.url);
+  if (request.method !== 'GET' || url.origin !== SCOPE.origin) return;
+  var key = request.mode === 'navigate' && url.pathname === SCOPE.pathname ? SHELL : request;
+  event.respondWith(caches.open(CACHE).then(function (cache) {
+    return cache.match(key).then(function (cached) {
+      return cached || fetch(request);
+    });
+  }));
+});
+"""
+
+
+def build_version(files):
+    """Short hash identifying the content of every file of a build"""
+    digest = hashlib.sha256()
+    for name, data in sorted(files.items()):
+        digest.update(name.encode("utf-8") + b"\0" + hashlib.sha256(data).digest())
+    return digest.hexdigest()[:12]
+
+
+def worker_source(files, cache, shell=SHELL_NAME):
+    """``sw.js`` precaching the shell and ``files`` under the cache ``cache``"""
+    precache = [shell] + sorted(name for name in files if name not in (shell, WORKER_NAME))
+    return WORKER_TEMPLATE % {
+        "prefix": json.dumps(CACHE_PREFIX),
+        "cache": json.dumps(cache),
+        "precache": json.dumps(precache, indent=2),
+        "shell": json.dumps(shell),
+    }
+
+
+def add_service_worker(files, shell=SHELL_NAME):
+    """Register a service worker in the shell and add ``sw.js`` to ``files``
+
+    Returns the new ``{relative path: bytes}`` and the worker's cache name.
+    """
+    html = files[shell].decode("utf-8")
+    position = html.lower().rfind("</body>")
+    html = html[:position] + REGISTER_SCRIPT + html[position:]
+    files = {**files, shell: html.encode("utf-8")}
+    cache = CACHE_PREFIX + build_version(files)
+    files[WORKER_NAME] = worker_source(files, cache, shell).encode("utf-8")
+    return files, cache
@@ -0,0 +1,278 @@
+"""
+Sharded parallel execution helpers for run_tests.py
+
+Tests are spread over worker processes with a longest-processing-time-first
+schedule built from the durations recorded in the previous JSON report, and
+each worker's JSON, HTML, coverage and log output is merged back into the
+single report set the dashboard reads.
+"""
+import heapq
+import json
+import os
+import re
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from support.impact import write_baseline
+from support.result_cache import write_cache
+
+# Used for every test when no previous durations are available
+DEFAULT_TEST_DURATION = 1.0
+
+LOG_LINE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} ")
+
+# Printed by the collection run (this module loaded as a plugin) before the
+# positional path/node-id arguments pytest parsed from the command line
+POSITIONAL_ARGS_MARKER = "zanethemba-positional-args: "
+
+
+def load_test_durations(results_path):
+    """Return {nodeid: seconds} from a pytest-json-report file, or {} if unavailable"""
+    results_path = Path(results_path)
+    if not results_path.exists():
+        return {}
+    try:
+        with open(results_path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    durations = {}
+    for test in data.get('tests', []):
+        # Cached passes took no time and say nothing about the real cost
+        if (test.get('metadata') or {}).get('cached'):
+            continue
+        total = 0.0
+        for stage in ('setup', 'call', 'teardown'):
+            total += (test.get(stage) or {}).get('duration', 0.0)
+        durations[test['nodeid']] = total
+    return durations
+
+
+def pytest_collection_finish(session):
+    """Report the positional arguments of a collection run (``-p support.sharding``)"""
+    reporter = session.config.pluginmanager.get_plugin("terminalreporter")
+    if reporter is not None:
+        reporter.write_line(POSITIONAL_ARGS_MARKER + json.dumps(session.config.option.file_or_dir or []))
+
+
+def collect_test_ids(project_root, pytest_args=()):
+    """Return the node ids pytest would run, in collection order, and the
+    positional path/node-id arguments among ``pytest_args``"""
+    result = subprocess.run(
+        ["python3", "-m", "pytest", "--collect-only", "-q", "-o", "addopts=", "-p", "support.sharding",
+         *pytest_args],
+        cwd=project_root,
+        capture_output=True,
+        text=True
+    )
+    test_ids = []
+    positional = []
+    for line in result.stdout.splitlines():
+        if line.startswith(POSITIONAL_ARGS_MARKER):
+            positional = json.loads(line[len(POSITIONAL_ARGS_MARKER):])
+        elif "::" in line:
+            test_ids.append(line.strip())
+    return test_ids, positional
+
+
+def schedule_lpt(test_ids, durations, workers):
+    """Assign tests to workers, longest first, always onto the least-loaded worker
+
+    Tests without a recorded duration are assumed to take the median of the
+    known durations. Returns a list of (predicted_seconds, [nodeids]) per
+    worker, with each shard kept in collection order.
+    """
+    known = [durations[t] for t in test_ids if t in durations]
+    fallback = statistics.median(known) if known else DEFAULT_TEST_DURATION
+    workers = max(1, min(workers, len(test_ids)))
+
+    order = {test_id: index for index, test_id in enumerate(test_ids)}
+    by_cost = sorted(test_ids, key=lambda t: durations.get(t, fallback), reverse=True)
+
+    heap = [(0.0, worker) for worker in range(workers)]
+    shards = [[] for _ in range(workers)]
+    loads = [0.0] * workers
+    for test_id in by_cost:
+        load, worker = heapq.heappop(heap)
+        shards[worker].append(test_id)
+        loads[worker] = load + durations.get(test_id, fallback)
+        heapq.heappush(heap, (loads[worker], worker))
+
+    return [(loads[w], sorted(shards[w], key=order.get)) for w in range(workers)]
+
+
+def option_args(pytest_args, positional):
+    """``pytest_args`` without its positional path/node-id arguments
+
+    A worker given a path as well as its shard's node ids would run the
+    whole path, so workers only get the options.
+    """
+    remaining = list(positional)
+    options = []
+    for arg in pytest_args:
+        if remaining and arg == remaining[0]:
+            remaining.pop(0)
+        else:
+            options.append(arg)
+    return options
+
+
+def worker_command(shard_dir, test_ids, pytest_args=()):
+    """Build the pytest command line for one worker writing into shard_dir
+
+    ``pytest_args`` must be option arguments only (see ``option_args``).
+    """
+    return [
+        "python3", "-m", "pytest",
+        "-o", "addopts=",
+        "-o", f"log_file={shard_dir / 'test_execution.log'}",
+        "-v", "--strict-markers", "--tb=short",
+        "--cov=.", "--cov-report=",
+        f"--html={shard_dir / 'pytest_report.html'}", "--self-contained-html",
+        "--json-report", f"--json-report-file={shard_dir / 'test_results.json'}",
+        *pytest_args,
+        *test_ids,
+    ]
+
+
+def worker_env(worker_id, shard_dir):
+    """Environment for a worker: its own coverage data, impact baseline and log suffix"""
+    env = dict(os.environ)
+    env["ZANETHEMBA_WORKER"] = worker_id
+    env["ZANETHEMBA_SHARD_DIR"] = str(shard_dir)
+    env["COVERAGE_FILE"] = str(shard_dir / ".coverage")
+    return env
+
+
+def merge_json_reports(shard_reports, output_path, wall_duration):
+    """Merge per-worker pytest-json-report files into one report"""
+    merged = None
+    shards = []
+    for worker_id, report_path in shard_reports:
+        if not Path(report_path).exists():
+            shards.append({'worker': worker_id, 'missing': True})
+            continue
+        with open(report_path, 'r') as f:
+            data = json.load(f)
+
+        shards.append({
+            'worker': worker_id,
+            'tests': len(data.get('tests', [])),
+            'duration': data.get('duration', 0),
+            'exitcode': data.get('exitcode', 0),
+        })
+
+        if merged is None:
+            merged = data
+            continue
+
+        merged['tests'].extend(data.get('tests', []))
+        merged.setdefault('collectors', []).extend(data.get('collectors', []))
+        merged.setdefault('warnings', []).extend(data.get('warnings', []))
+        merged['exitcode'] = max(merged.get('exitcode', 0), data.get('exitcode', 0))
+        for key, value in data.get('summary', {}).items():
+            if isinstance(value, (int, float)):
+                merged['summary'][key] = merged['summary'].get(key, 0) + value
+
+    if merged is None:
+        merged = {'summary': {'total': 0}, 'tests': [], 'exitcode': 1}
+
+    merged['created'] = datetime.now().timestamp()
+    merged['duration'] = wall_duration
+    merged['summary']['duration'] = wall_duration
+    merged['shards'] = shards
+
+    with open(output_path, 'w') as f:
+        json.dump(merged, f, indent=2)
+    return merged
+
+
+def merge_coverage(project_root, data_files, reports_dir):
+    """Combine worker coverage data and regenerate the HTML and JSON reports"""
+    data_files = [str(p) for p in data_files if Path(p).exists()]
+    if not data_files:
+        return False
+
+    env = dict(os.environ)
+    env["COVERAGE_FILE"] = str(reports_dir / ".coverage")
+    steps = [
+        ["python3", "-m", "coverage", "combine", "--keep", *data_files],
+        ["python3", "-m", "coverage", "json", "-o", str(reports_dir / "coverage.json")],
+        ["python3", "-m", "coverage", "html", "-d", str(reports_dir / "coverage")],
+    ]
+    for step in steps:
+        if subprocess.run(step, cwd=project_root, env=env, capture_output=True).returncode != 0:
+            return False
+    return True
+
+
+def merge_impact_baselines(shard_baselines, output_path):
+    """Fold the digests and failures recorded by each worker into the shared baseline"""
+    for baseline_path in shard_baselines:
+        if not Path(baseline_path).exists():
+            continue
+        try:
+            with open(baseline_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        write_baseline(output_path, data.get('sections', {}), data.get('tests', {}), data.get('removed', []))
+
+
+def merge_result_caches(shard_caches, output_path):
+    """Apply each worker's cached-pass updates and removals to the shared cache"""
+    for cache_path in shard_caches:
+        if not Path(cache_path).exists():
+            continue
+        try:
+            with open(cache_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        write_cache(output_path, data.get('tests', {}), data.get('removed', []))
+
+
+def write_html_index(shard_dirs, output_path, merged):
+    """Write a top-level HTML report that links each worker's pytest-html report"""
+    summary = merged.get('summary', {})
+    rows = []
+    for shard_dir in shard_dirs:
+        rel = os.path.relpath(shard_dir / "pytest_report.html", output_path.parent)
+        rows.append(f'<li><a href="{rel}">{shard_dir.name}</a></li>')
+
+    html = f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="UTF-8"/><title>Zanethemba Test Report (parallel)</title></head>
+<body>
+<h1>Zanethemba Test Report</h1>
+<p>{summary.get('passed', 0)} passed, {summary.get('failed', 0)} failed,
+{summary.get('skipped', 0)} skipped in {merged.get('duration', 0):.1f}s
+across {len(shard_dirs)} workers.</p>
+<ul>
+{chr(10).join(rows)}
+</ul>
+</body>
+</html>
+"""
+    output_path.write_text(html)
+
+
+def merge_logs(log_files, output_path):
+    """Interleave worker log files by timestamp, keeping multi-line entries intact"""
+    entries = []
+    for worker_index, log_file in enumerate(log_files):
+        if not Path(log_file).exists():
+            continue
+        with open(log_file, 'r') as f:
+            for line in f:
+                if LOG_LINE_PATTERN.match(line) or not entries:
+                    entries.append([line[:19], worker_index, line])
+                else:
+                    entries[-1][2] += line
+
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+    with open(output_path, 'w') as f:
+        f.writelines(entry[2] for entry in entries)
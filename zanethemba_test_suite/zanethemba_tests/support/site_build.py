@@ -0,0 +1,295 @@
+"""
+Single-source build of the site
+
+``zanethemba_website.html`` at the repository root is the only document
+edited by hand. The build minifies it (``support.minify``) and writes:
+
+* ``single/index.html``: one self-contained file, each embedded image
+  stored once in a JS asset table (``support.asset_dedup`` inline mode).
+* ``multi/``: ``index.html`` plus content-hashed ``assets/site.<hash>.css``,
+  ``assets/site.<hash>.js`` and image files, either each image once as is
+  (``--images dedup``) or as responsive AVIF/WebP variants
+  (``--images responsive``, see ``support.image_pipeline``).
+* ``split/``: the multi-file build with the About and Contact pages moved
+  into ``pages/<name>.<hash>.html`` chunks that are fetched the first time
+  they are shown (``support.code_split``); it must be served over HTTP.
+
+In every build the images of inactive pages and hidden carousel slides are
+attached only when they are about to be shown (``support.lazy_images``,
+disable with ``--no-lazy``). With ``--critical-css`` only the style rules
+used above the fold at load are inlined and the full stylesheet is loaded
+without blocking the first paint (``support.critical_css``; needs Chromium).
+Every build registers a service worker that precaches it under a
+build-version cache and serves it cache-first (``support.service_worker``,
+disable with ``--no-service-worker``).
+
+``manifest.json`` records the size, gzip size and hash of every file of
+every build together with its page weight, so the test suite can check any
+build without rebuilding it. ``--publish-copies`` overwrites the legacy
+copies (``index.html``, ``files/zanethemba_website-1.html``) with the
+source so they stop drifting.
+
+    python3 -m support.site_build -o build/site --images responsive
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import re
+import shutil
+import sys
+from pathlib import Path
+
+from support.asset_dedup import dedupe, DEFAULT_SOURCE
+from support.code_split import split_pages
+from support.critical_css import defer_stylesheet, find_deferrable
+from support.lazy_images import defer_images
+from support.minify import minify_html
+from support.page_weight import analyze
+from support.service_worker import add_service_worker
+
+logger = logging.getLogger('zanethemba_tests.site_build')
+
+REPO_ROOT = Path(__file__).parent.parent.parent.parent
+LEGACY_COPIES = (REPO_ROOT / "index.html", REPO_ROOT / "files" / "zanethemba_website-1.html")
+BUILD_DIR = Path(__file__).parent.parent / "build" / "site"
+MANIFEST_NAME = "manifest.json"
+BUILDS = ("single", "multi", "split")
+IMAGE_MODES = ("dedup", "responsive")
+
+HEAD_STYLE_PATTERN = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.S | re.I)
+INLINE_SCRIPT_PATTERN = re.compile(r"<script\b(?![^>]*\b(?:src|type)\s*=)[^>]*>(.*?)</script\s*>", re.S | re.I)
+
+
+def content_name(stem, data, extension):
+    """File name carrying a content hash, e.g. ``site.3f2a9c8d1e0b.css``"""
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+
+
+def externalize(html, assets_dir="assets"):
+    """Move the inline stylesheets and scripts into content-hashed files
+
+    Returns the rewritten document and ``{relative path: bytes}``. The
+    stylesheets of the ``<head>`` become one file linked where the first
+    one was; each inline script becomes a classic ``<script src>`` in its
+    original position, so execution order is unchanged.
+    """
+    files = {}
+    body_start = html.lower().find("<body")
+    head, body = html[:body_start], html[body_start:]
+
+    styles = HEAD_STYLE_PATTERN.findall(head)
+    if styles:
+        css = "\n".join(styles).encode("utf-8")
+        name = f"{assets_dir}/{content_name('site', css, 'css')}"
+        files[name] = css
+        first = [True]
+
+        def replace_style(match):
+            if first[0]:
+                first[0] = False
+                return f'<link rel="stylesheet" href="{name}">'
+            return ""
+        head = HEAD_STYLE_PATTERN.sub(replace_style, head)
+
+    def replace_script(match):
+        js = match.group(1).encode("utf-8")
+        if not js.strip():
+            return match.group(0)
+        script_name = f"{assets_dir}/{content_name('site', js, 'js')}"
+        files[script_name] = js
+        return f'<script src="{script_name}"></script>'
+    body = INLINE_SCRIPT_PATTERN.sub(replace_script, body)
+
+    return head + body, files
+
+
+def build_single(source_html, lazy=True, deferrable=None):
+    """Minified single-file build: {relative path: bytes}
+
+    ``deferrable`` (see ``support.critical_css.find_deferrable``) splits the
+    stylesheet into critical and deferred CSS.
+    """
+    html = dedupe(minify_html(source_html), "inline").html
+    if lazy:
+        html = defer_images(html).html
+    if deferrable is not None:
+        html = defer_stylesheet(html, deferrable).html
+    return {"index.html": html.encode("utf-8")}
+
+
+def build_multi(source_html, images="dedup", lazy=True, split=False, deferrable=None):
+    """Minified multi-file build with externalized, content-hashed assets
+
+    With ``split`` the pages other than home become chunks loaded on demand.
+    """
+    if images not in IMAGE_MODES:
+        raise ValueError(f"Unknown image mode '{images}' (expected one of {', '.join(IMAGE_MODES)})")
+    html = minify_html(source_html)
+    if images == "responsive":
+        from support.image_pipeline import build_responsive
+        result = build_responsive(html)
+    else:
+        result = dedupe(html, "external")
+    html = defer_images(result.html).html if lazy else result.html
+    chunks = {}
+    if split:
+        split_result = split_pages(html)
+        html, chunks = split_result.html, split_result.files
+    html, files = externalize(html)
+    if deferrable is not None:
+        for name, data in files.items():
+            if name.endswith(".css"):
+                html = defer_stylesheet(html, deferrable, (name, data.decode("utf-8"))).html
+    files.update(result.files)
+    files.update(chunks)
+    return {"index.html": html.encode("utf-8"), **files}
+
+
+def _file_entry(data):
+    return {
+        "bytes": len(data),
+        "gzip_bytes": len(gzip.compress(data, compresslevel=9, mtime=0)),
+        "sha256": hashlib.sha256(data).hexdigest(),
+    }
+
+
+def write_build(out_dir, files):
+    """Replace ``out_dir`` with the build's files and return their manifest entry"""
+    out_dir = Path(out_dir)
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    for relative, data in files.items():
+        path = out_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    entries = {relative: _file_entry(data) for relative, data in sorted(files.items())}
+    return {
+        "entry": "index.html",
+        "total_bytes": sum(entry["bytes"] for entry in entries.values()),
+        "gzip_bytes": sum(entry["gzip_bytes"] for entry in entries.values()),
+        "page_weight": analyze(out_dir / "index.html").metrics(),
+        "files": entries,
+    }
+
+
+def build_site(source=DEFAULT_SOURCE, out_dir=BUILD_DIR, images="dedup", builds=BUILDS, lazy=True,
+               critical=False, browser=None, service_worker=True):
+    """Build every requested variant of the site and write the manifest
+
+    ``critical`` renders the source in ``browser`` (or a Chromium launched
+    for the purpose) to find the rules the first paint needs.
+    """
+    source = Path(source)
+    out_dir = Path(out_dir)
+    source_bytes = source.read_bytes()
+    source_html = source_bytes.decode("utf-8")
+
+    manifest = {
+        "source": source.name,
+        "source_bytes": len(source_bytes),
+        "source_sha256": hashlib.sha256(source_bytes).hexdigest(),
+        "images": images,
+        "lazy": lazy,
+        "critical_css": critical,
+        "service_worker": service_worker,
+        "builds": {},
+    }
+    deferrable = find_deferrable(minify_html(source_html), browser=browser) if critical else None
+    for name in builds:
+        if name == "single":
+            files = build_single(source_html, lazy, deferrable)
+        else:
+            files = build_multi(source_html, images, lazy, split=name == "split", deferrable=deferrable)
+        cache = None
+        if service_worker:
+            files, cache = add_service_worker(files)
+        manifest["builds"][name] = write_build(out_dir / name, files)
+        entry = manifest["builds"][name]
+        entry["cache"] = cache
+        logger.info(f"Built {name}: {len(entry['files'])} files, {entry['total_bytes']} bytes "
+                    f"({entry['gzip_bytes']} gzipped) from {len(source_bytes)}")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    return manifest
+
+
+def load_manifest(out_dir=BUILD_DIR):
+    with open(Path(out_dir) / MANIFEST_NAME, 'r') as f:
+        return json.load(f)
+
+
+def verify_manifest(out_dir=BUILD_DIR):
+    """Return a message for every built file missing or differing from the manifest"""
+    out_dir = Path(out_dir)
+    problems = []
+    for name, build in load_manifest(out_dir)["builds"].items():
+        for relative, expected in build["files"].items():
+            path = out_dir / name / relative
+            if not path.is_file():
+                problems.append(f"{name}/{relative} is missing")
+                continue
+            data = path.read_bytes()
+            if len(data) != expected["bytes"] or hashlib.sha256(data).hexdigest() != expected["sha256"]:
+                problems.append(f"{name}/{relative} is {len(data)} bytes, manifest says {expected['bytes']}")
+    return problems
+
+
+def stale_copies(source=DEFAULT_SOURCE, copies=LEGACY_COPIES):
+    """Legacy copies of the site whose content differs from the source"""
+    data = Path(source).read_bytes()
+    return [copy for copy in copies if not copy.exists() or copy.read_bytes() != data]
+
+
+def publish_copies(source=DEFAULT_SOURCE, copies=LEGACY_COPIES):
+    """Overwrite the legacy copies with the source document"""
+    for copy in stale_copies(source, copies):
+        copy.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(source, copy)
+        logger.info(f"Published {Path(source).name} to {copy}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the site from its single source document")
+    parser.add_argument("source", nargs="?", default=str(DEFAULT_SOURCE), help="Source HTML file (default: the site file)")
+    parser.add_argument("-o", "--out-dir", default=str(BUILD_DIR), help="Build directory")
+    parser.add_argument("--images", choices=IMAGE_MODES, default="dedup",
+                        help="Images of the multi-file builds: each once as is, or responsive AVIF/WebP variants")
+    parser.add_argument("--no-lazy", action="store_true",
+                        help="Attach every image at load instead of deferring off-screen ones")
+    parser.add_argument("--critical-css", action="store_true",
+                        help="Inline only the CSS used above the fold at load and defer the rest (needs Chromium)")
+    parser.add_argument("--no-service-worker", action="store_true",
+                        help="Do not add the precaching service worker (sw.js)")
+    parser.add_argument("--only", choices=BUILDS, help="Write only one of the builds")
+    parser.add_argument("--publish-copies", action="store_true",
+                        help="Also overwrite index.html and files/zanethemba_website-1.html with the source")
+    parser.add_argument("--verify", action="store_true", help="Check an existing build against its manifest and exit")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        problems = verify_manifest(args.out_dir)
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        print("✓ Build matches its manifest" if not problems else f"{len(problems)} problem(s)")
+        return 1 if problems else 0
+
+    manifest = build_site(args.source, args.out_dir, args.images, (args.only,) if args.only else BUILDS,
+                          lazy=not args.no_lazy, critical=args.critical_css,
+                          service_worker=not args.no_service_worker)
+    print(f"{manifest['source']}: {manifest['source_bytes'] / 1024:.0f} KiB")
+    for name, build in manifest["builds"].items():
+        print(f"  • {name}: {len(build['files'])} files, {build['total_bytes'] / 1024:.0f} KiB "
+              f"({build['gzip_bytes'] / 1024:.0f} KiB gzipped) -> {Path(args.out_dir) / name}")
+    if args.publish_copies:
+        publish_copies(args.source)
+    for copy in stale_copies(args.source):
+        print(f"  ! {copy} differs from the source (use --publish-copies)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
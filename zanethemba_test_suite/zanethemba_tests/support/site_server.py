@@ -0,0 +1,232 @@
+"""
+Local HTTP server for the Zanethemba website
+
+Serves the site directory with precomputed gzip (and brotli, when the
+optional ``brotli`` package is installed) variants, strong ETags,
+Cache-Control and single byte-range support, so load tests can measure
+realistic cold and warm loads of the 3.6 MB document without a network.
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import re
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger('zanethemba_tests.site_server')
+
+# Documents are revalidated on every load; content-hashed assets never change
+DOCUMENT_CACHE_CONTROL = "no-cache"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASHED_NAME_PATTERN = re.compile(r"\.[0-9a-f]{8,}\.")
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class Representation:
+    """Precomputed identity and compressed bodies for one file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.identity = path.read_bytes()
+        self.content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.last_modified = formatdate(path.stat().st_mtime, usegmt=True)
+        digest = hashlib.sha256(self.identity).hexdigest()[:16]
+        self.etags = {"identity": f'"{digest}"'}
+        self.bodies = {"identity": self.identity}
+
+        if self.content_type.startswith(COMPRESSIBLE_TYPES):
+            self.bodies["gzip"] = gzip.compress(self.identity, compresslevel=9)
+            self.etags["gzip"] = f'"{digest}-gz"'
+            if brotli is not None:
+                self.bodies["br"] = brotli.compress(self.identity, quality=9)
+                self.etags["br"] = f'"{digest}-br"'
+
+    def negotiate(self, accept_encoding):
+        """Pick the smallest encoding the client accepts"""
+        accepted = {token.split(";")[0].strip() for token in (accept_encoding or "").split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and encoding in accepted:
+                return encoding
+        return "identity"
+
+
+class SiteRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD handler backed by the server's representation cache"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def _serve(self, send_body):
+        rep = self.server.site.representation(urlsplit(self.path).path)
+        if rep is None:
+            self._send_empty(404)
+            return
+
+        range_header = self.headers.get("Range")
+        # Byte ranges are only offered on the identity representation
+        encoding = "identity" if range_header else rep.negotiate(self.headers.get("Accept-Encoding"))
+        etag = rep.etags[encoding]
+
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self._send_empty(304, rep, encoding)
+            return
+
+        body = rep.bodies[encoding]
+        status = 200
+        content_range = None
+        if range_header:
+            match = RANGE_PATTERN.match(range_header.strip())
+            size = len(body)
+            if not match or match.group(1) == match.group(2) == "":
+                self._send_empty(416, extra={"Content-Range": f"bytes */{size}"})
+                return
+            if match.group(1):
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else size - 1
+            else:
+                start = max(0, size - int(match.group(2)))
+                end = size - 1
+            end = min(end, size - 1)
+            if start > end:
+                self._send_empty(416, extra={"Content-Range": f"bytes */{size}"})
+                return
+            body = body[start:end + 1]
+            status = 206
+            content_range = f"bytes {start}-{end}/{size}"
+
+        self.send_response(status)
+        self._send_representation_headers(rep, encoding)
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+        self.server.site.record(self.path, status, encoding, len(body) if send_body else 0)
+
+    def _send_representation_headers(self, rep, encoding):
+        self.send_header("Content-Type", rep.content_type)
+        self.send_header("ETag", rep.etags[encoding])
+        self.send_header("Last-Modified", rep.last_modified)
+        self.send_header("Cache-Control", self.server.site.cache_control_for(rep.path))
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Accept-Ranges", "bytes")
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+
+    def _send_empty(self, status, rep=None, encoding="identity", extra=None):
+        self.send_response(status)
+        if rep is not None:
+            self._send_representation_headers(rep, encoding)
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        self.server.site.record(self.path, status, encoding, 0)
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} {format % args}")
+
+
+class SiteServer:
+    """Serve a site directory on localhost from a background thread"""
+
+    def __init__(self, root, index="index.html", host="127.0.0.1", port=0):
+        self.root = Path(root).resolve()
+        self.index = index
+        self.host = host
+        self.port = port
+        self.requests = []
+        self._representations = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        """Precompute the index variants and start serving"""
+        self.representation("/")
+        self._httpd = ThreadingHTTPServer((self.host, self.port), SiteRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.site = self
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Serving {self.root} at {self.url()}")
+        return self
+
+    def stop(self):
+        """Shut the server down"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            logger.info("Site server stopped")
+
+    def url(self, path=None):
+        """Absolute URL for a path under the site root (the index by default)"""
+        return f"http://{self.host}:{self.port}/{path if path is not None else self.index}"
+
+    def representation(self, url_path):
+        """Return the cached Representation for a URL path, or None if not servable"""
+        relative = unquote(url_path).lstrip("/") or self.index
+        path = (self.root / relative).resolve()
+        if self.root not in path.parents or not path.is_file():
+            return None
+        with self._lock:
+            rep = self._representations.get(path)
+            if rep is None or rep.last_modified != formatdate(path.stat().st_mtime, usegmt=True):
+                rep = Representation(path)
+                self._representations[path] = rep
+            return rep
+
+    def site_size(self, path=None):
+        """Uncompressed size in bytes of a served file (the index by default)"""
+        return len(self.representation(f"/{path or self.index}").identity)
+
+    def cache_control_for(self, path):
+        """Content-hashed file names are immutable; everything else revalidates"""
+        if HASHED_NAME_PATTERN.search(path.name):
+            return IMMUTABLE_CACHE_CONTROL
+        return DOCUMENT_CACHE_CONTROL
+
+    def record(self, path, status, encoding, body_bytes):
+        """Remember what was sent so tests can inspect transfer sizes"""
+        with self._lock:
+            self.requests.append({
+                "path": path,
+                "status": status,
+                "encoding": encoding,
+                "bytes": body_bytes,
+            })
+
+    def reset_stats(self):
+        """Forget previously recorded requests"""
+        with self._lock:
+            self.requests.clear()
+
+    def bytes_sent(self, path=None):
+        """Total body bytes sent, optionally for a single URL path"""
+        with self._lock:
+            return sum(r["bytes"] for r in self.requests if path is None or r["path"] == path)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,125 @@
+"""
+Network and CPU throttling profiles for load tests
+
+Most visitors open the site on mobile data, where the 3.6 MB document
+(about 2.7 MB gzipped) takes seconds to arrive and scripts run several
+times slower than on a desktop. Each profile combines a device viewport,
+Chrome DevTools network conditions (``Network.emulateNetworkConditions``)
+and a CPU slowdown (``Emulation.setCPUThrottlingRate``) with budgets for
+that profile.
+
+Network emulation only affects real network requests, so throttled pages
+load the site over HTTP (the local site server unless --site-url is set),
+never from ``file://``.
+"""
+import logging
+
+logger = logging.getLogger('zanethemba_tests.throttling')
+
+# Chrome DevTools presets (throughput in bytes/s, latency in ms, with the
+# DevTools adjustment factors already applied)
+NETWORK_CONDITIONS = {
+    "slow-3g": {
+        "latency": 2000,
+        "downloadThroughput": 500 * 1000 / 8 * 0.8,
+        "uploadThroughput": 500 * 1000 / 8 * 0.8,
+        "connectionType": "cellular3g",
+    },
+    "fast-3g": {
+        "latency": 562.5,
+        "downloadThroughput": 1.6 * 1000 * 1000 / 8 * 0.9,
+        "uploadThroughput": 750 * 1000 / 8 * 0.9,
+        "connectionType": "cellular3g",
+    },
+    "4g": {
+        "latency": 165,
+        "downloadThroughput": 9 * 1000 * 1000 / 8 * 0.9,
+        "uploadThroughput": 1.5 * 1000 * 1000 / 8 * 0.9,
+        "connectionType": "cellular4g",
+    },
+}
+
+# Budgets (ms) are set for the current single-file page: on 3G the
+# transfer of the document alone takes most of the time
+THROTTLING_PROFILES = {
+    "4g": {
+        "device": "mobile",
+        "network": "4g",
+        "cpu_slowdown": 1,
+        "budgets": {"fcp_ms": 4000, "dom_content_loaded_ms": 5000, "load_ms": 6000, "tbt_ms": 200, "cls": 0.1},
+    },
+    "4g-cpu4x": {
+        "device": "mobile",
+        "network": "4g",
+        "cpu_slowdown": 4,
+        "budgets": {"fcp_ms": 5000, "dom_content_loaded_ms": 7000, "load_ms": 8000, "tbt_ms": 800, "cls": 0.1},
+    },
+    "fast-3g-cpu4x": {
+        "device": "mobile",
+        "network": "fast-3g",
+        "cpu_slowdown": 4,
+        "budgets": {"fcp_ms": 18000, "dom_content_loaded_ms": 20000, "load_ms": 22000, "tbt_ms": 800, "cls": 0.1},
+    },
+    "slow-3g-cpu6x": {
+        "device": "mobile",
+        "network": "slow-3g",
+        "cpu_slowdown": 6,
+        "budgets": {"fcp_ms": 60000, "dom_content_loaded_ms": 65000, "load_ms": 70000, "tbt_ms": 1200, "cls": 0.1},
+    },
+    "cpu6x": {
+        "device": "mobile",
+        "network": None,
+        "cpu_slowdown": 6,
+        "budgets": {"fcp_ms": 3000, "dom_content_loaded_ms": 4000, "load_ms": 5000, "tbt_ms": 1200, "cls": 0.1},
+    },
+}
+
+# Profiles run by default; slow 3G takes over a minute per load
+DEFAULT_THROTTLING = ("4g", "4g-cpu4x", "fast-3g-cpu4x", "cpu6x")
+
+
+def select_profiles(option):
+    """Profile names for a --throttling value ("default", "all" or a comma list)"""
+    if not option or option == "default":
+        return list(DEFAULT_THROTTLING)
+    if option == "all":
+        return list(THROTTLING_PROFILES)
+    names = [name.strip() for name in option.split(",") if name.strip()]
+    unknown = [name for name in names if name not in THROTTLING_PROFILES]
+    if unknown:
+        raise ValueError(
+            f"Unknown throttling profiles: {', '.join(unknown)} "
+            f"(choose from {', '.join(THROTTLING_PROFILES)})"
+        )
+    return names
+
+
+def transfer_estimate_ms(size_bytes, profile_name):
+    """Lower bound for downloading ``size_bytes`` under a profile's network"""
+    network = THROTTLING_PROFILES[profile_name]["network"]
+    if network is None:
+        return 0.0
+    conditions = NETWORK_CONDITIONS[network]
+    return conditions["latency"] + size_bytes / conditions["downloadThroughput"] * 1000
+
+
+def load_timeout_ms(profile_name):
+    """Navigation timeout that leaves room for a load well over budget"""
+    return max(30000, THROTTLING_PROFILES[profile_name]["budgets"]["load_ms"] * 2)
+
+
+def apply_throttling(page, profile_name):
+    """Throttle a page's network and CPU through a CDP session and return the session"""
+    profile = THROTTLING_PROFILES[profile_name]
+    cdp = page.context.new_cdp_session(page)
+    if profile["network"] is not None:
+        cdp.send("Network.enable")
+        cdp.send("Network.emulateNetworkConditions", {
+            "offline": False, **NETWORK_CONDITIONS[profile["network"]]
+        })
+    cdp.send("Emulation.setCPUThrottlingRate", {"rate": profile["cpu_slowdown"]})
+    logger.info(
+        f"Throttling '{profile_name}': network {profile['network'] or 'unthrottled'}, "
+        f"CPU {profile['cpu_slowdown']}x slower"
+    )
+    return cdp
@@ -0,0 +1,98 @@
+"""
+Controllable fake clock for the site's timers
+
+The carousels rotate on setInterval (5 s hero, 7 s break, 6 s community)
+and the splash hides on setTimeout. With the fake clock installed those
+timers only fire when a test advances time, so rotation can be asserted
+exactly and instantly instead of by sleeping through real intervals.
+"""
+import logging
+
+logger = logging.getLogger('zanethemba_tests.virtual_clock')
+
+# The splash is hidden by the site's 3700 ms display:none timer
+SPLASH_DURATION_MS = 3700
+
+VIRTUAL_CLOCK_SCRIPT = """
+(() => {
+  const realNow = Date.now.bind(Date);
+  const epoch = realNow();
+  const timers = new Map();
+  const scheduled = [];
+  let now = 0;
+  let nextId = 1;
+
+  function schedule(callback, delay, args, repeat) {
+    const id = nextId++;
+    delay = Math.max(0, Number(delay) || 0);
+    timers.set(id, {id, callback, args, delay, due: now + delay, repeat});
+    scheduled.push({id, delay, repeat, at: now});
+    return id;
+  }
+
+  function clear(id) { timers.delete(id); }
+
+  window.setTimeout = (callback, delay, ...args) => schedule(callback, delay, args, false);
+  window.setInterval = (callback, delay, ...args) => schedule(callback, delay, args, true);
+  window.clearTimeout = clear;
+  window.clearInterval = clear;
+  Date.now = () => epoch + now;
+
+  window.__zanethembaClock = {
+    now: () => now,
+    scheduled: () => scheduled.map(t => ({...t, active: timers.has(t.id)})),
+    tick(ms) {
+      const target = now + ms;
+      for (;;) {
+        let next = null;
+        for (const t of timers.values()) {
+          if (t.due > target) continue;
+          if (!next || t.due < next.due || (t.due === next.due && t.id < next.id)) next = t;
+        }
+        if (!next) break;
+        now = next.due;
+        if (next.repeat) next.due += Math.max(1, next.delay);
+        else timers.delete(next.id);
+        try {
+          if (typeof next.callback === 'function') next.callback(...next.args);
+          else (0, eval)(String(next.callback));
+        } catch (e) {
+          console.error('virtual clock timer failed:', e);
+        }
+      }
+      now = target;
+      return now;
+    }
+  };
+})();
+"""
+
+
+class VirtualClock:
+    """Drives the fake clock installed in a page"""
+
+    def __init__(self, page):
+        self.page = page
+
+    @staticmethod
+    def install(context):
+        """Replace the timer functions for every page opened in this context"""
+        context.add_init_script(VIRTUAL_CLOCK_SCRIPT)
+        logger.info("Virtual clock installed")
+
+    def now(self):
+        """Milliseconds of virtual time elapsed since the page started"""
+        return self.page.evaluate("() => window.__zanethembaClock.now()")
+
+    def advance(self, ms):
+        """Fire every timer due within the next ``ms`` milliseconds, in order"""
+        logger.info(f"Advancing virtual clock by {ms} ms")
+        return self.page.evaluate("ms => window.__zanethembaClock.tick(ms)", ms)
+
+    def scheduled_timers(self):
+        """Every timer the page has registered, as dicts with delay/repeat/active"""
+        return self.page.evaluate("() => window.__zanethembaClock.scheduled()")
+
+    def scheduled_intervals(self):
+        """Delays of the setInterval timers that are still running"""
+        return [t["delay"] for t in self.scheduled_timers() if t["repeat"] and t["active"]]
@@ -0,0 +1,147 @@
+"""
+Core Web Vitals instrumentation
+
+An init script registers buffered PerformanceObservers before any site
+code runs and keeps running values for First Contentful Paint, Largest
+Contentful Paint, Cumulative Layout Shift (session windows) and long
+tasks. Collection flushes the observers with ``takeRecords()`` rather than
+waiting on timers, so it also works on pages with a virtual clock.
+
+Total Blocking Time is the blocking part (beyond 50 ms) of every long
+task that started after FCP, up to the moment of collection.
+"""
+import logging
+
+logger = logging.getLogger('zanethemba_tests.web_vitals')
+
+# web.dev "good" thresholds, plus a ceiling on DOMContentLoaded
+WEB_VITALS_BUDGETS = {
+    "fcp_ms": 1800,
+    "lcp_ms": 2500,
+    "cls": 0.1,
+    "tbt_ms": 200,
+    "dom_content_loaded_ms": 3000,
+}
+
+WEB_VITALS_SCRIPT = """
+(() => {
+  if (window.__zanethembaVitals) return;
+  const vitals = window.__zanethembaVitals = {
+    fcp: null, lcp: null, cls: 0, longTasks: [], observers: [],
+  };
+  let session = [], sessionValue = 0;
+
+  const handlers = {
+    'paint': entry => {
+      if (entry.name === 'first-contentful-paint') vitals.fcp = entry.startTime;
+    },
+    'largest-contentful-paint': entry => {
+      vitals.lcp = entry.renderTime || entry.loadTime || entry.startTime;
+    },
+    'layout-shift': entry => {
+      if (entry.hadRecentInput) return;
+      const first = session[0], last = session[session.length - 1];
+      if (last && entry.startTime - last.startTime < 1000 && entry.startTime - first.startTime < 5000) {
+        session.push(entry);
+        sessionValue += entry.value;
+      } else {
+        session = [entry];
+        sessionValue = entry.value;
+      }
+      vitals.cls = Math.max(vitals.cls, sessionValue);
+    },
+    'longtask': entry => {
+      vitals.longTasks.push({start: entry.startTime, duration: entry.duration});
+    },
+  };
+
+  vitals.handle = (type, entries) => entries.forEach(handlers[type]);
+  for (const type of Object.keys(handlers)) {
+    try {
+      const observer = new PerformanceObserver(list => vitals.handle(type, list.getEntries()));
+      observer.observe({type, buffered: true});
+      vitals.observers.push([type, observer]);
+    } catch (e) {
+      // Entry type not supported by this browser
+    }
+  }
+})();
+"""
+
+COLLECT_SCRIPT = """
+() => {
+  const vitals = window.__zanethembaVitals;
+  if (!vitals) return null;
+  for (const [type, observer] of vitals.observers) vitals.handle(type, observer.takeRecords());
+
+  const round = value => value === null || value === undefined ? null : Math.round(value * 10) / 10;
+  const nav = performance.getEntriesByType('navigation')[0];
+  const blocking = vitals.longTasks
+    .filter(task => vitals.fcp !== null && task.start >= vitals.fcp)
+    .reduce((total, task) => total + Math.max(0, task.duration - 50), 0);
+
+  return {
+    fcp_ms: round(vitals.fcp),
+    lcp_ms: round(vitals.lcp),
+    cls: Math.round(vitals.cls * 10000) / 10000,
+    tbt_ms: round(blocking),
+    long_tasks: vitals.longTasks.length,
+    ttfb_ms: nav ? round(nav.responseStart) : null,
+    dom_interactive_ms: nav ? round(nav.domInteractive) : null,
+    dom_content_loaded_ms: nav ? round(nav.domContentLoadedEventEnd) : null,
+    load_ms: nav && nav.loadEventEnd ? round(nav.loadEventEnd) : null,
+    transfer_size: nav ? nav.transferSize : null,
+    decoded_body_size: nav ? nav.decodedBodySize : null,
+    collected_at_ms: round(performance.now()),
+  };
+}
+"""
+
+
+def install_web_vitals(context):
+    """Register the observers in every page the context opens"""
+    context.add_init_script(WEB_VITALS_SCRIPT)
+
+
+def check_budgets(metrics, budgets=None):
+    """Return a message for each metric over its budget (missing metrics are skipped)"""
+    violations = []
+    for name, limit in (budgets or WEB_VITALS_BUDGETS).items():
+        value = metrics.get(name)
+        if value is not None and value > limit:
+            violations.append(f"{name}={value} exceeds budget {limit}")
+    return violations
+
+
+class WebVitalsRecorder:
+    """Collects Web Vitals samples for one test"""
+
+    def __init__(self, budgets=None):
+        self.budgets = dict(budgets or WEB_VITALS_BUDGETS)
+        self.samples = []
+        self._collected = set()
+
+    def collect(self, page, label=None):
+        """Read the current metrics of a page, after its load event, and keep them"""
+        page.wait_for_load_state("load")
+        metrics = page.evaluate(COLLECT_SCRIPT)
+        if metrics is None:
+            logger.error(f"Web Vitals script not installed on {page.url}")
+            return None
+        sample = {"label": label or f"sample-{len(self.samples) + 1}", "url": page.url, **metrics}
+        sample["violations"] = check_budgets(metrics, self.budgets)
+        self.samples.append(sample)
+        self._collected.add(id(page))
+        logger.info(
+            f"Web Vitals [{sample['label']}]: FCP {metrics['fcp_ms']} ms, LCP {metrics['lcp_ms']} ms, "
+            f"CLS {metrics['cls']}, TBT {metrics['tbt_ms']} ms, DCL {metrics['dom_content_loaded_ms']} ms"
+        )
+        return metrics
+
+    def collected(self, page):
+        """Whether a sample was already taken from this page"""
+        return id(page) in self._collected
+
+    def report(self):
+        """JSON-report payload: samples plus the budgets they were checked against"""
+        return {"budgets": self.budgets, "samples": self.samples}
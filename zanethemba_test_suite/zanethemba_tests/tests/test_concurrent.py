@@ -0,0 +1,51 @@
+"""
+Read-only content and navigation checks run concurrently on the async engine
+"""
+import pytest
+import logging
+
+from support import checks
+
+logger = logging.getLogger('zanethemba_tests.concurrent')
+
+
+READ_ONLY_SCENARIOS = [
+    checks.scenario("home_content", *checks.HOME_CONTENT),
+    checks.scenario("about_content", checks.show_page("about"), *checks.ABOUT_CONTENT),
+    checks.scenario("contact_content", checks.show_page("contact"), *checks.CONTACT_CONTENT),
+    checks.scenario("navigation_chrome", *checks.CHROME),
+]
+
+MOBILE_SCENARIOS = [
+    checks.scenario("home_content", *checks.HOME_CONTENT),
+    checks.scenario("mobile_menu_contact", checks.mobile_menu_to_contact),
+]
+
+
+class TestConcurrentReadOnlyChecks:
+    """Run independent read-only checks several pages at a time"""
+    
+    @pytest.mark.regression
+    def test_read_only_checks_concurrently(self, async_engine):
+        """Test all read-only scenarios pass when run concurrently"""
+        logger.info(f"Running {len(READ_ONLY_SCENARIOS)} scenarios concurrently")
+        
+        results = async_engine.run_scenarios(READ_ONLY_SCENARIOS)
+        
+        for result in results:
+            logger.info(f"{result.name}: {'passed' if result.passed else 'failed'} in {result.duration:.2f}s")
+        
+        failed = [f"{r.name}: {r.error}" for r in results if not r.passed]
+        assert not failed, f"Concurrent scenarios failed: {failed}"
+        logger.info("✓ All concurrent read-only checks passed")
+    
+    @pytest.mark.regression
+    def test_read_only_checks_concurrently_on_mobile(self, async_engine):
+        """Test home content and menu navigation concurrently on the mobile profile"""
+        logger.info("Running mobile scenarios concurrently")
+        
+        results = async_engine.run_scenarios(MOBILE_SCENARIOS, profile="mobile")
+        
+        failed = [f"{r.name}: {r.error}" for r in results if not r.passed]
+        assert not failed, f"Concurrent mobile scenarios failed: {failed}"
+        logger.info("✓ Mobile concurrent checks passed")
@@ -5,6 +5,10 @@ import pytest
 import logging
 from playwright.sync_api import Page, expect
 
+from support import checks
+from support.checks import run_check
+from support.pages import Site
+
 logger = logging.getLogger('zanethemba_tests.content')
 
 
@@ -15,9 +19,7 @@ class TestHomePageContent:
     def test_hero_title_present(self, page):
         """Test hero title is present and correct"""
         logger.info("Testing hero title presence")
-        hero_title = page.locator(".hero-title")
-        expect(hero_title).to_be_visible()
-        expect(hero_title).to_contain_text("Cleanliness")
+        run_check(checks.hero_title, page)
         logger.info("Hero title is correctly displayed")
     
     @pytest.mark.smoke
@@ -38,12 +40,7 @@ class TestHomePageContent:
         """Test hero carousel exists and has images"""
         logger.info("Testing hero carousel")
         
-        carousel = page.locator("#heroCarousel")
-        expect(carousel).to_be_visible()
-        
-        # Check for carousel slides
-        slides = page.locator("#heroCarousel .carousel-slide")
-        expect(slides).to_have_count(4)
+        run_check(checks.hero_carousel, page)
         
         logger.info("Hero carousel has 4 slides")
     
@@ -66,11 +63,7 @@ class TestHomePageContent:
         """Test L1 B-BBEE badge is visible"""
         logger.info("Testing B-BBEE badge visibility")
         
-        badge = page.locator(".hero-badge")
-        expect(badge).to_be_visible()
-        
-        badge_number = page.locator(".hero-badge-number")
-        expect(badge_number).to_have_text("L1")
+        run_check(checks.bbbee_badge, page)
         
         logger.info("B-BBEE badge is correctly displayed")
     
@@ -78,26 +71,15 @@ class TestHomePageContent:
     def test_trust_bar_icons(self, page):
         """Test trust bar has all 5 icons"""
         logger.info("Testing trust bar icons")
-        
-        trust_items = page.locator(".trust-item")
-        expect(trust_items).to_have_count(5)
-        
-        # Check for specific trust items
-        trust_texts = ["CIPC Registered", "Fully Insured", "Community-Led", 
-                       "Eco-Friendly", "Trained Professionals"]
-        
-        for text in trust_texts:
-            item = page.locator(f".trust-text:has-text('{text}')")
-            expect(item).to_be_visible()
-            logger.info(f"Trust item '{text}' is visible")
+        run_check(checks.trust_bar, page)
+        logger.info("Trust bar items are visible")
     
     @pytest.mark.regression
     def test_services_grid(self, page):
         """Test services grid has all 6 cards"""
         logger.info("Testing services grid")
         
-        service_cards = page.locator(".service-card")
-        expect(service_cards).to_have_count(6)
+        run_check(checks.services_grid, page)
         
         logger.info("Services grid has 6 cards")
     
@@ -120,12 +102,7 @@ class TestHomePageContent:
         """Test stats section has 4 stats"""
         logger.info("Testing stats section")
         
-        stat_items = page.locator(".stat-item")
-        expect(stat_items).to_have_count(4)
-        
-        # Check specific stats
-        l1_stat = page.locator(".stat-number:has-text('L1')")
-        expect(l1_stat).to_be_visible()
+        run_check(checks.stats_section, page)
         
         logger.info("Stats section displays correctly")
     
@@ -134,9 +111,7 @@ class TestHomePageContent:
         """Test community section is present"""
         logger.info("Testing community section")
         
-        community_tag = page.locator(".community-img-tag")
-        expect(community_tag).to_be_visible()
-        expect(community_tag).to_have_text("Our People")
+        run_check(checks.community_section, page)
         
         logger.info("Community section is present with tag")
 
@@ -149,12 +124,9 @@ class TestAboutPageContent:
         """Test About page hero title"""
         logger.info("Testing About page hero title")
         
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
-        hero_title = page.locator(".about-hero-title")
-        expect(hero_title).to_be_visible()
-        expect(hero_title).to_contain_text("Hope, Dignity")
+        run_check(checks.about_hero, page)
         
         logger.info("About hero title is correct")
     
@@ -163,14 +135,9 @@ class TestAboutPageContent:
         """Test B-BBEE strip on About page"""
         logger.info("Testing B-BBEE strip")
         
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
-        strip = page.locator(".bbbee-strip")
-        expect(strip).to_be_visible()
-        
-        badge = page.locator(".bbbee-strip-badge")
-        expect(badge).to_contain_text("Level 1 B-BBEE")
+        run_check(checks.bbbee_strip, page)
         
         logger.info("B-BBEE strip displays correctly")
     
@@ -179,21 +146,9 @@ class TestAboutPageContent:
         """Test sidebar has Mission, Vision, Promise cards"""
         logger.info("Testing sidebar cards")
         
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
-        
-        sidebar_cards = page.locator(".sidebar-card")
-        expect(sidebar_cards).to_have_count(3)
-        
-        # Check for specific labels
-        mission = page.locator(".sidebar-card-label:has-text('Our Mission')")
-        expect(mission).to_be_visible()
-        
-        vision = page.locator(".sidebar-card-label:has-text('Our Vision')")
-        expect(vision).to_be_visible()
+        Site(page).goto_about()
         
-        promise = page.locator(".sidebar-card-label:has-text('Our Promise')")
-        expect(promise).to_be_visible()
+        run_check(checks.sidebar_cards, page)
         
         logger.info("All sidebar cards are present")
     
@@ -202,11 +157,9 @@ class TestAboutPageContent:
         """Test values grid has 5 values"""
         logger.info("Testing values grid")
         
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
-        value_items = page.locator(".value-item")
-        expect(value_items).to_have_count(5)
+        run_check(checks.values_grid, page)
         
         logger.info("Values grid has 5 values")
     
@@ -215,8 +168,7 @@ class TestAboutPageContent:
         """Test About page has image rows"""
         logger.info("Testing About page image rows")
         
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
         image_rows = page.locator(".about-img-row")
         expect(image_rows.first).to_be_visible()
@@ -232,12 +184,9 @@ class TestContactPageContent:
         """Test Contact page hero"""
         logger.info("Testing Contact page hero")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact()
         
-        hero_title = page.locator(".contact-hero-title")
-        expect(hero_title).to_be_visible()
-        expect(hero_title).to_contain_text("Cleaner")
+        run_check(checks.contact_hero, page)
         
         logger.info("Contact hero is present")
     
@@ -246,20 +195,9 @@ class TestContactPageContent:
         """Test contact information blocks"""
         logger.info("Testing contact info blocks")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact()
         
-        # Check for Email block
-        email_label = page.locator(".contact-info-label:has-text('Email')")
-        expect(email_label).to_be_visible()
-        
-        # Check for Telephone block
-        phone_label = page.locator(".contact-info-label:has-text('Telephone')")
-        expect(phone_label).to_be_visible()
-        
-        # Check for WhatsApp block
-        whatsapp_label = page.locator(".contact-info-label:has-text('WhatsApp')")
-        expect(whatsapp_label).to_be_visible()
+        run_check(checks.contact_info_blocks, page)
         
         logger.info("All contact info blocks are present")
     
@@ -268,15 +206,9 @@ class TestContactPageContent:
         """Test address card is present"""
         logger.info("Testing address card")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
-        
-        address_card = page.locator(".address-card")
-        expect(address_card).to_be_visible()
+        Site(page).goto_contact()
         
-        address_text = page.locator(".address-card-text")
-        expect(address_text).to_contain_text("Wattle Street")
-        expect(address_text).to_contain_text("Boksburg")
+        run_check(checks.address_card, page)
         
         logger.info("Address card displays correctly")
     
@@ -285,11 +217,9 @@ class TestContactPageContent:
         """Test social media links are present"""
         logger.info("Testing social media links")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact()
         
-        social_links = page.locator(".social-links .social-link")
-        expect(social_links).to_have_count(3)  # LinkedIn, WhatsApp, Email
+        run_check(checks.social_links, page)
         
         logger.info("Social media links are present")
 
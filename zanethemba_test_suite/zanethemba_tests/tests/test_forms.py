@@ -5,6 +5,8 @@ import pytest
 import logging
 from playwright.sync_api import Page, expect
 
+from support.pages import Site, ContactForm
+
 logger = logging.getLogger('zanethemba_tests.forms')
 
 
@@ -16,8 +18,7 @@ class TestContactForm:
         """Test contact form is visible"""
         logger.info("Testing contact form visibility")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         form = page.locator("#contactForm")
         expect(form).to_be_visible()
@@ -29,8 +30,7 @@ class TestContactForm:
         """Test contact form has all required fields"""
         logger.info("Testing contact form fields")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Check for all form fields
         fields = ["fname", "lname", "email", "phone", "service", "message"]
@@ -45,8 +45,7 @@ class TestContactForm:
         """Test form labels are present"""
         logger.info("Testing form labels")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         labels = ["First Name", "Last Name", "Email Address", "Phone Number"]
         
@@ -60,8 +59,7 @@ class TestContactForm:
         """Test service dropdown has options"""
         logger.info("Testing service dropdown options")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         service_select = page.locator("#service")
         expect(service_select).to_be_visible()
@@ -78,23 +76,22 @@ class TestContactForm:
         """Test successful form submission"""
         logger.info("Testing form submission (happy path)")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        contact_form = ContactForm(page).open()
         
         # Fill out the form
-        page.fill("#fname", "John")
-        page.fill("#lname", "Doe")
-        page.fill("#email", "john.doe@example.com")
-        page.fill("#phone", "+27 82 123 4567")
-        page.select_option("#service", "Residential Cleaning")
-        page.fill("#message", "I would like to request a quote for residential cleaning services.")
+        contact_form.fill(
+            first_name="John",
+            last_name="Doe",
+            email="john.doe@example.com",
+            phone="+27 82 123 4567",
+            message="I would like to request a quote for residential cleaning services.",
+            service="Residential Cleaning"
+        )
         
         logger.info("Form filled with valid data")
         
-        # Submit the form
-        submit_button = page.locator("button[type='submit']")
-        submit_button.click()
-        page.wait_for_timeout(500)
+        # Submit the form and wait for the success message to replace it
+        contact_form.submit()
         
         # Check for success message
         success_div = page.locator("#formSuccess")
@@ -110,8 +107,7 @@ class TestContactForm:
         """Test form validates first name is required"""
         logger.info("Testing first name validation")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Try to submit without first name
         page.fill("#lname", "Doe")
@@ -130,8 +126,7 @@ class TestContactForm:
         """Test form validates last name is required"""
         logger.info("Testing last name validation")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         lname_field = page.locator("#lname")
         is_required = lname_field.get_attribute("required")
@@ -144,8 +139,7 @@ class TestContactForm:
         """Test form validates email is required"""
         logger.info("Testing email validation")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         email_field = page.locator("#email")
         is_required = email_field.get_attribute("required")
@@ -161,8 +155,7 @@ class TestContactForm:
         """Test phone field is optional"""
         logger.info("Testing phone field is optional")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         phone_field = page.locator("#phone")
         is_required = phone_field.get_attribute("required")
@@ -175,8 +168,7 @@ class TestContactForm:
         """Test form fields have placeholders"""
         logger.info("Testing form field placeholders")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Check some placeholders
         fname = page.locator("#fname")
@@ -200,7 +192,7 @@ class TestCTAButtons:
         
         cta_button = page.get_by_role("link", name="Request a Service")
         cta_button.click()
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("contact")
         
         contact_page = page.locator("#page-contact")
         expect(contact_page).to_have_class("page active")
@@ -214,7 +206,7 @@ class TestCTAButtons:
         
         cta_button = page.get_by_role("link", name="Our Story")
         cta_button.click()
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("about")
         
         about_page = page.locator("#page-about")
         expect(about_page).to_have_class("page active")
@@ -229,7 +221,7 @@ class TestCTAButtons:
         # Find the 'Talk to Us' button in service card
         talk_to_us = page.get_by_role("link", name="Talk to Us")
         talk_to_us.click()
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("contact")
         
         contact_page = page.locator("#page-contact")
         expect(contact_page).to_have_class("page active")
@@ -243,7 +235,7 @@ class TestCTAButtons:
         
         learn_story = page.get_by_role("link", name="Learn Our Story")
         learn_story.click()
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("about")
         
         about_page = page.locator("#page-about")
         expect(about_page).to_have_class("page active")
@@ -259,8 +251,7 @@ class TestLinks:
         """Test email links have mailto: protocol"""
         logger.info("Testing email link protocol")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact(settle=False)
         
         email_link = page.locator("a[href='mailto:info@zanethembacleaning.co.za']").first
         expect(email_link).to_be_visible()
@@ -275,8 +266,7 @@ class TestLinks:
         """Test phone links have tel: protocol"""
         logger.info("Testing phone link protocol")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact(settle=False)
         
         phone_link = page.locator("a[href='tel:+27615460770']").first
         expect(phone_link).to_be_visible()
@@ -291,8 +281,7 @@ class TestLinks:
         """Test WhatsApp link is correct"""
         logger.info("Testing WhatsApp link")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact(settle=False)
         
         whatsapp_link = page.locator("a[href='https://wa.me/27733715083']").first
         expect(whatsapp_link).to_be_visible()
@@ -5,6 +5,11 @@ import pytest
 import logging
 from playwright.sync_api import Page, expect
 
+from support import checks
+from support.checks import run_check
+from support.readiness import wait_for_site_ready
+from support.pages import Site
+
 logger = logging.getLogger('zanethemba_tests.navigation')
 
 
@@ -12,6 +17,7 @@ class TestNavigation:
     """Test navigation functionality"""
     
     @pytest.mark.smoke
+    @pytest.mark.splash
     def test_splash_screen_appears(self, context, base_url):
         """Test that splash screen appears on load"""
         logger.info("Testing splash screen appearance")
@@ -24,7 +30,7 @@ class TestNavigation:
         logger.info("Splash screen is visible on load")
         
         # Wait for it to fade out
-        page.wait_for_timeout(4000)
+        wait_for_site_ready(page)
         expect(splash).to_have_css("display", "none")
         logger.info("Splash screen fades out correctly")
         
@@ -42,32 +48,22 @@ class TestNavigation:
     def test_company_name_visible_in_nav(self, page):
         """Test company name appears next to logo"""
         logger.info("Testing company name in navigation")
-        brand_main = page.locator(".brand-main")
-        expect(brand_main).to_have_text("Zanethemba")
-        
-        brand_sub = page.locator(".brand-sub")
-        expect(brand_sub).to_have_text("Cleaning Services")
+        run_check(checks.brand_name, page)
         logger.info("Company name correctly displayed")
     
     @pytest.mark.smoke
     def test_navigation_links_present(self, page):
         """Test all navigation links are present"""
         logger.info("Testing navigation links presence")
-        
-        nav_links = ["Home", "About Us", "Contact Us"]
-        for link_text in nav_links:
-            link = page.get_by_role("link", name=link_text, exact=True)
-            expect(link).to_be_visible()
-            logger.info(f"Navigation link '{link_text}' is present")
+        run_check(checks.navigation_links, page)
+        logger.info("Navigation links are present")
     
     @pytest.mark.regression
     def test_navigate_to_about_page(self, page):
         """Test navigation to About page"""
         logger.info("Testing navigation to About page")
         
-        about_link = page.locator("#nav-about")
-        about_link.click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
         # Check if About page is active
         about_page = page.locator("#page-about")
@@ -79,9 +75,7 @@ class TestNavigation:
         """Test navigation to Contact page"""
         logger.info("Testing navigation to Contact page")
         
-        contact_link = page.locator("#nav-contact")
-        contact_link.click()
-        page.wait_for_timeout(500)
+        Site(page).goto_contact()
         
         # Check if Contact page is active
         contact_page = page.locator("#page-contact")
@@ -93,13 +87,13 @@ class TestNavigation:
         """Test navigation back to Home page"""
         logger.info("Testing navigation back to Home")
         
+        site = Site(page)
+        
         # Go to About first
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
+        site.goto_about()
         
         # Navigate back to Home
-        page.locator("#nav-home").click()
-        page.wait_for_timeout(300)
+        site.goto_home()
         
         home_page = page.locator("#page-home")
         expect(home_page).to_have_class("page active")
@@ -115,8 +109,7 @@ class TestNavigation:
         expect(home_link).to_have_class("active")
         
         # Click About
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
+        Site(page).goto_about()
         
         # About should now be active, Home should not
         about_link = page.locator("#nav-about")
@@ -130,13 +123,13 @@ class TestNavigation:
         """Test clicking logo returns to home page"""
         logger.info("Testing logo click navigation to home")
         
+        site = Site(page)
+        
         # Navigate to About
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
+        site.goto_about()
         
         # Click logo
-        page.locator(".nav-logo").click()
-        page.wait_for_timeout(300)
+        site.click_logo()
         
         # Should be on home page
         home_page = page.locator("#page-home")
@@ -170,13 +163,7 @@ class TestFooter:
         """Test footer contains contact information"""
         logger.info("Testing footer contact information")
         
-        # Check for email
-        email_link = page.locator("footer a[href='mailto:info@zanethembacleaning.co.za']")
-        expect(email_link).to_be_visible()
-        
-        # Check for phone numbers
-        phone1 = page.locator("footer a[href='tel:+27615460770']")
-        expect(phone1).to_be_visible()
+        run_check(checks.footer_contact, page)
         
         logger.info("Footer contact information is complete")
     
@@ -188,7 +175,7 @@ class TestFooter:
         # Find footer About Us link
         footer_about = page.locator("footer").get_by_text("About Us", exact=True)
         footer_about.click()
-        page.wait_for_timeout(300)
+        Site(page).wait_for_page("about")
         
         about_page = page.locator("#page-about")
         expect(about_page).to_have_class("page active")
@@ -212,9 +199,7 @@ class TestMobileNavigation:
         """Test hamburger menu opens when clicked"""
         logger.info("Testing hamburger menu opens")
         
-        hamburger = mobile_page.locator("#hamburger")
-        hamburger.click()
-        mobile_page.wait_for_timeout(300)
+        Site(mobile_page).open_mobile_menu()
         
         mobile_menu = mobile_page.locator("#mobileMenu")
         expect(mobile_menu).to_have_class("mobile-menu open")
@@ -225,14 +210,15 @@ class TestMobileNavigation:
         """Test navigation through mobile menu"""
         logger.info("Testing mobile menu navigation")
         
+        site = Site(mobile_page)
+        
         # Open menu
-        mobile_page.locator("#hamburger").click()
-        mobile_page.wait_for_timeout(300)
+        site.open_mobile_menu()
         
         # Click About in mobile menu
         about_mobile = mobile_page.locator("#mob-about")
         about_mobile.click()
-        mobile_page.wait_for_timeout(500)
+        site.wait_for_page("about").wait_for_menu(open=False)
         
         # Check About page is active
         about_page = mobile_page.locator("#page-about")
@@ -254,9 +240,8 @@ class TestMobileNavigation:
         # Initially not open
         expect(hamburger).not_to_have_class("hamburger open")
         
-        # Click to open
-        hamburger.click()
-        mobile_page.wait_for_timeout(300)
+        # Click to open and let the icon finish morphing
+        Site(mobile_page).toggle_mobile_menu()
         
         # Should have open class
         expect(hamburger).to_have_class("hamburger open")
@@ -5,6 +5,9 @@ import pytest
 import logging
 from playwright.sync_api import Page, expect
 
+from support.readiness import wait_for_site_ready
+from support.pages import Site, ContactForm
+
 logger = logging.getLogger('zanethemba_tests.negative')
 
 
@@ -16,8 +19,7 @@ class TestInvalidInputs:
         """Test email field validates format"""
         logger.info("Testing invalid email format rejection")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         email_field = page.locator("#email")
         
@@ -36,8 +38,7 @@ class TestInvalidInputs:
         """Test form prevents empty submission"""
         logger.info("Testing empty form submission prevention")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Try to submit empty form
         submit_button = page.locator("button[type='submit']")
@@ -54,8 +55,7 @@ class TestInvalidInputs:
         """Test form handles extremely long input"""
         logger.info("Testing extremely long input handling")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Try very long name
         long_name = "A" * 1000
@@ -72,8 +72,7 @@ class TestInvalidInputs:
         """Test form handles special characters in name fields"""
         logger.info("Testing special characters in name")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Try name with special characters
         special_name = "<script>alert('XSS')</script>"
@@ -89,8 +88,7 @@ class TestInvalidInputs:
         """Test form handles SQL injection attempt"""
         logger.info("Testing SQL injection attempt")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Try SQL injection
         sql_string = "'; DROP TABLE users; --"
@@ -118,8 +116,7 @@ class TestNavigationEdgeCases:
             page.locator("#nav-home").click()
         
         # Should still work
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
+        Site(page).goto_about()
         
         about_page = page.locator("#page-about")
         expect(about_page).to_have_class("page active")
@@ -133,7 +130,7 @@ class TestNavigationEdgeCases:
         
         # Double-click About link
         page.locator("#nav-about").dblclick()
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("about")
         
         # Should still navigate correctly
         about_page = page.locator("#page-about")
@@ -142,6 +139,7 @@ class TestNavigationEdgeCases:
         logger.info("Double-click navigation handled correctly")
     
     @pytest.mark.negative
+    @pytest.mark.splash
     def test_navigation_during_splash(self, context, base_url):
         """Test clicking navigation during splash doesn't break"""
         logger.info("Testing navigation during splash screen")
@@ -153,7 +151,7 @@ class TestNavigationEdgeCases:
         page.locator("#nav-about").click()
         
         # Wait for splash to complete
-        page.wait_for_timeout(4000)
+        wait_for_site_ready(page)
         
         # Should have navigated successfully
         about_page = page.locator("#page-about")
@@ -178,8 +176,8 @@ class TestMobileEdgeCases:
             hamburger.click()
             hamburger.click()
         
-        # Menu should respond to final state
-        mobile_page.wait_for_timeout(500)
+        # Menu should settle in its final (closed) state
+        Site(mobile_page).wait_for_menu(open=False)
         
         logger.info("Mobile menu handles rapid toggling")
     
@@ -188,13 +186,14 @@ class TestMobileEdgeCases:
         """Test navigating with menu already open"""
         logger.info("Testing navigation with mobile menu open")
         
+        site = Site(mobile_page)
+        
         # Open menu
-        mobile_page.locator("#hamburger").click()
-        mobile_page.wait_for_timeout(300)
+        site.open_mobile_menu()
         
         # Click a link
         mobile_page.locator("#mob-about").click()
-        mobile_page.wait_for_timeout(500)
+        site.wait_for_page("about").wait_for_menu(open=False)
         
         # Menu should close and page should change
         mobile_menu = mobile_page.locator("#mobileMenu")
@@ -206,16 +205,17 @@ class TestMobileEdgeCases:
         logger.info("Mobile navigation works with menu open")
     
     @pytest.mark.negative
-    def test_landscape_mobile_orientation(self, context, base_url):
+    def test_landscape_mobile_orientation(self, context, base_url, network_policy):
         """Test site works in landscape mobile"""
         logger.info("Testing landscape mobile orientation")
         
         landscape_context = context.browser.new_context(
             viewport={"width": 667, "height": 375}  # Landscape phone
         )
+        network_policy.install(landscape_context)
         page = landscape_context.new_page()
         page.goto(base_url, wait_until="domcontentloaded")
-        page.wait_for_timeout(4000)
+        wait_for_site_ready(page)
         
         # Should still be functional
         hero = page.locator(".hero")
@@ -240,8 +240,6 @@ class TestCarouselEdgeCases:
         for i in range(10):
             dots.nth(i % 4).click()
         
-        page.wait_for_timeout(500)
-        
         # Should still have exactly one active slide
         active_slides = page.locator("#heroCarousel .carousel-slide.active")
         expect(active_slides).to_have_count(1)
@@ -249,20 +247,21 @@ class TestCarouselEdgeCases:
         logger.info("Carousel handles rapid dot clicking")
     
     @pytest.mark.negative
-    def test_carousel_with_page_navigation(self, page):
+    def test_carousel_with_page_navigation(self, virtual_clock):
         """Test carousel doesn't interfere with navigation"""
         logger.info("Testing carousel with page navigation")
+        page = virtual_clock.page
         
         # Let carousel run
-        page.wait_for_timeout(6000)
+        virtual_clock.advance(6000)
+        
+        site = Site(page)
         
         # Navigate away
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
+        site.goto_about()
         
         # Navigate back
-        page.locator("#nav-home").click()
-        page.wait_for_timeout(500)
+        site.goto_home()
         
         # Carousel should still work
         carousel = page.locator("#heroCarousel")
@@ -282,17 +281,13 @@ class TestFormEdgeCases:
         """Test submitting form multiple times"""
         logger.info("Testing double form submission")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        contact_form = ContactForm(page).open()
         
         # Fill form
-        page.fill("#fname", "Test")
-        page.fill("#lname", "User")
-        page.fill("#email", "test@example.com")
+        contact_form.fill(first_name="Test", last_name="User", email="test@example.com")
         
         # Submit once
-        page.click("button[type='submit']")
-        page.wait_for_timeout(500)
+        contact_form.submit()
         
         # Form should show success
         success_div = page.locator("#formSuccess")
@@ -309,8 +304,7 @@ class TestFormEdgeCases:
         """Test form with only whitespace in fields"""
         logger.info("Testing form with whitespace-only input")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Fill with spaces
         page.fill("#fname", "   ")
@@ -328,8 +322,7 @@ class TestFormEdgeCases:
         """Test textarea handles newlines correctly"""
         logger.info("Testing textarea with newlines")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Fill textarea with newlines
         message_text = "Line 1\nLine 2\nLine 3"
@@ -349,8 +342,7 @@ class TestAccessibilityEdgeCases:
         """Test keyboard tab navigation"""
         logger.info("Testing keyboard tab navigation")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Focus first field
         page.locator("#fname").focus()
@@ -374,7 +366,7 @@ class TestAccessibilityEdgeCases:
         
         # Press Enter
         page.keyboard.press("Enter")
-        page.wait_for_timeout(500)
+        Site(page).wait_for_page("about")
         
         # Should navigate to About
         about_page = page.locator("#page-about")
@@ -392,12 +384,11 @@ class TestBrowserCompatibility:
         logger.info("Testing page reload behavior")
         
         # Navigate to About
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
         # Reload page
         page.reload()
-        page.wait_for_timeout(4000)  # Wait for splash
+        wait_for_site_ready(page)
         
         # Should be back on home page (default)
         home_page = page.locator("#page-home")
@@ -411,12 +402,10 @@ class TestBrowserCompatibility:
         logger.info("Testing browser back button (SPA)")
         
         # Navigate to About
-        page.locator("#nav-about").click()
-        page.wait_for_timeout(500)
+        Site(page).goto_about()
         
         # Try browser back (won't work in SPA without hash routing)
         page.go_back()
-        page.wait_for_timeout(300)
         
         # Still on same page (file:// URL doesn't change)
         logger.info("Browser back button doesn't affect SPA (expected)")
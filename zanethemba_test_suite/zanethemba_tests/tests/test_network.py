@@ -0,0 +1,38 @@
+"""
+Offline network policy tests, run on the site file without a browser
+"""
+import pytest
+import logging
+
+from support.network import NetworkPolicy, FONT_CACHE_DIR, FONT_FILE_URL_PATTERN, site_font_stylesheets
+
+logger = logging.getLogger('zanethemba_tests.network')
+
+
+@pytest.mark.sections("head")
+class TestFontCache:
+    """Test the committed font cache covers every font the site loads"""
+
+    def test_site_fonts_served_from_cache(self, site_path):
+        """Test every font stylesheet of the site and each of its font files is a cache hit"""
+        logger.info("Testing site fonts resolve to the offline font cache")
+        policy = NetworkPolicy()
+        stylesheets = site_font_stylesheets(site_path)
+        assert stylesheets, "The site links no Google Fonts stylesheet"
+
+        misses = []
+        for css_url in stylesheets:
+            action, response, _ = policy.resolve(css_url)
+            if action != "font-cache":
+                misses.append(css_url)
+                continue
+            for font_url in sorted(set(FONT_FILE_URL_PATTERN.findall(response["body"].decode()))):
+                if policy.resolve(font_url)[0] != "font-cache":
+                    misses.append(font_url)
+
+        logger.info(f"{len(stylesheets)} stylesheet(s) checked, {len(misses)} not cached")
+        assert not misses, (
+            f"Not in {FONT_CACHE_DIR}: {', '.join(misses)}; run `python3 -m support.network --refresh` "
+            "with network access and commit font_cache/"
+        )
+        logger.info("✓ Site fonts are served from the cache")
@@ -0,0 +1,68 @@
+"""
+Page-weight budget tests, run on the site file without a browser
+"""
+import pytest
+import logging
+import time
+
+from support.page_weight import analyze, load_budgets, check_budgets
+
+logger = logging.getLogger('zanethemba_tests.page_weight')
+
+
+@pytest.fixture(scope="module")
+def page_weight(site_path):
+    """Byte breakdown of the site document"""
+    return analyze(site_path)
+
+
+@pytest.mark.sections("head", "style", "script", "chrome", "home", "about", "contact")
+class TestPageWeight:
+    """Test the document's weight by category against the configured budgets"""
+
+    @pytest.mark.performance
+    def test_page_weight_within_budgets(self, page_weight, json_metadata):
+        """Test every category of the document is within its budget"""
+        logger.info("Testing page weight budgets")
+        logger.info(page_weight.summary())
+        json_metadata["page_weight"] = page_weight.metrics()
+
+        violations = check_budgets(page_weight, load_budgets())
+        assert not violations, f"Page weight over budget: {'; '.join(violations)}"
+        logger.info("✓ Page weight is within budgets")
+
+    @pytest.mark.performance
+    def test_breakdown_accounts_for_every_byte(self, page_weight):
+        """Test the categories add up to the document size"""
+        logger.info("Testing page weight breakdown is complete")
+
+        assert sum(page_weight.categories.values()) == page_weight.total_bytes
+        assert all(size >= 0 for size in page_weight.categories.values()), page_weight.categories
+        logger.info(f"✓ {page_weight.total_bytes} bytes split over {len(page_weight.categories)} categories")
+
+    @pytest.mark.performance
+    def test_embedded_images_are_reported(self, page_weight):
+        """Test each data-URI image is listed with its encoded and decoded size"""
+        logger.info("Testing embedded image breakdown")
+
+        assert page_weight.images, "Expected embedded data-URI images in the document"
+        for image in page_weight.images:
+            logger.info(f"{image.mime} at {image.offset}: {image.encoded_bytes} bytes encoded, "
+                        f"{image.decoded_bytes} decoded{' (duplicate)' if image.duplicate else ''}")
+            # base64 is 4 characters for every 3 bytes, plus the "data:...;base64," prefix
+            assert image.decoded_bytes < image.encoded_bytes
+            assert image.decoded_bytes >= image.encoded_bytes * 0.7
+        logger.info(f"✓ {len(page_weight.images)} embedded images reported")
+
+    @pytest.mark.performance
+    def test_analysis_is_fast(self, site_path):
+        """Test the analysis of the 3.6 MB document takes milliseconds"""
+        logger.info("Testing page weight analysis speed")
+
+        start = time.perf_counter()
+        analyze(site_path)
+        elapsed = time.perf_counter() - start
+
+        logger.info(f"Analyzed {site_path.name} in {elapsed * 1000:.1f} ms")
+        assert elapsed < 0.5, f"Analysis took {elapsed * 1000:.0f} ms"
+        logger.info("✓ Page weight analysis is fast")
@@ -4,8 +4,18 @@ Performance tests for Zanethemba website
 import pytest
 import logging
 import time
+import urllib.request
+from urllib.error import HTTPError
 from playwright.sync_api import Page, expect
 
+from support.readiness import wait_for_site_ready
+from support.pages import Site, ContactForm
+from support.web_vitals import check_budgets
+from support.leak_detector import LeakDetector
+from support.benchmark import benchmark
+from support.animation_profiler import AnimationProfiler
+from support.throttling import THROTTLING_PROFILES, transfer_estimate_ms
+
 logger = logging.getLogger('zanethemba_tests.performance')
 
 
@@ -13,153 +23,217 @@ class TestPageLoadPerformance:
     """Test page load performance"""
     
     @pytest.mark.performance
-    def test_initial_page_load_time(self, context, base_url):
-        """Test initial page load time is acceptable"""
+    def test_initial_page_load_time(self, context, base_url, web_vitals):
+        """Test initial page load metrics are within their budgets"""
         logger.info("Testing initial page load time")
         
         page = context.new_page()
+        page.goto(base_url, wait_until="load", timeout=30000)
         
-        start_time = time.time()
-        page.goto(base_url, wait_until="domcontentloaded", timeout=30000)
-        load_time = time.time() - start_time
-        
-        logger.info(f"Page loaded in {load_time:.2f} seconds")
+        # Measured in the page by the browser, not around the Playwright call
+        vitals = web_vitals.collect(page, label="initial-load")
+        logger.info(f"DOMContentLoaded at {vitals['dom_content_loaded_ms']} ms, "
+                    f"load at {vitals['load_ms']} ms")
         
-        # Should load in under 3 seconds
-        assert load_time < 3.0, f"Page took {load_time:.2f}s to load (expected < 3s)"
+        violations = check_budgets(vitals, web_vitals.budgets)
+        assert not violations, f"Web Vitals over budget: {'; '.join(violations)}"
         
         page.close()
         logger.info("✓ Page load time is acceptable")
     
     @pytest.mark.performance
-    def test_page_fully_loaded_time(self, context, base_url):
+    @pytest.mark.splash
+    def test_page_fully_loaded_time(self, context, base_url, web_vitals):
         """Test page fully loaded time (including splash)"""
         logger.info("Testing full page load time including splash")
         
         page = context.new_page()
-        
-        start_time = time.time()
         page.goto(base_url, wait_until="load", timeout=30000)
         
         # Wait for splash to complete
-        page.wait_for_timeout(4000)
-        
-        full_load_time = time.time() - start_time
+        wait_for_site_ready(page)
+        ready_ms = page.evaluate("performance.now()")
         
-        logger.info(f"Page fully loaded in {full_load_time:.2f} seconds")
+        vitals = web_vitals.collect(page, label="full-load")
+        logger.info(f"Page fully loaded in {ready_ms:.0f} ms since navigation start")
         
         # Should be fully ready in under 6 seconds
-        assert full_load_time < 6.0, f"Full load took {full_load_time:.2f}s (expected < 6s)"
+        assert ready_ms < 6000, f"Full load took {ready_ms:.0f} ms (expected < 6000 ms)"
+        
+        # The splash covers the page, so layout must not shift underneath it
+        assert vitals["cls"] <= web_vitals.budgets["cls"], f"CLS {vitals['cls']} during splash"
         
         page.close()
         logger.info("✓ Full page load time is acceptable")
     
     @pytest.mark.performance
-    def test_navigation_speed(self, page):
+    def test_navigation_speed(self, page, json_metadata):
         """Test navigation between pages is fast"""
         logger.info("Testing navigation speed")
+        site = Site(page)
+        results = {}
         
-        # Navigate to About
-        start_time = time.time()
-        page.locator("#nav-about").click()
-        page.wait_for_selector("#page-about.active")
-        about_nav_time = time.time() - start_time
-        
-        logger.info(f"Navigation to About: {about_nav_time:.3f}s")
-        assert about_nav_time < 1.0, f"About navigation took {about_nav_time:.3f}s"
-        
-        # Navigate to Contact
-        start_time = time.time()
-        page.locator("#nav-contact").click()
-        page.wait_for_selector("#page-contact.active")
-        contact_nav_time = time.time() - start_time
-        
-        logger.info(f"Navigation to Contact: {contact_nav_time:.3f}s")
-        assert contact_nav_time < 1.0, f"Contact navigation took {contact_nav_time:.3f}s"
+        # Each target is reached from a different page, timed until the section switches
+        for target, start_page in (("about", "home"), ("contact", "about"), ("home", "contact")):
+            results[target] = benchmark(
+                f"navigate {start_page} -> {target}",
+                lambda: site.goto(target, settle=False),
+                setup=lambda: site.goto(start_page, settle=False)
+            )
+        json_metadata["benchmarks"] = {name: r.as_dict() for name, r in results.items()}
         
-        # Navigate back to Home
-        start_time = time.time()
-        page.locator("#nav-home").click()
-        page.wait_for_selector("#page-home.active")
-        home_nav_time = time.time() - start_time
-        
-        logger.info(f"Navigation to Home: {home_nav_time:.3f}s")
-        assert home_nav_time < 1.0, f"Home navigation took {home_nav_time:.3f}s"
+        violations = [v for r in results.values() for v in r.over_budget(median=0.5, p95=1.0)]
+        assert not violations, "; ".join(violations)
         
         logger.info("✓ All navigation speeds are acceptable")
     
     @pytest.mark.performance
-    def test_carousel_rotation_performance(self, page):
-        """Test carousel doesn't lag when rotating"""
+    def test_carousel_rotation_performance(self, virtual_clock):
+        """Test carousel rotates exactly on its 5 second interval"""
         logger.info("Testing carousel rotation performance")
+        page = virtual_clock.page
         
-        # Wait for initial load
-        page.wait_for_timeout(1000)
+        # Hero (5s), community (6s) and break (7s) carousels are scheduled
+        intervals = sorted(virtual_clock.scheduled_intervals())
+        assert intervals == [5000, 6000, 7000], f"Unexpected carousel intervals: {intervals}"
         
-        # Get initial active slide
-        initial_active = page.locator("#heroCarousel .carousel-slide.active")
-        expect(initial_active).to_have_count(1)
+        slides = page.locator("#heroCarousel .carousel-slide")
+        expect(page.locator("#heroCarousel .carousel-slide.active")).to_have_count(1)
+        expect(slides.nth(0)).to_have_class("carousel-slide active")
         
-        logger.info("Waiting for carousel auto-rotation (5 seconds)")
-        
-        # Wait for carousel to rotate (5 second interval)
-        start_time = time.time()
-        page.wait_for_timeout(5500)
-        rotation_time = time.time() - start_time
+        # One millisecond before the interval nothing has moved
+        virtual_clock.advance(5000 - virtual_clock.now() - 1)
+        expect(slides.nth(0)).to_have_class("carousel-slide active")
         
-        # Check that rotation happened
-        active_slides = page.locator("#heroCarousel .carousel-slide.active")
-        expect(active_slides).to_have_count(1)
-        
-        logger.info(f"Carousel rotation completed in {rotation_time:.2f}s")
-        
-        # Rotation should be smooth (within timing tolerance)
-        assert 5.0 <= rotation_time <= 6.0, "Carousel rotation timing off"
+        # On the interval the next slide becomes active
+        virtual_clock.advance(1)
+        expect(slides.nth(1)).to_have_class("carousel-slide active")
+        expect(page.locator("#heroCarousel .carousel-slide.active")).to_have_count(1)
         
+        logger.info(f"Carousel rotated at exactly {virtual_clock.now()} ms")
         logger.info("✓ Carousel rotation is smooth")
     
     @pytest.mark.performance
-    def test_form_interaction_responsiveness(self, page):
+    def test_form_interaction_responsiveness(self, page, json_metadata):
         """Test form inputs are responsive"""
         logger.info("Testing form interaction responsiveness")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Test typing speed
-        start_time = time.time()
-        page.fill("#fname", "Performance Test Name")
-        fill_time = time.time() - start_time
-        
-        logger.info(f"Form field fill time: {fill_time:.3f}s")
-        assert fill_time < 0.5, f"Form filling took {fill_time:.3f}s (expected < 0.5s)"
+        fill = benchmark(
+            "fill first name",
+            lambda: page.fill("#fname", "Performance Test Name"),
+            setup=lambda: page.fill("#fname", "")
+        )
         
         # Test dropdown interaction
-        start_time = time.time()
-        page.select_option("#service", "Residential Cleaning")
-        select_time = time.time() - start_time
+        select = benchmark(
+            "select service",
+            lambda: page.select_option("#service", "Residential Cleaning"),
+            setup=lambda: page.select_option("#service", index=0)
+        )
+        json_metadata["benchmarks"] = {"fill": fill.as_dict(), "select": select.as_dict()}
         
-        logger.info(f"Dropdown selection time: {select_time:.3f}s")
-        assert select_time < 0.3, f"Dropdown took {select_time:.3f}s (expected < 0.3s)"
+        violations = fill.over_budget(median=0.25, p95=0.5) + select.over_budget(median=0.15, p95=0.3)
+        assert not violations, "; ".join(violations)
         
         logger.info("✓ Form interactions are responsive")
     
     @pytest.mark.performance
-    def test_mobile_menu_animation_speed(self, mobile_page):
+    def test_mobile_menu_animation_speed(self, mobile_page, json_metadata):
         """Test mobile menu opens quickly"""
         logger.info("Testing mobile menu animation speed")
+        site = Site(mobile_page)
         
-        start_time = time.time()
-        mobile_page.locator("#hamburger").click()
-        mobile_page.wait_for_selector("#mobileMenu.open")
-        open_time = time.time() - start_time
+        def open_menu():
+            mobile_page.locator("#hamburger").click()
+            mobile_page.wait_for_selector("#mobileMenu.open")
+        
+        result = benchmark("open mobile menu", open_menu, setup=site.close_mobile_menu)
+        json_metadata["benchmarks"] = {"open_menu": result.as_dict()}
         
-        logger.info(f"Mobile menu open time: {open_time:.3f}s")
-        assert open_time < 0.5, f"Mobile menu took {open_time:.3f}s to open"
+        violations = result.over_budget(median=0.25, p95=0.5)
+        assert not violations, "; ".join(violations)
         
         logger.info("✓ Mobile menu animation is fast")
 
 
+class TestAnimationSmoothness:
+    """Test frame rate and jank of carousel, menu and page animations"""
+    
+    @pytest.mark.performance
+    def test_carousel_transition_smoothness(self, virtual_clock, json_metadata):
+        """Test the hero carousel cross-fade renders without dropped frames"""
+        logger.info("Testing carousel transition smoothness")
+        # Autoplay is frozen: the 5s hero interval would otherwise switch
+        # slides inside the profile window, about 1.3s after the splash
+        page = virtual_clock.page
+        profiler = AnimationProfiler(page)
+        
+        # The slide cross-fade is a 1.2s opacity transition
+        report = profiler.profile(
+            "hero carousel slide",
+            lambda: page.locator("#heroDots .carousel-dot").nth(1).click(),
+            scope="#heroCarousel",
+            min_duration_ms=1200
+        )
+        json_metadata["animations"] = {"carousel": report.as_dict()}
+        
+        expect(page.locator("#heroCarousel .carousel-slide").nth(1)).to_have_class("carousel-slide active")
+        violations = report.over_budget()
+        assert not violations, "; ".join(violations)
+        logger.info("✓ Carousel transition is smooth")
+    
+    @pytest.mark.performance
+    def test_mobile_menu_animation_smoothness(self, mobile_page, json_metadata):
+        """Test the hamburger morph and menu opening render smoothly"""
+        logger.info("Testing mobile menu animation smoothness")
+        site = Site(mobile_page)
+        profiler = AnimationProfiler(mobile_page)
+        
+        opening = profiler.profile(
+            "open mobile menu",
+            lambda: mobile_page.locator("#hamburger").click(),
+            scope="#hamburger",
+            min_duration_ms=300
+        )
+        assert site.is_menu_open(), "Mobile menu did not open"
+        closing = profiler.profile(
+            "close mobile menu",
+            lambda: mobile_page.locator("#hamburger").click(),
+            scope="#hamburger",
+            min_duration_ms=300
+        )
+        assert not site.is_menu_open(), "Mobile menu did not close"
+        json_metadata["animations"] = {"menu_open": opening.as_dict(), "menu_close": closing.as_dict()}
+        
+        violations = opening.over_budget() + closing.over_budget()
+        assert not violations, "; ".join(violations)
+        logger.info("✓ Mobile menu animation is smooth")
+    
+    @pytest.mark.performance
+    def test_page_transition_smoothness(self, page, json_metadata):
+        """Test the anim-fadeup replay after showPage renders smoothly"""
+        logger.info("Testing page transition smoothness")
+        site = Site(page)
+        profiler = AnimationProfiler(page)
+        reports = {}
+        
+        for target in ("about", "contact", "home"):
+            reports[target] = profiler.profile(
+                f"show {target} page",
+                lambda: site.goto(target, settle=False),
+                scope=f"#page-{target}"
+            )
+            site.wait_for_page(target)
+        json_metadata["animations"] = {name: r.as_dict() for name, r in reports.items()}
+        
+        violations = [v for r in reports.values() for v in r.over_budget()]
+        assert not violations, "; ".join(violations)
+        logger.info("✓ Page transitions are smooth")
+
+
 class TestResourceLoadPerformance:
     """Test resource loading performance"""
     
@@ -230,41 +304,139 @@ class TestResourceLoadPerformance:
         logger.info("✓ All JavaScript is inline")
 
 
+class TestHttpDelivery:
+    """Test transfer size and caching when the site is served over HTTP"""
+    
+    @pytest.mark.performance
+    def test_compressed_transfer_size(self, site_server):
+        """Test the document is sent compressed and much smaller than on disk"""
+        logger.info("Testing compressed transfer size")
+        
+        request = urllib.request.Request(site_server.url(), headers={"Accept-Encoding": "br, gzip"})
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            encoding = response.headers["Content-Encoding"]
+        
+        identity_size = site_server.site_size()
+        ratio = len(body) / identity_size
+        logger.info(f"Transferred {len(body)} of {identity_size} bytes ({encoding}, {ratio:.0%})")
+        
+        assert encoding in ("br", "gzip"), f"Expected a compressed response, got {encoding}"
+        assert ratio < 0.9, f"Compressed document is {ratio:.0%} of the original"
+        logger.info("✓ Document is served compressed")
+    
+    @pytest.mark.performance
+    def test_cold_and_warm_load(self, new_context, site_server):
+        """Test a warm load revalidates with the ETag instead of re-downloading"""
+        logger.info("Testing cold and warm page loads over HTTP")
+        
+        document_path = f"/{site_server.index}"
+        with new_context() as context:
+            site_server.reset_stats()
+            start_time = time.time()
+            cold_page = context.new_page()
+            cold_page.goto(site_server.url(), wait_until="load", timeout=60000)
+            cold_time = time.time() - start_time
+            cold_bytes = site_server.bytes_sent(document_path)
+            cold_page.close()
+            
+            site_server.reset_stats()
+            start_time = time.time()
+            warm_page = context.new_page()
+            warm_page.goto(site_server.url(), wait_until="load", timeout=60000)
+            warm_time = time.time() - start_time
+            warm_bytes = site_server.bytes_sent(document_path)
+            warm_statuses = [r["status"] for r in site_server.requests if r["path"] == document_path]
+            warm_page.close()
+        
+        logger.info(f"Cold load: {cold_time:.2f}s, {cold_bytes} bytes")
+        logger.info(f"Warm load: {warm_time:.2f}s, {warm_bytes} bytes, statuses {warm_statuses}")
+        
+        assert cold_bytes > 0, "Cold load should download the document"
+        assert warm_bytes == 0, f"Warm load re-downloaded {warm_bytes} bytes"
+        assert 304 in warm_statuses, "Warm load should revalidate with a 304"
+        logger.info("✓ Warm load is served from cache after revalidation")
+    
+    @pytest.mark.performance
+    def test_range_request(self, site_server):
+        """Test byte ranges are supported for resumable downloads"""
+        logger.info("Testing byte range support")
+        
+        request = urllib.request.Request(site_server.url(), headers={"Range": "bytes=0-1023"})
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            assert response.status == 206, f"Expected 206, got {response.status}"
+            assert response.headers["Content-Range"].startswith("bytes 0-1023/")
+        assert len(body) == 1024, f"Expected 1024 bytes, got {len(body)}"
+        
+        request = urllib.request.Request(site_server.url(), headers={"Range": "bytes=abc"})
+        with pytest.raises(HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 416
+        logger.info("✓ Byte ranges are supported")
+
+
+class TestThrottledLoad:
+    """Test page load under mobile network and CPU throttling profiles"""
+    
+    @pytest.mark.performance
+    def test_throttled_page_load(self, throttled_page, throttled_url, throttling_profile, web_vitals):
+        """Test the page loads within the budgets of each throttling profile"""
+        profile = THROTTLING_PROFILES[throttling_profile]
+        logger.info(f"Testing page load under '{throttling_profile}' throttling")
+        
+        throttled_page.goto(throttled_url, wait_until="load")
+        vitals = web_vitals.collect(throttled_page, label=throttling_profile)
+        
+        # The transfer alone sets a floor no amount of script tuning can beat
+        floor_ms = transfer_estimate_ms(vitals["transfer_size"] or 0, throttling_profile)
+        logger.info(f"'{throttling_profile}': {vitals['transfer_size']} bytes transferred "
+                    f"(>= {floor_ms:.0f} ms on the wire), FCP {vitals['fcp_ms']} ms, "
+                    f"DCL {vitals['dom_content_loaded_ms']} ms, load {vitals['load_ms']} ms")
+        
+        violations = check_budgets(vitals, profile["budgets"])
+        assert not violations, f"'{throttling_profile}' over budget: {'; '.join(violations)}"
+        
+        # The site must still become usable on a throttled device
+        wait_for_site_ready(throttled_page)
+        Site(throttled_page).goto_about()
+        
+        logger.info(f"✓ Page load is within the '{throttling_profile}' budgets")
+
+
 class TestMemoryAndCPU:
     """Test memory and CPU usage (basic checks)"""
     
     @pytest.mark.performance
-    def test_multiple_navigation_cycles(self, page):
-        """Test memory doesn't leak during navigation"""
+    def test_multiple_navigation_cycles(self, page, json_metadata):
+        """Test memory doesn't keep growing over hundreds of navigation cycles"""
         logger.info("Testing memory stability during navigation")
         
-        # Perform multiple navigation cycles
-        for i in range(5):
-            logger.info(f"Navigation cycle {i+1}/5")
-            
-            page.locator("#nav-about").click()
-            page.wait_for_timeout(200)
-            
-            page.locator("#nav-contact").click()
-            page.wait_for_timeout(200)
-            
-            page.locator("#nav-home").click()
-            page.wait_for_timeout(200)
+        detector = LeakDetector(page)
+        try:
+            report = detector.run(cycles=300, sample_every=10, warmup=20)
+        finally:
+            detector.close()
+        json_metadata["memory_leak"] = report.as_dict()
+        
+        # Navigation still works after the cycles
+        Site(page).goto_about()
         
-        # If we get here without timeout or crash, memory is stable
-        logger.info("✓ Memory stable after 5 navigation cycles")
+        assert not report.leaks, f"Memory grows with every navigation cycle: {'; '.join(report.leaks)}"
+        logger.info(f"✓ Memory stable after 300 navigation cycles (slopes: {report.slopes})")
     
     @pytest.mark.performance
-    def test_carousel_doesnt_freeze(self, page):
+    def test_carousel_doesnt_freeze(self, virtual_clock):
         """Test page doesn't freeze with carousel running"""
         logger.info("Testing page doesn't freeze with carousel")
+        page = virtual_clock.page
         
-        # Let carousel run for a while
-        page.wait_for_timeout(10000)  # 10 seconds
+        # Let carousel run for a while (two hero rotations)
+        virtual_clock.advance(10000)
+        expect(page.locator("#heroCarousel .carousel-slide").nth(2)).to_have_class("carousel-slide active")
         
         # Try to interact with page
         page.locator("#nav-about").click()
-        page.wait_for_timeout(300)
         
         about_page = page.locator("#page-about")
         expect(about_page).to_have_class("page active")
@@ -276,8 +448,7 @@ class TestMemoryAndCPU:
         """Test form submission is responsive"""
         logger.info("Testing form submission performance")
         
-        page.locator("#nav-contact").click()
-        page.wait_for_timeout(500)
+        ContactForm(page).open()
         
         # Fill and submit form
         page.fill("#fname", "Speed")
@@ -0,0 +1,56 @@
+"""
+Result cache tests, run on a copy of the harness without a browser
+"""
+import pytest
+import json
+import logging
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+logger = logging.getLogger('zanethemba_tests.result_cache')
+
+HARNESS_ROOT = Path(__file__).parent.parent
+
+CACHEABLE_TEST = '''\
+def test_cacheable():
+    assert True
+'''
+
+
+@pytest.fixture
+def harness(tmp_path):
+    """Copy of conftest.py and the support package with one cacheable test"""
+    shutil.copy(HARNESS_ROOT / "conftest.py", tmp_path)
+    shutil.copytree(HARNESS_ROOT / "support", tmp_path / "support",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_cacheable.py").write_text(CACHEABLE_TEST)
+    return tmp_path
+
+
+def run_harness(harness, site_path, *args):
+    """Run the copied harness and return the metadata of its one test"""
+    report = harness / "reports" / "run.json"
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", "-o", "addopts=", "-p", "no:cacheprovider",
+         "--json-report", f"--json-report-file={report}", "--site-path", str(site_path),
+         *args, "tests"],
+        cwd=harness, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    with open(report, 'r') as f:
+        tests = json.load(f)["tests"]
+    assert len(tests) == 1
+    return tests[0].get("metadata", {})
+
+
+class TestResultCache:
+    """Test passes are served from the cache on the next run"""
+
+    def test_full_run_refreshes_cache(self, harness, site_path):
+        """Test a --full-run executes the test and its pass is cached for the next run"""
+        logger.info("Testing --full-run refreshes the result cache")
+        assert not run_harness(harness, site_path, "--full-run").get("cached")
+        assert run_harness(harness, site_path).get("cached") is True
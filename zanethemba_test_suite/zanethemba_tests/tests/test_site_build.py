@@ -0,0 +1,775 @@
+"""
+Tests for the site build steps: each build must render like the source document
+"""
+import pytest
+import json
+import logging
+import re
+import shutil
+import statistics
+
+from support.asset_dedup import dedupe_file, collect_assets, DATA_URI_PATTERN, HYDRATE_SCRIPT
+from support.code_split import SPLIT_PAGES
+from support.image_pipeline import build_responsive_file, FORMATS, WIDTHS
+from support.lazy_images import defer_images, deferred_spans, LAZY_RUNTIME
+from support.minify import minify_html
+from support.page_weight import analyze
+from support.site_build import build_site, verify_manifest, stale_copies, BUILDS, HEAD_STYLE_PATTERN
+from support.pages import Site, PAGES
+from support.readiness import wait_for_site_ready
+from support.service_worker import WORKER_NAME, REGISTER_SCRIPT
+from support.site_server import SiteServer, HASHED_NAME_PATTERN
+from support.throttling import apply_throttling, load_timeout_ms
+from support.virtual_clock import VirtualClock
+
+logger = logging.getLogger('zanethemba_tests.site_build')
+
+# Resolves once every image in the document has been decoded
+IMAGES_DECODED_SCRIPT = """
+() => Promise.all(Array.from(document.images).map(img => img.decode().catch(() => null)))
+"""
+
+# Source and natural size of every visible image, in document order (hidden
+# carousel slides and pages are left out: lazy builds never attach them).
+# Visibility comes from the computed style of each enclosing slide and page,
+# as Chromium 120 (playwright 1.40) ignores the checkVisibility() options.
+IMAGE_STATE_SCRIPT = """
+() => Array.from(document.images)
+  .filter(img => {
+    for (let el = img.closest('.carousel-slide,.page'); el; el = el.parentElement.closest('.carousel-slide,.page')) {
+      const style = getComputedStyle(el);
+      if (style.display === 'none' || style.opacity === '0') return false;
+    }
+    return true;
+  })
+  .map(img => ({alt: img.alt, width: img.naturalWidth, height: img.naturalHeight, complete: img.complete}))
+"""
+
+# Images decoded when the first contentful paint is reported, and images
+# still deferred then
+IMAGES_AT_FCP_SCRIPT = """
+new PerformanceObserver((list, observer) => {
+  if (!list.getEntriesByName('first-contentful-paint').length) return;
+  observer.disconnect();
+  window.__imagesAtFcp = {
+    decoded: Array.from(document.images).filter(img => img.complete && img.naturalWidth > 0).length,
+    deferred: document.querySelectorAll('img[data-lazy]').length
+  };
+}).observe({type: 'paint', buffered: true});
+"""
+
+# Alt text of every image that holds a decoded picture
+ATTACHED_IMAGES_SCRIPT = """
+() => Array.from(document.images).filter(img => img.complete && img.naturalWidth > 0).map(img => img.alt)
+"""
+
+# Decoded width of the file each visible image actually loaded (naturalWidth
+# of an <img> with a w-descriptor srcset is scaled to its sizes slot, so the
+# current source is decoded again without one) against the device pixels it
+# has to fill; object-fit:cover images must also cover the box height.
+IMAGE_FIT_SCRIPT = """
+async () => {
+  const fits = [];
+  for (const img of document.images) {
+    const rect = img.getBoundingClientRect();
+    if (!rect.width || !rect.height || !img.currentSrc) continue;
+    const probe = new Image();
+    probe.src = img.currentSrc;
+    await probe.decode().catch(() => null);
+    const aspect = probe.naturalWidth / probe.naturalHeight;
+    const cover = getComputedStyle(img).objectFit === 'cover';
+    const needed = (cover ? Math.max(rect.width, rect.height * aspect) : rect.width) * devicePixelRatio;
+    fits.push({
+      alt: img.alt,
+      file: img.currentSrc.split('/').pop(),
+      natural_width: probe.naturalWidth,
+      rendered_width: Math.round(rect.width),
+      needed_width: Math.round(needed)
+    });
+  }
+  return fits;
+}
+"""
+
+# A variant may be up to one ladder step (at most 2x) larger than needed
+OVERSIZE_FACTOR = 2.0
+
+
+def render(new_context, url, profile="desktop"):
+    """Screenshot of each page section and the state of its visible images
+
+    Timers are frozen with the virtual clock so the carousels stay on their
+    first slide, and CSS animations are skipped to their end state. Images
+    are decoded again after each page is shown, as lazy builds only attach
+    them then.
+    """
+    shots = {}
+    images = {}
+    with new_context(profile, skip_splash=True, virtual_clock=True) as context:
+        page = context.new_page()
+        page.goto(url, wait_until="load", timeout=60000)
+        wait_for_site_ready(page)
+        page.evaluate(IMAGES_DECODED_SCRIPT)
+
+        site = Site(page)
+        for name in PAGES:
+            page.evaluate("name => { showPage(name); window.scrollTo({top: 0, behavior: 'instant'}); }", name)
+            site.wait_for_page(name, settle=False)
+            page.evaluate(IMAGES_DECODED_SCRIPT)
+            shots[name] = page.screenshot(animations="disabled")
+            images[name] = page.evaluate(IMAGE_STATE_SCRIPT)
+    return shots, images
+
+
+@pytest.fixture(scope="module")
+def dedup_builds(site_path, tmp_path_factory):
+    """Inline and external deduplicated builds of the site"""
+    builds = {}
+    for mode in ("inline", "external"):
+        out_dir = tmp_path_factory.mktemp(f"dedup-{mode}")
+        result = dedupe_file(site_path, out_dir, mode)
+        builds[mode] = (result, out_dir / "index.html")
+    return builds
+
+
+@pytest.mark.sections("head", "style", "script", "chrome", "home", "about", "contact")
+class TestAssetDeduplication:
+    """Test the deduplicated builds store each payload once and render identically"""
+
+    @pytest.mark.performance
+    def test_each_payload_appears_once(self, site_path, dedup_builds, json_metadata):
+        """Test every distinct payload of the source is embedded or written exactly once"""
+        logger.info("Testing deduplicated builds store each payload once")
+        source = collect_assets(site_path.read_text(encoding="utf-8"))
+        source_digests = {asset.digest for asset in source.values()}
+
+        inline, inline_path = dedup_builds["inline"]
+        payloads = [m.group(3) for m in DATA_URI_PATTERN.finditer(inline_path.read_text(encoding="utf-8"))]
+        assert len(payloads) == len(set(payloads)) == len(source_digests), \
+            f"{len(payloads)} data URIs in the inline build for {len(source_digests)} distinct payloads"
+
+        external, external_path = dedup_builds["external"]
+        assert not DATA_URI_PATTERN.search(external_path.read_text(encoding="utf-8"))
+        assert len(external.files) == len(source_digests)
+        for relative in external.files:
+            assert (external_path.parent / relative).is_file(), f"Missing asset file {relative}"
+
+        for result in (inline, external):
+            logger.info(result.summary())
+            assert {asset.digest for asset in result.assets} == source_digests
+        json_metadata["asset_dedup"] = {mode: result.as_dict() for mode, (result, _) in dedup_builds.items()}
+        logger.info(f"✓ {len(source_digests)} payloads stored once")
+
+    @pytest.mark.performance
+    def test_bytes_saved(self, site_path, dedup_builds):
+        """Test deduplication removes the repeated payloads from the transfer"""
+        logger.info("Testing bytes saved by deduplication")
+        source = collect_assets(site_path.read_text(encoding="utf-8"))
+        duplicate_bytes = sum(asset.encoded_bytes * (asset.uses - 1)
+                              for asset in {a.digest: a for a in source.values()}.values())
+
+        for mode, (result, _) in dedup_builds.items():
+            logger.info(f"{mode}: saved {result.bytes_saved} of {result.original_bytes} bytes")
+            assert result.bytes_saved >= duplicate_bytes * 0.95, \
+                f"{mode} build saved {result.bytes_saved} bytes, expected about {duplicate_bytes}"
+        logger.info("✓ Repeated payloads no longer cost bytes")
+
+
+
+@pytest.fixture(scope="module")
+def site_build(site_path, tmp_path_factory):
+    """Single-file and multi-file builds of the site, with their manifest"""
+    out_dir = tmp_path_factory.mktemp("site")
+    manifest = build_site(site_path, out_dir)
+    return manifest, out_dir
+
+
+@pytest.mark.sections("head", "style", "script", "chrome", "home", "about", "contact")
+class TestSiteBuild:
+    """Test the single-source build writes minified, hashed builds described by a manifest"""
+
+    @pytest.mark.performance
+    def test_manifest_matches_builds(self, site_build, json_metadata):
+        """Test every built file exists with the size and hash the manifest records"""
+        logger.info("Testing the build manifest")
+        manifest, out_dir = site_build
+
+        assert set(manifest["builds"]) == set(BUILDS)
+        problems = verify_manifest(out_dir)
+        assert not problems, f"Build differs from its manifest: {'; '.join(problems)}"
+        for name, build in manifest["builds"].items():
+            logger.info(f"{name}: {len(build['files'])} files, {build['total_bytes']} bytes, "
+                        f"{build['gzip_bytes']} gzipped")
+            assert build["total_bytes"] == sum(entry["bytes"] for entry in build["files"].values())
+        json_metadata["site_build"] = {name: {k: build[k] for k in ("total_bytes", "gzip_bytes")}
+                                       for name, build in manifest["builds"].items()}
+        logger.info("✓ Manifest describes every build")
+
+    @pytest.mark.performance
+    def test_builds_are_smaller(self, site_path, site_build):
+        """Test both builds are smaller than the source and their markup is minified"""
+        logger.info("Testing build sizes")
+        manifest, _ = site_build
+        single, multi, split = (manifest["builds"][name] for name in ("single", "multi", "split"))
+        source = analyze(site_path).metrics()
+
+        assert single["total_bytes"] < manifest["source_bytes"] * 0.5
+        assert multi["total_bytes"] < single["total_bytes"]
+        assert split["files"]["index.html"]["bytes"] < multi["files"]["index.html"]["bytes"]
+        for category in ("markup_bytes", "css_bytes"):
+            assert single["page_weight"][category] < source[category], f"{category} did not shrink"
+        # The only scripts added are the asset hydration and the lazy image runtime
+        added_js = len(HYDRATE_SCRIPT) + len(LAZY_RUNTIME)
+        assert single["page_weight"]["js_bytes"] < source["js_bytes"] + added_js, "js_bytes did not shrink"
+        hashed = [name for name in multi["files"] if name.startswith("assets/")]
+        assert any(name.endswith(".css") for name in hashed) and any(name.endswith(".js") for name in hashed)
+        logger.info(f"✓ Single {single['total_bytes']} and multi {multi['total_bytes']} bytes "
+                    f"from {manifest['source_bytes']}")
+
+    def test_legacy_copies_match_source(self):
+        """Test the hand-maintained copies of the site have not drifted from the source"""
+        logger.info("Testing legacy copies of the site")
+        stale = stale_copies()
+        assert not stale, f"Out of date: {', '.join(map(str, stale))} (python3 -m support.site_build --publish-copies)"
+        logger.info("✓ Legacy copies match the source")
+
+
+@pytest.fixture(scope="module")
+def responsive_build(site_path, tmp_path_factory):
+    """Build of the site with responsive AVIF/WebP variants of every image"""
+    pytest.importorskip("PIL", reason="The image pipeline needs Pillow")
+    out_dir = tmp_path_factory.mktemp("responsive")
+    result = build_responsive_file(site_path, out_dir)
+    return result, out_dir / "index.html"
+
+
+@pytest.mark.sections("head", "style", "chrome", "home", "about")
+class TestResponsiveImages:
+    """Test the responsive image build serves images sized for each viewport"""
+
+    @pytest.mark.performance
+    def test_every_image_has_variants(self, responsive_build, json_metadata):
+        """Test each image becomes a <picture> with modern formats at several widths"""
+        logger.info("Testing responsive image markup")
+        result, build_path = responsive_build
+        html = build_path.read_text(encoding="utf-8")
+
+        assert not DATA_URI_PATTERN.search(html), "Build still embeds data URIs"
+        assert html.count("<img") == html.count("<picture>") == html.count("</picture>") == len(result.slots)
+        for slot in result.slots:
+            assert slot["slot"] != "default", f"Image {slot['image']} has no layout slot"
+
+        for digest, variants in result.variants.items():
+            formats = {variant.format for variant in variants}
+            widths = sorted({variant.width for variant in variants})
+            logger.info(f"{digest[:12]}: {', '.join(sorted(formats))} at {widths}")
+            assert "webp" in formats
+            assert len(widths) > 3, f"Only {widths} for {digest[:12]}"
+            assert widths[0] == WIDTHS[0]
+        json_metadata["responsive_images"] = result.as_dict()
+        logger.info(f"✓ {len(result.slots)} images have responsive variants")
+
+    @pytest.mark.performance
+    @pytest.mark.parametrize("profile", ["desktop", "tablet", "mobile"])
+    def test_images_not_oversized(self, new_context, responsive_build, profile):
+        """Test no image loads a file much wider than the pixels it is rendered at"""
+        logger.info(f"Testing loaded image sizes on {profile}")
+        _, build_path = responsive_build
+        oversized = []
+        checked = 0
+        with new_context(profile, skip_splash=True) as context:
+            page = context.new_page()
+            page.goto(build_path.as_uri(), wait_until="load", timeout=60000)
+            wait_for_site_ready(page)
+
+            for name in PAGES:
+                page.evaluate("name => showPage(name)", name)
+                Site(page).wait_for_page(name, settle=False)
+                for fit in page.evaluate(IMAGE_FIT_SCRIPT):
+                    checked += 1
+                    logger.info(f"{profile}/{name} {fit['alt']}: {fit['file']} is {fit['natural_width']} px "
+                                f"for {fit['needed_width']} px (rendered {fit['rendered_width']} px)")
+                    assert fit["file"].rsplit(".", 1)[-1] in FORMATS, f"{fit['alt']} loaded {fit['file']}"
+                    limit = max(fit["needed_width"] * OVERSIZE_FACTOR, WIDTHS[0]) + 1
+                    if fit["natural_width"] > limit:
+                        oversized.append(f"{name}: {fit['alt']} {fit['natural_width']} px "
+                                         f"for {fit['needed_width']} px")
+
+        assert checked, "No visible images were measured"
+        assert not oversized, f"Oversized images on {profile}: {'; '.join(oversized)}"
+        logger.info(f"✓ {checked} images on {profile} are sized for the viewport")
+
+
+def count_images(html):
+    """Images in ``html`` and how many of them are deferred"""
+    return len(re.findall(r"<img\b", html, re.I)), len(re.findall(r"<img\b[^>]*\sdata-lazy\b", html, re.I))
+
+
+@pytest.mark.sections("script", "chrome", "home", "about", "contact")
+class TestLazyImages:
+    """Test the builds attach only the images of the visible page and slides at load"""
+
+    @pytest.mark.performance
+    def test_offscreen_images_deferred(self, site_path, site_build, json_metadata):
+        """Test every image of an inactive page or hidden slide has no source in the build"""
+        logger.info("Testing off-screen images are deferred")
+        result = defer_images(minify_html(site_path.read_text(encoding="utf-8")))
+        logger.info(result.summary())
+        assert result.deferred, "No images were deferred"
+        for start, end in deferred_spans(result.html):
+            assert not re.search(r"<(?:img|source)\b[^>]*\s(?:src|srcset)=", result.html[start:end]), \
+                "An off-screen image keeps its source"
+
+        manifest, out_dir = site_build
+        counts = {}
+        for build in manifest["builds"]:
+            html = "".join((out_dir / build / name).read_text(encoding="utf-8")
+                           for name in manifest["builds"][build]["files"] if name.endswith(".html"))
+            total, deferred = count_images(html)
+            assert (total - deferred, deferred) == (result.eager, result.deferred), f"{build} defers other images"
+            counts[build] = {"eager": total - deferred, "deferred": deferred}
+        json_metadata["lazy_images"] = counts
+        logger.info(f"✓ {result.deferred} of {result.eager + result.deferred} images deferred")
+
+    @pytest.mark.performance
+    @pytest.mark.parametrize("build", BUILDS)
+    def test_fewer_images_decoded_at_first_paint(self, new_context, site_build, build):
+        """Test no deferred image is decoded by the first contentful paint"""
+        logger.info(f"Testing images decoded at first paint in the {build} build")
+        _, out_dir = site_build
+        build_path = out_dir / build / "index.html"
+        total, deferred = count_images(build_path.read_text(encoding="utf-8"))
+
+        with new_context(skip_splash=True, virtual_clock=True) as context, SiteServer(build_path.parent) as server:
+            context.add_init_script(IMAGES_AT_FCP_SCRIPT)
+            page = context.new_page()
+            page.goto(server.url(), wait_until="load", timeout=60000)
+            at_fcp = page.wait_for_function("() => window.__imagesAtFcp", timeout=30000).json_value()
+
+        logger.info(f"{at_fcp['decoded']} of {total} images decoded at FCP, {at_fcp['deferred']} still deferred")
+        assert at_fcp["deferred"] == deferred, "Deferred images were attached before the first paint"
+        assert at_fcp["decoded"] <= total - deferred
+        logger.info(f"✓ {deferred} images left for later")
+
+    @pytest.mark.parametrize("build", BUILDS)
+    def test_images_attached_when_shown(self, new_context, site_build, build):
+        """Test a page's images load when it is shown and the next slide before it is shown"""
+        logger.info(f"Testing deferred images load on demand in the {build} build")
+        _, out_dir = site_build
+        with new_context(skip_splash=True, virtual_clock=True) as context, SiteServer(out_dir / build) as server:
+            page = context.new_page()
+            page.goto(server.url(), wait_until="load", timeout=60000)
+            wait_for_site_ready(page)
+            clock = VirtualClock(page)
+
+            page.evaluate("() => showPage('about')")
+            Site(page).wait_for_page("about", settle=False)
+            page.evaluate(IMAGES_DECODED_SCRIPT)
+            missing = page.evaluate("""
+                () => Array.from(document.querySelectorAll('#page-about img'))
+                  .filter(img => !img.closest('.carousel-slide:not(.active)'))
+                  .filter(img => !(img.complete && img.naturalWidth > 0)).map(img => img.alt)
+            """)
+            assert not missing, f"About page shown without: {', '.join(missing)}"
+
+            page.evaluate("() => showPage('home')")
+            Site(page).wait_for_page("home", settle=False)
+            page.evaluate(IMAGES_DECODED_SCRIPT)
+            before = set(page.evaluate(ATTACHED_IMAGES_SCRIPT))
+            clock.advance(max(clock.scheduled_intervals()))
+            page.evaluate(IMAGES_DECODED_SCRIPT)
+            after = set(page.evaluate(ATTACHED_IMAGES_SCRIPT))
+
+        logger.info(f"Carousel advance attached: {', '.join(sorted(after - before)) or 'nothing'}")
+        assert after - before, "Advancing the carousels attached no upcoming slide"
+        logger.info("✓ Deferred images load before they are shown")
+
+
+# Keeps the idle prefetch of page chunks from ever running (the service
+# worker, which precaches every chunk, is blocked in these tests as well)
+NO_IDLE_SCRIPT = """
+window.requestIdleCallback = () => 0;
+"""
+
+
+def is_chunk(name):
+    """Predicate for responses of the chunk of page ``name``"""
+    return lambda response: f"/pages/{name}." in response.url
+
+
+@pytest.mark.sections("script", "chrome", "home", "about", "contact")
+class TestCodeSplit:
+    """Test the split build ships the home page first and fetches the other pages on demand"""
+
+    @pytest.mark.performance
+    def test_initial_document_excludes_split_pages(self, site_build, json_metadata):
+        """Test the About and Contact content lives only in chunks of the split build"""
+        logger.info("Testing the initial document of the split build")
+        manifest, out_dir = site_build
+        split, multi = manifest["builds"]["split"], manifest["builds"]["multi"]
+        html = (out_dir / "split" / "index.html").read_text(encoding="utf-8")
+
+        chunks = {name: entry for name, entry in split["files"].items() if name.startswith("pages/")}
+        assert len(chunks) == len(SPLIT_PAGES)
+        for name in SPLIT_PAGES:
+            section = re.search(rf'<div\b[^>]*\bid="page-{name}"[^>]*>(.*?)</div>', html)
+            assert section and 'data-chunk="pages/' in section.group(0), f"#page-{name} is not split"
+            assert not section.group(1).strip(), f"#page-{name} still has content in the initial document"
+        assert 'id="page-home"' in html and "about-hero" not in html
+
+        saved = multi["files"]["index.html"]["bytes"] - split["files"]["index.html"]["bytes"]
+        chunk_bytes = sum(entry["bytes"] for entry in chunks.values())
+        logger.info(f"Initial document {split['files']['index.html']['bytes']} bytes, "
+                    f"{saved} bytes moved to {chunk_bytes} bytes of chunks")
+        assert saved > chunk_bytes * 0.9
+        json_metadata["code_split"] = {"index_bytes": split["files"]["index.html"]["bytes"],
+                                       "chunks": {name: entry["bytes"] for name, entry in chunks.items()}}
+        logger.info("✓ Only the home page ships in the initial document")
+
+    @pytest.mark.performance
+    def test_chunks_fetched_on_demand(self, new_context, site_build):
+        """Test a chunk is fetched on hover or first navigation, once, and never at load"""
+        logger.info("Testing page chunks load on demand")
+        _, out_dir = site_build
+        with new_context(skip_splash=True, service_workers="block") as context, \
+                SiteServer(out_dir / "split") as server:
+            context.add_init_script(NO_IDLE_SCRIPT)
+            page = context.new_page()
+            page.goto(server.url(), wait_until="load", timeout=60000)
+            wait_for_site_ready(page)
+            site = Site(page)
+
+            def chunk_requests(name):
+                return [r for r in server.requests if r["path"].startswith(f"/pages/{name}.")]
+            assert not chunk_requests("about") and not chunk_requests("contact"), "Chunks fetched at load"
+
+            with page.expect_response(is_chunk("about")):
+                page.hover("#nav-about")
+            assert not chunk_requests("contact"), "Hovering About prefetched Contact"
+
+            with page.expect_response(is_chunk("contact")):
+                site.goto_contact(settle=False)
+            assert page.locator("#contactForm").is_visible()
+            site.goto_about(settle=False)
+            site.goto_home(settle=False)
+            site.goto_about(settle=False)
+            assert page.locator("#page-about .about-hero").is_visible()
+            counts = {name: len(chunk_requests(name)) for name in SPLIT_PAGES}
+
+        logger.info(f"Chunk requests: {counts}")
+        assert counts == {name: 1 for name in SPLIT_PAGES}
+        logger.info("✓ Chunks load on demand and only once")
+
+    @pytest.mark.performance
+    def test_chunks_prefetched_when_idle(self, new_context, site_build):
+        """Test every chunk is prefetched once the loaded page is idle"""
+        logger.info("Testing idle prefetch of page chunks")
+        _, out_dir = site_build
+        with new_context(skip_splash=True, service_workers="block") as context, \
+                SiteServer(out_dir / "split") as server:
+            page = context.new_page()
+            with page.expect_response(is_chunk("about")), page.expect_response(is_chunk("contact")):
+                page.goto(server.url(), wait_until="load", timeout=60000)
+            wait_for_site_ready(page)
+            page.evaluate("() => showPage('contact')")
+            Site(page).wait_for_page("contact", settle=False)
+            contact_requests = [r for r in server.requests if r["path"].startswith("/pages/contact.")]
+
+        assert len(contact_requests) == 1, "The prefetched chunk was fetched again on navigation"
+        logger.info("✓ Chunks prefetched while idle")
+
+
+# Throttling profile and number of loads per build for the FCP comparison
+FCP_PROFILE = "4g"
+FCP_SAMPLES = 3
+
+
+@pytest.fixture(scope="module")
+def critical_build(site_path, tmp_path_factory, browser):
+    """Single-file and multi-file builds with critical CSS inlined"""
+    out_dir = tmp_path_factory.mktemp("critical")
+    manifest = build_site(site_path, out_dir, builds=("single", "multi"), critical=True, browser=browser)
+    return manifest, out_dir
+
+
+def first_contentful_paint(new_context, web_vitals, url, label):
+    """FCP in ms of one throttled mobile load of ``url``"""
+    with new_context("mobile") as context:
+        page = context.new_page()
+        apply_throttling(page, FCP_PROFILE)
+        page.goto(url, wait_until="load", timeout=load_timeout_ms(FCP_PROFILE))
+        vitals = web_vitals.collect(page, label=label)
+    return vitals["fcp_ms"]
+
+
+@pytest.mark.sections("head", "style", "chrome", "home")
+class TestCriticalCss:
+    """Test the critical-CSS builds inline only the first paint's rules and paint sooner"""
+
+    @pytest.mark.performance
+    def test_critical_css_inlined(self, critical_build, json_metadata):
+        """Test the head carries a small critical stylesheet and the full one is deferred"""
+        logger.info("Testing critical CSS markup")
+        manifest, out_dir = critical_build
+        multi = (out_dir / "multi" / "index.html").read_text(encoding="utf-8")
+        head = multi[:multi.find("<body")]
+        css_name = next(name for name in manifest["builds"]["multi"]["files"] if name.endswith(".css"))
+        full = (out_dir / "multi" / css_name).read_text(encoding="utf-8")
+        critical = HEAD_STYLE_PATTERN.findall(head)
+
+        assert len(critical) == 1 and "#splash{" in critical[0], "Splash rules are not inlined"
+        assert len(critical[0]) < len(full) * 0.6, f"{len(critical[0])} of {len(full)} bytes inlined"
+        assert f'<link rel="preload" href="{css_name}" as="style"' in head
+        assert f'<noscript><link rel="stylesheet" href="{css_name}"></noscript>' in head
+        assert not re.search(r"<link rel=\"stylesheet\"(?![^<]*</noscript>)", head), "Stylesheet still blocks"
+
+        single = (out_dir / "single" / "index.html").read_text(encoding="utf-8")
+        styles = HEAD_STYLE_PATTERN.findall(single)
+        assert len(styles) == 2 and len(styles[0]) < len(styles[1]), "Single build does not defer its stylesheet"
+        assert single.find(styles[1]) > single.find("</footer>"), "Full stylesheet is not after the markup"
+
+        json_metadata["critical_css"] = {"critical_bytes": len(critical[0]), "full_bytes": len(full)}
+        logger.info(f"✓ {len(critical[0])} of {len(full)} CSS bytes inlined")
+
+    @pytest.mark.performance
+    def test_first_contentful_paint_improves(self, new_context, site_build, critical_build, web_vitals,
+                                             json_metadata):
+        """Test the multi-file build paints sooner with critical CSS than with its blocking stylesheet"""
+        logger.info(f"Testing FCP before and after critical CSS on '{FCP_PROFILE}'")
+        fcp = {}
+        for label, (_, out_dir) in (("before", site_build), ("after", critical_build)):
+            with SiteServer(out_dir / "multi") as server:
+                samples = [first_contentful_paint(new_context, web_vitals, server.url(), label)
+                           for _ in range(FCP_SAMPLES)]
+            fcp[label] = statistics.median(samples)
+            logger.info(f"FCP {label}: {samples} ms (median {fcp[label]} ms)")
+
+        json_metadata["critical_css_fcp_ms"] = fcp
+        assert fcp["after"] < fcp["before"], f"FCP {fcp['after']} ms with critical CSS, {fcp['before']} ms without"
+        logger.info(f"✓ FCP {fcp['before']} ms -> {fcp['after']} ms")
+
+
+# Every build that must render like the source: (fixture, build)
+RENDERED_BUILDS = [
+    ("dedup_builds", "inline"),
+    ("dedup_builds", "external"),
+    *[("site_build", build) for build in BUILDS],
+    ("critical_build", "single"),
+    ("critical_build", "multi"),
+]
+
+
+@pytest.mark.sections("head", "style", "script", "chrome", "home", "about", "contact")
+class TestBuildsRenderIdentically:
+    """Test every build looks exactly like the source on every page"""
+
+    @pytest.mark.parametrize("fixture, build", RENDERED_BUILDS,
+                             ids=[f"{fixture.split('_')[0]}-{build}" for fixture, build in RENDERED_BUILDS])
+    def test_build_renders_identically(self, request, new_context, site_path, fixture, build):
+        """Test the build's pages and visible images match the source once loaded"""
+        logger.info(f"Testing the {fixture} {build} build renders like the source")
+        source_shots, source_images = render(new_context, site_path.as_uri())
+        if fixture == "dedup_builds":
+            # Deduplicated builds are single documents opened from disk
+            _, build_path = request.getfixturevalue(fixture)[build]
+            build_shots, build_images = render(new_context, build_path.as_uri())
+        else:
+            _, out_dir = request.getfixturevalue(fixture)
+            with SiteServer(out_dir / build) as server:
+                build_shots, build_images = render(new_context, server.url())
+
+        assert build_images == source_images, "Images differ between source and build"
+        for name in PAGES:
+            assert build_shots[name] == source_shots[name], f"'{name}' page renders differently"
+        logger.info(f"✓ {fixture} {build} build renders identically")
+
+
+# Throttling profile for the first and second visits
+SECOND_VISIT_PROFILE = "4g"
+
+# Resolves once a service worker is active, and once it controls the page
+ACTIVE_SCRIPT = """
+() => navigator.serviceWorker.ready.then(registration => !!registration.active)
+"""
+CONTROLLED_SCRIPT = """
+() => navigator.serviceWorker.ready.then(() => !!navigator.serviceWorker.controller)
+"""
+
+# True once a new version's worker has installed and waits for the old tabs
+WAITING_SCRIPT = """
+() => navigator.serviceWorker.getRegistration().then(registration => !!(registration && registration.waiting))
+"""
+
+# Names of the site caches
+SITE_CACHES_SCRIPT = """
+async () => (await caches.keys()).filter(key => key.startsWith('zanethemba-'))
+"""
+
+# True once every image of a page holds a decoded picture
+PAGE_IMAGES_DECODED_SCRIPT = """
+(page) => Array.from(document.querySelectorAll(`#page-${page} img`))
+  .every(img => img.complete && img.naturalWidth > 0)
+"""
+
+# True once the only site cache left is the expected one
+CACHES_SCRIPT = """
+async (expected) => {
+  const keys = (await caches.keys()).filter(key => key.startsWith('zanethemba-'));
+  return keys.length === 1 && keys[0] === expected;
+}
+"""
+
+
+def first_visit(page, url):
+    """Load ``url`` and wait until its service worker has precached the build and activated
+
+    The worker does not claim the page that registered it; the next visit
+    is the first one it serves.
+    """
+    page.goto(url, wait_until="load", timeout=load_timeout_ms(SECOND_VISIT_PROFILE))
+    wait_for_site_ready(page)
+    page.wait_for_function(ACTIVE_SCRIPT, timeout=60000)
+
+
+def visit_until_controlled(page, url):
+    """Visit ``url`` twice, the second time served by its service worker"""
+    first_visit(page, url)
+    page.goto(url, wait_until="load", timeout=load_timeout_ms(SECOND_VISIT_PROFILE))
+    wait_for_site_ready(page)
+    page.wait_for_function(CONTROLLED_SCRIPT, timeout=60000)
+
+
+def precache_list(worker):
+    """Relative URLs precached by a generated sw.js"""
+    return json.loads(re.search(r"var PRECACHE = (\[.*?\]);", worker, re.S).group(1))
+
+
+@pytest.mark.sections("head", "script", "chrome", "home", "about", "contact")
+class TestServiceWorker:
+    """Test the builds' service worker makes repeat visits load from its versioned cache"""
+
+    @pytest.mark.performance
+    def test_worker_precaches_build(self, site_build):
+        """Test every build registers a worker that precaches all of its files under its version"""
+        logger.info("Testing generated service workers")
+        manifest, out_dir = site_build
+        for name, build in manifest["builds"].items():
+            worker = (out_dir / name / WORKER_NAME).read_text(encoding="utf-8")
+            assert REGISTER_SCRIPT in (out_dir / name / "index.html").read_text(encoding="utf-8")
+            assert f'var CACHE = "{build["cache"]}";' in worker
+
+            precache = precache_list(worker)
+            assert precache[0] == "index.html"
+            assert sorted(precache) == sorted(path for path in build["files"] if path != WORKER_NAME)
+            unhashed = [path for path in precache[1:] if not HASHED_NAME_PATTERN.search(path)]
+            assert not unhashed, f"{name} precaches files without a content hash: {', '.join(unhashed)}"
+            logger.info(f"{name}: {len(precache)} files under {build['cache']}")
+        assert len({build["cache"] for build in manifest["builds"].values()}) == len(manifest["builds"])
+        logger.info("✓ Every build precaches itself under its own version")
+
+    @pytest.mark.performance
+    @pytest.mark.parametrize("build", BUILDS)
+    def test_second_visit_load_time(self, new_context, site_build, build, web_vitals, json_metadata):
+        """Test a second visit is served from the worker's cache and loads faster than the first"""
+        logger.info(f"Testing second-visit load time of the {build} build on '{SECOND_VISIT_PROFILE}'")
+        _, out_dir = site_build
+        with new_context("mobile") as context, SiteServer(out_dir / build) as server:
+            page = context.new_page()
+            apply_throttling(page, SECOND_VISIT_PROFILE)
+            first_visit(page, server.url())
+            first = web_vitals.collect(page, label=f"{build}-first-visit")
+            first_bytes = server.bytes_sent()
+
+            server.reset_stats()
+            page.goto(server.url(), wait_until="load", timeout=load_timeout_ms(SECOND_VISIT_PROFILE))
+            second = web_vitals.collect(page, label=f"{build}-second-visit")
+            fetched = [r["path"] for r in server.requests if r["path"] != f"/{WORKER_NAME}" and r["bytes"]]
+
+        logger.info(f"First visit: {first['load_ms']} ms, {first_bytes} bytes; "
+                    f"second visit: {second['load_ms']} ms, network: {fetched or 'nothing'}")
+        json_metadata[f"second_visit_{build}"] = {"first_load_ms": first["load_ms"], "second_load_ms": second["load_ms"]}
+        assert not fetched, f"Second visit downloaded {', '.join(fetched)}"
+        assert second["load_ms"] < first["load_ms"]
+        logger.info(f"✓ Second visit {second['load_ms']} ms instead of {first['load_ms']} ms")
+
+    def test_site_works_offline(self, new_context, site_build):
+        """Test every page of the split build opens offline after one visit"""
+        logger.info("Testing an offline visit of the split build")
+        _, out_dir = site_build
+        with new_context(skip_splash=True) as context, SiteServer(out_dir / "split") as server:
+            page = context.new_page()
+            first_visit(page, server.url())
+            context.set_offline(True)
+            page.goto(server.url(), wait_until="load", timeout=30000)
+            wait_for_site_ready(page)
+            site = Site(page)
+            site.goto_about(settle=False)
+            assert page.locator("#page-about .about-hero").is_visible()
+            site.goto_contact(settle=False)
+            assert page.locator("#contactForm").is_visible()
+        logger.info("✓ The site works offline")
+
+    def test_old_tab_survives_rebuild(self, new_context, site_path, site_build, tmp_path):
+        """Test a tab left open on the previous build still loads its chunks and images after a rebuild"""
+        logger.info("Testing an old tab across a rebuild of the split build")
+        manifest, out_dir = site_build
+        changed = tmp_path / site_path.name
+        changed.write_text(site_path.read_text(encoding="utf-8").replace("All rights reserved.", "All rights reserved!"),
+                           encoding="utf-8")
+        next_manifest = build_site(changed, tmp_path / "next", builds=("split",))
+        old_cache = manifest["builds"]["split"]["cache"]
+        assert old_cache != next_manifest["builds"]["split"]["cache"]
+
+        served = tmp_path / "served"
+        shutil.copytree(out_dir / "split", served)
+        with new_context(skip_splash=True) as context, SiteServer(served) as server:
+            old_tab = context.new_page()
+            visit_until_controlled(old_tab, server.url())
+
+            # A deploy replaces the whole build: the old chunks and images are gone
+            shutil.rmtree(served)
+            shutil.copytree(tmp_path / "next" / "split", served)
+            new_tab = context.new_page()
+            new_tab.goto(server.url(), wait_until="load", timeout=30000)
+            new_tab.wait_for_function(WAITING_SCRIPT, timeout=30000)
+            server.reset_stats()
+
+            site = Site(old_tab)
+            for name in SPLIT_PAGES:
+                site.goto(name, settle=False)
+                old_tab.wait_for_function(PAGE_IMAGES_DECODED_SCRIPT, arg=name, timeout=30000)
+            missing = [r["path"] for r in server.requests if r["status"] >= 400]
+            caches = old_tab.evaluate(SITE_CACHES_SCRIPT)
+
+        assert not missing, f"The old tab requested files the rebuild removed: {', '.join(missing)}"
+        assert old_cache in caches, f"{old_cache} was deleted while a tab still used it"
+        logger.info(f"✓ The old tab kept loading {', '.join(SPLIT_PAGES)} from {old_cache}")
+
+    def test_old_caches_deleted_on_activation(self, new_context, site_path, site_build, tmp_path):
+        """Test the new build's worker replaces the previous version's cache once the old tabs are closed"""
+        logger.info("Testing cache cleanup after a new build")
+        manifest, out_dir = site_build
+        changed = tmp_path / site_path.name
+        changed.write_text(site_path.read_text(encoding="utf-8").replace("All rights reserved.", "All rights reserved!"),
+                           encoding="utf-8")
+        next_manifest = build_site(changed, tmp_path / "next", builds=("multi",))
+        old_cache, new_cache = manifest["builds"]["multi"]["cache"], next_manifest["builds"]["multi"]["cache"]
+        assert old_cache != new_cache
+
+        served = tmp_path / "served"
+        shutil.copytree(out_dir / "multi", served)
+        with new_context(skip_splash=True) as context, SiteServer(served) as server:
+            page = context.new_page()
+            visit_until_controlled(page, server.url())
+            page.wait_for_function(CACHES_SCRIPT, arg=old_cache, timeout=10000)
+
+            shutil.copytree(tmp_path / "next" / "multi", served, dirs_exist_ok=True)
+            page.goto(server.url(), wait_until="load", timeout=30000)
+            page.wait_for_function(WAITING_SCRIPT, timeout=30000)
+            assert old_cache in page.evaluate(SITE_CACHES_SCRIPT)
+
+            page.close()
+            page = context.new_page()
+            page.goto(server.url(), wait_until="load", timeout=30000)
+            page.wait_for_function(CACHES_SCRIPT, arg=new_cache, timeout=30000)
+        logger.info(f"✓ {old_cache} replaced by {new_cache}")